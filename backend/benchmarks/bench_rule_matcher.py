@@ -0,0 +1,94 @@
+"""
+Benchmark rule dispatch in the folder watcher as the number of rules grows.
+
+Compares checking every rule's own regex per path (the old PatternMatcher
+approach) with the combined RuleMatcher. Rule sets are mostly extension
+globs ("*.ext") with some name globs ("report_*.pdf") mixed in, the way
+organize rules tend to look. Run from the backend directory:
+
+    python benchmarks/bench_rule_matcher.py [--paths 10000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from automation import AutomationRule, RuleMatcher
+
+RULE_COUNTS = [10, 100, 1_000]
+# One rule in this many is a name glob rather than a plain extension
+NAME_GLOB_EVERY = 5
+
+
+class PatternMatcher:
+    # The matcher the Tk GUI used to build for each rule
+    def __init__(self, pattern):
+        regex_pattern = pattern.replace(".", "\\.").replace("*", ".*") + "$"
+        self.pattern = re.compile(regex_pattern)
+
+    def match(self, path):
+        return self.pattern.search(path) is not None
+
+
+def build_patterns(count):
+    patterns = []
+    for i in range(count):
+        if i % NAME_GLOB_EVERY == 0:
+            patterns.append(f"report_{i}_*.pdf")
+        else:
+            patterns.append(f"*.ext{i}")
+    return patterns
+
+
+def build_paths(patterns, count):
+    paths = []
+    for i in range(count):
+        pattern = random.choice(patterns)
+        name = pattern.replace("*", f"file{i}")
+        # Half the paths match a rule, half don't
+        if i % 2:
+            name += ".unmatched"
+        paths.append(f"/home/user/Downloads/{name}")
+    return paths
+
+
+def time_per_path(func, paths):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    return (time.perf_counter() - start) / len(paths) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'rules':>8} {'per-rule us/path':>17} {'compiled us/path':>17} {'speedup':>8}")
+    for count in RULE_COUNTS:
+        patterns = build_patterns(count)
+        paths = build_paths(patterns, args.paths)
+
+        naive_rules = [AutomationRule(PatternMatcher(pattern), None) for pattern in patterns]
+        compiled = RuleMatcher([AutomationRule(pattern, None) for pattern in patterns])
+
+        def naive(path):
+            return [rule for rule in naive_rules if rule.pattern.match(path)]
+
+        # Both must agree on which rules match before timing means anything
+        for path in paths[:1000]:
+            expected = [rule.pattern.pattern.pattern for rule in naive(path)]
+            got = [PatternMatcher(rule.pattern).pattern.pattern for rule in compiled.match(path)]
+            assert expected == got, f"matchers disagree on {path}"
+
+        naive_time = time_per_path(naive, paths)
+        compiled_time = time_per_path(compiled.match, paths)
+        print(f"{count:>8} {naive_time:>17.2f} {compiled_time:>17.2f} {naive_time / compiled_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the sequential and parallel folder walkers used by scan_folder.
+
+Builds a synthetic tree (100k files by default) in /dev/shm when available,
+then times scan_tree against scan_tree_parallel with several worker counts.
+The second run wraps every directory listing in a fixed delay to stand in
+for a network share or slow disk. Run from the backend directory:
+
+    python benchmarks/bench_scan_folder.py [--files 100000] [--latency-ms 2]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from scanner import list_directory, scan_tree, scan_tree_parallel
+
+WORKER_COUNTS = [2, 4, 8, 16]
+
+
+def build_tree(root, total_files, files_per_dir=100, dirs_per_dir=10):
+    # Fill directories breadth-first until we've written total_files files
+    created = 0
+    pending = [root]
+    while created < total_files:
+        dir_path = pending.pop(0)
+        for i in range(min(files_per_dir, total_files - created)):
+            with open(os.path.join(dir_path, f"file_{i}.txt"), "w") as f:
+                f.write("x" * (i % 64))
+            created += 1
+        for i in range(dirs_per_dir):
+            sub = os.path.join(dir_path, f"dir_{i}")
+            os.mkdir(sub)
+            pending.append(sub)
+
+
+def shape(items):
+    # The tree without the random ids, to check both walkers agree
+    return [
+        (item["name"], item["type"], shape(item["children"]) if item["type"] == "folder" else item["size"])
+        for item in items
+    ]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(label, root, list_dir):
+    print(f"\n{label}")
+    baseline, expected = timed(lambda: scan_tree(root, None, list_dir))
+    print(f"{'sequential':>14} {baseline:8.3f}s")
+    expected = shape(expected)
+    for workers in WORKER_COUNTS:
+        elapsed, items = timed(lambda: scan_tree_parallel(root, None, workers, list_dir))
+        assert shape(items) == expected, "parallel walk returned a different tree"
+        print(f"{f'{workers} workers':>14} {elapsed:8.3f}s  ({baseline / elapsed:4.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    root = tempfile.mkdtemp(prefix="chronos-scan-", dir=base)
+    try:
+        build_tree(root, args.files)
+        print(f"Tree: {args.files} files under {root}")
+
+        run("Local filesystem", root, list_directory)
+
+        latency = args.latency_ms / 1000
+
+        def slow_list_directory(dir_path):
+            time.sleep(latency)
+            return list_directory(dir_path)
+
+        run(f"Injected latency: {args.latency_ms} ms per directory listing", root, slow_list_directory)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark the scheduler loop: CPU used while idle and how late jobs fire.
+
+Compares the old loop (schedule.run_pending() then time.sleep(1)) with the
+heap-based TaskScheduler. The idle run keeps one job due an hour from now
+plus thousands of far-off jobs and measures process CPU time; the jitter
+run fires many jobs at scattered times and reports how late each fired.
+Run from the backend directory:
+
+    python benchmarks/bench_scheduler.py [--idle-seconds 10] [--jobs 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+import schedule
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from scheduler import TaskScheduler
+
+# Far-off jobs added to the heap, to show the idle cost doesn't depend on how many jobs exist
+IDLE_JOBS = 10_000
+
+
+def legacy_loop(stop):
+    # The loop TaskScheduler.start_scheduler used to run
+    while not stop.is_set():
+        schedule.run_pending()
+        time.sleep(1)
+
+
+def idle_cpu(label, start, stop, seconds):
+    thread = threading.Thread(target=start, daemon=True)
+    thread.start()
+    time.sleep(0.5)
+    cpu_start = time.process_time()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    stop()
+    thread.join(timeout=2)
+    print(f"{label:>10} {cpu * 1000:8.2f} ms CPU over {seconds:.0f}s idle")
+
+
+def report(label, lateness):
+    lateness = sorted(lateness)
+    p99 = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+    print(f"{label:>10} mean {statistics.mean(lateness) * 1000:8.2f} ms"
+          f"  p99 {p99 * 1000:8.2f} ms  max {lateness[-1] * 1000:8.2f} ms")
+
+
+def legacy_jitter(jobs, window):
+    schedule.clear()
+    lateness = []
+    done = threading.Event()
+
+    def fire(job):
+        # schedule sets next_run after the call, so it still holds the time this run was due
+        lateness.append(time.time() - job.next_run.timestamp())
+        if len(lateness) >= jobs:
+            done.set()
+        return schedule.CancelJob
+
+    for _ in range(jobs):
+        job = schedule.every(random.uniform(0.5, window)).seconds
+        job.do(fire, job)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=legacy_loop, args=(stop,), daemon=True)
+    thread.start()
+    done.wait(window + 5)
+    stop.set()
+    thread.join()
+    schedule.clear()
+    return lateness
+
+
+def heap_jitter(jobs, window):
+    scheduler = TaskScheduler()
+    lateness = []
+    done = threading.Event()
+    now = time.time()
+
+    for _ in range(jobs):
+        due = now + random.uniform(0.5, window)
+
+        def fire(due=due):
+            lateness.append(time.time() - due)
+            if len(lateness) >= jobs:
+                done.set()
+
+        scheduler.run_at(due, fire)
+
+    thread = threading.Thread(target=scheduler.start_scheduler, daemon=True)
+    thread.start()
+    done.wait(window + 5)
+    scheduler.stop()
+    thread.join()
+    return lateness
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--idle-seconds", type=float, default=10)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--window", type=float, default=5, help="jitter jobs fire within this many seconds")
+    args = parser.parse_args()
+
+    print("Idle CPU (one job due in an hour)")
+    schedule.clear()
+    schedule.every(1).hours.do(lambda: None)
+    legacy_stop = threading.Event()
+    idle_cpu("legacy", lambda: legacy_loop(legacy_stop), legacy_stop.set, args.idle_seconds)
+    schedule.clear()
+
+    scheduler = TaskScheduler()
+    scheduler.run_at(time.time() + 3600, lambda: None)
+    for i in range(IDLE_JOBS):
+        scheduler.run_at(time.time() + 86_400 + i, lambda: None)
+    idle_cpu("heap", scheduler.start_scheduler, scheduler.stop, args.idle_seconds)
+
+    print(f"\nFire-time lateness ({args.jobs} jobs over {args.window:.0f}s)")
+    report("legacy", legacy_jitter(args.jobs, args.window))
+    report("heap", heap_jitter(args.jobs, args.window))
+
+    # Insert and cancel cost at scale
+    scheduler = TaskScheduler()
+    count = 100_000
+    start = time.perf_counter()
+    ids = [scheduler.run_at(time.time() + 3600 + i, lambda: None) for i in range(count)]
+    insert = (time.perf_counter() - start) / count * 1e6
+    start = time.perf_counter()
+    for job_id in ids[::2]:
+        scheduler.cancel(job_id)
+    cancel = (time.perf_counter() - start) / (count // 2) * 1e6
+    print(f"\n{count} jobs: insert {insert:.2f} us/job, cancel {cancel:.2f} us/job")
+
+
+if __name__ == '__main__':
+    main()
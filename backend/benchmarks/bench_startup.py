@@ -0,0 +1,124 @@
+"""
+Benchmark app startup: how long until TaskAPI can answer its first call.
+
+Builds a tasks.db with N tasks (most of them completed, as a long-used board
+would be) and times TaskAPI() plus one get_dashboard_snapshot() call for:
+the old loader (fetchall + a validated Task per row + add_task), the trusted
+loader reading everything up front, and the lazy loader that only loads open
+tasks before responding. For the lazy loader the time until every task is in
+memory is reported as well. Run from the backend directory:
+
+    python benchmarks/bench_startup.py [--completed 0.8]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from api import TaskAPI
+from storage import Storage
+from task_manager import Task, TaskManager
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+class LegacyTaskAPI(TaskAPI):
+    # TaskAPI with the loader it used to have
+    def load_tasks_from_db(self, lazy=None):
+        with self.storage.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, title, description, due_date, completed, in_progress, pending, priority FROM tasks")
+            tasks_data = cursor.fetchall()
+            self.task_manager = TaskManager()
+            for id, title, description, due_date, completed, in_progress, pending, priority in tasks_data:
+                self.task_manager.add_task(Task(
+                    id=id,
+                    title=title,
+                    description=description,
+                    due_date=datetime.fromisoformat(due_date) if due_date else None,
+                    completed=bool(completed),
+                    inProgress=bool(in_progress),
+                    pending=bool(pending),
+                    priority=priority
+                ))
+        self.tasks_loaded = None
+        self._tasks_reloaded()
+
+
+def build_db(count, completed_share):
+    storage = Storage("tasks.db")
+    today = datetime.now()
+    rows = []
+    for i in range(count):
+        completed = random.random() < completed_share
+        due = today + timedelta(days=random.randint(-365, 365)) if i % 3 else None
+        rows.append((
+            str(uuid.uuid4()), f"Task {i}", f"Description for task {i}",
+            due.strftime('%Y-%m-%d') if due else None,
+            1 if completed else 0, 0, 0 if completed else 1, random.randint(1, 5)
+        ))
+    with storage.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (id, title, description, due_date, completed, in_progress, pending, priority) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    storage.close()
+
+
+def time_startup(api_class, lazy):
+    api_class.LAZY_LOAD = lazy
+    start = time.perf_counter()
+    api = api_class()
+    api.get_dashboard_snapshot()
+    first_response = time.perf_counter() - start
+    if api.tasks_loaded is not None:
+        api.tasks_loaded.wait()
+    fully_loaded = time.perf_counter() - start
+    count = len(api.task_manager)
+
+    api.folder_scanner.close()
+    api.reminders.stop()
+    api.changes.stop()
+    api.organize_jobs.close()
+    api.storage.close()
+    return first_response, fully_loaded, count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--completed", type=float, default=0.8, help="share of tasks that are completed")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronos-startup-")
+    cwd = os.getcwd()
+    # TaskAPI opens tasks.db in the working directory
+    os.chdir(workdir)
+    try:
+        print(f"{'tasks':>8} {'loader':>8} {'first response ms':>18} {'all loaded ms':>14}")
+        for count in SIZES:
+            for name in os.listdir(workdir):
+                os.remove(os.path.join(workdir, name))
+            build_db(count, args.completed)
+            runs = [
+                ("legacy", LegacyTaskAPI, False),
+                ("trusted", TaskAPI, False),
+                ("lazy", TaskAPI, True),
+            ]
+            for label, api_class, lazy in runs:
+                first, full, loaded = time_startup(api_class, lazy)
+                assert loaded == count, f"{label} loaded {loaded} of {count} tasks"
+                print(f"{count:>8} {label:>8} {first * 1000:>18.1f} {full * 1000:>14.1f}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
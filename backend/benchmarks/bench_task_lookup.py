@@ -0,0 +1,66 @@
+"""
+Benchmark task lookups in TaskManager as the board grows.
+
+Compares the old linear scan over list_tasks() with the UUID index
+(get / update / remove_by_id). Run from the backend directory:
+
+    python benchmarks/bench_task_lookup.py
+"""
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from task_manager import TaskManager, Task
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 10_000
+# Linear scans get slow quickly, so they are sampled with fewer lookups
+SCAN_LOOKUPS = 100
+
+
+def build_manager(size):
+    manager = TaskManager()
+    for i in range(size):
+        # model_construct skips validation so building a million tasks stays quick
+        manager.add_task(Task.model_construct(id=str(uuid.uuid4()), title=f"Task {i}"))
+    return manager
+
+
+def time_per_op(func, ids):
+    start = time.perf_counter()
+    for task_id in ids:
+        func(task_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def linear_scan(manager, task_id):
+    for task in manager.list_tasks():
+        if task.id == task_id:
+            return task
+    return None
+
+
+def main():
+    print(f"{'tasks':>10} {'scan us/op':>12} {'get us/op':>10} {'update us/op':>13} {'remove us/op':>13}")
+    for size in SIZES:
+        manager = build_manager(size)
+        ids = list(manager.tasks)
+
+        scan_ids = random.choices(ids, k=SCAN_LOOKUPS)
+        lookup_ids = random.choices(ids, k=LOOKUPS)
+        remove_ids = random.sample(ids, k=min(LOOKUPS, size))
+
+        scan = time_per_op(lambda task_id: linear_scan(manager, task_id), scan_ids)
+        get = time_per_op(manager.get, lookup_ids)
+        update = time_per_op(lambda task_id: manager.update(task_id, completed=True), lookup_ids)
+        remove = time_per_op(manager.remove_by_id, remove_ids)
+
+        print(f"{size:>10} {scan:>12.2f} {get:>10.3f} {update:>13.3f} {remove:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark the memory held by the in-memory task store as the board grows.
+
+Loads the same tasks from an in-memory SQLite table into TaskManager (one
+pydantic Task per task) and CompactTaskManager (columns plus TaskView
+objects) the way TaskAPI does at startup, in chunks of trusted tasks, and
+reports the memory tracemalloc sees still allocated afterwards. That covers
+the ids and text read from the rows as well as the id, status, priority and
+due-date indexes both stores share. Also times reading every task's fields back, since the
+compact store builds a view per access. Run from the backend directory:
+
+    python benchmarks/bench_task_memory.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import gc
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from task_manager import CompactTaskManager, TaskManager, trusted_task
+
+SIZES = [10_000, 100_000, 1_000_000]
+# Same chunk size TaskAPI loads with
+CHUNK_SIZE = 5_000
+# Titles and descriptions repeat on real boards ("Weekly review", ""), so some share text
+REPEATED_TEXT = ["Weekly review", "Pay bills", "Call back", "Groceries", ""]
+
+
+def build_db(count):
+    today = datetime.now().toordinal()
+    rows = []
+    for i in range(count):
+        status = random.choice((0, 1, 2))
+        due = datetime.fromordinal(today + random.randint(-365, 365)).strftime('%Y-%m-%d') if i % 3 else None
+        title = random.choice(REPEATED_TEXT) if i % 4 == 0 else f"Task {i}"
+        description = random.choice(REPEATED_TEXT) if i % 2 else f"Description for task {i}"
+        rows.append((
+            str(uuid.uuid4()), title, description, due,
+            status == 2, status == 1, status == 0, random.randint(1, 5)
+        ))
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE tasks (id TEXT PRIMARY KEY, title TEXT, description TEXT, due_date TEXT, "
+        "completed INTEGER, in_progress INTEGER, pending INTEGER, priority INTEGER)"
+    )
+    conn.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return conn
+
+
+def load(manager_class, conn):
+    # What TaskAPI._load_task_rows does
+    manager = manager_class()
+    due_dates = {}
+    cursor = conn.execute("SELECT id, title, description, due_date, completed, in_progress, pending, priority FROM tasks")
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            break
+        tasks = []
+        for id, title, description, due_date, completed, in_progress, pending, priority in rows:
+            if due_date:
+                parsed = due_dates.get(due_date)
+                if parsed is None:
+                    parsed = due_dates[due_date] = datetime.fromisoformat(due_date)
+            else:
+                parsed = None
+            tasks.append(trusted_task(id, title, description, parsed, completed, in_progress, pending, priority))
+        manager.load_tasks(tasks)
+    return manager
+
+
+def measure(manager_class, conn, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    manager = load(manager_class, conn)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Read every field of every task, the way get_all_tasks does
+    start = time.perf_counter()
+    for task in manager.list_tasks():
+        (task.id, task.title, task.description, task.due_date, task.completed, task.inProgress, task.pending, task.priority)
+    read = time.perf_counter() - start
+    assert len(manager) == count
+    return size, elapsed, read
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>9} {'store':>8} {'MiB':>9} {'bytes/task':>11} {'load s':>8} {'read all s':>11}")
+    for count in args.sizes:
+        conn = build_db(count)
+        results = {}
+        for label, manager_class in (("pydantic", TaskManager), ("compact", CompactTaskManager)):
+            size, elapsed, read = measure(manager_class, conn, count)
+            results[label] = size
+            print(f"{count:>9} {label:>8} {size / 2 ** 20:>9.1f} {size / count:>11.0f} {elapsed:>8.2f} {read:>11.2f}")
+        conn.close()
+        print(f"{'':>9} {'':>8} compact uses {results['compact'] / results['pydantic']:.0%} of the memory")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,13 @@ import tkinter as tk
 import uuid
 import json
 import os
-import shutil
-from task_manager import TaskManager, Task
-from storage import Storage
+import threading
+from task_manager import TaskManager, Task, STATUS_STRINGS, task_status_code, trusted_task
+from storage import Storage, TASK_COLUMNS
+from scanner import FolderScanner, FileIndex
+from organizer import find_misplaced_files, MoveEngine, OrganizeJobs, AutoOrganizer
+from reminders import ReminderEngine
+from changes import ChangeFeed
 from datetime import datetime
 from tkinter import filedialog
 
@@ -14,17 +18,87 @@ class DateTimeEncoder(json.JSONEncoder):
             return obj.strftime('%Y-%m-%d')  # Only return YYYY-MM-DD
         return super().default(obj)
 
+def task_row_to_dict(row):
+    """Builds the frontend task dict straight from a tasks row, without going through pydantic"""
+    id, title, description, due_date, completed, in_progress, pending, priority = row
+    status_code = 2 if completed else 1 if in_progress else 0
+    return {
+        "id": id,
+        "title": title,
+        "description": description,
+        "due_date": due_date,
+        "completed": bool(completed),
+        "inProgress": bool(in_progress),
+        "pending": bool(pending),
+        "priority": priority,
+        "status": STATUS_STRINGS[status_code],
+        "status_code": status_code
+    }
+
+def parse_due_date(due_date):
+    """Parses a due date from the frontend, keeping only the date part to avoid timezone issues"""
+    if not due_date:
+        return None
+    if 'T' in due_date:
+        due_date = due_date.split('T')[0]
+    elif ' ' in due_date:
+        due_date = due_date.split(' ')[0]
+    return datetime.fromisoformat(due_date)
+
+def task_db_values(task):
+    """A task's values in tasks-table column order (id first)"""
+    return (
+        task.id, task.title, task.description, task.due_date.strftime('%Y-%m-%d') if task.due_date else None,
+        1 if task.completed else 0, 1 if task.inProgress else 0, 1 if task.pending else 0, task.priority
+    )
+
+def task_to_dict(task):
+    return task_row_to_dict(task_db_values(task))
+
 class TaskAPI:
+    # Largest page query_tasks will return in one bridge call
+    MAX_QUERY_LIMIT = 500
+    # Task rows read per round trip while loading tasks at startup
+    LOAD_CHUNK_SIZE = 5000
+    # Load open tasks before the window can respond and completed ones on a background thread
+    LAZY_LOAD = True
+    # Where tasks live in memory; CompactTaskManager stores them column by column for very large boards
+    TASK_MANAGER = TaskManager
+
     def __init__(self):
-        self.task_manager = TaskManager()
+        self.task_manager = self.TASK_MANAGER()
         self.storage = Storage("tasks.db")  # To store our tasks
         
         # Organization rules as in-memory dictionary keyed by base folder path
         self.organization_rules = {}
         self.current_folder_path = None
+        # Lists folders on demand (and ahead of time when asked) for the Files view
+        self.folder_scanner = FolderScanner(file_index=FileIndex(self.storage))
+        # Moves files for organize runs and journals them so interrupted runs can be recovered
+        self.move_engine = MoveEngine(self.storage)
+        # Background organize runs started from the Files view
+        self.organize_jobs = OrganizeJobs(self.move_engine)
+        # Watches base folders and organizes files as they arrive, once turned on for a folder
+        self.auto_organizer = AutoOrganizer(
+            self.organize_jobs,
+            get_rules=lambda base_folder: self.organization_rules.get(base_folder, []),
+            on_organized=self._record_organize_run
+        )
         
+        # Ordered log of task, rule, activity and folder changes, pushed to the webview in batches
+        self.changes = ChangeFeed().start()
+        self.storage.activity_listeners.append(
+            lambda activities: self.changes.record_many("activity", "upsert", ((a["id"], a) for a in activities))
+        )
+
+        # The last dashboard snapshot built, reused until the storage data version moves on
+        self._dashboard_snapshot = None
+
         # Load tasks from database on startup
         self.load_tasks_from_db()
+
+        # Writes a reminder activity as each task's due date arrives
+        self.reminders = ReminderEngine(lambda: self.task_manager, self.storage).start()
     
     def get_all_tasks(self):
         tasks=[]
@@ -55,6 +129,62 @@ class TaskAPI:
             tasks.append(task_dict)
         return tasks
     
+    def query_tasks(self, filters=None, sort="due_date", offset=0, limit=50, cursor=None):
+        """
+        Returns one page of tasks, filtered and sorted by the database
+
+        Parameters:
+        - filters: Optional dict with any of status (code or list of codes), priority (value or list),
+          due_from / due_to (YYYY-MM-DD, inclusive) and search (matches title or description)
+        - sort: due_date, priority or title; prefix with "-" for descending order
+        - offset: Rows to skip (use cursor instead for deep pages)
+        - limit: Page size, at most MAX_QUERY_LIMIT
+        - cursor: next_cursor from the previous page, for keyset pagination
+
+        Returns:
+        A dictionary with the page of tasks, the total matching count and the cursor for the next page
+        """
+        try:
+            filters = filters or {}
+            descending = sort.startswith("-")
+            sort_field = sort.lstrip("-")
+            limit = max(1, min(int(limit), self.MAX_QUERY_LIMIT))
+            offset = max(0, int(offset))
+            after = tuple(json.loads(cursor)) if cursor else None
+
+            # Ask for one extra row so we know whether there is a next page
+            rows, total = self.storage.query_tasks(
+                status=filters.get("status"),
+                priority=filters.get("priority"),
+                due_from=filters.get("due_from"),
+                due_to=filters.get("due_to"),
+                search=filters.get("search"),
+                sort=sort_field,
+                descending=descending,
+                offset=offset,
+                limit=limit + 1,
+                after=after
+            )
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            next_cursor = None
+            if has_more:
+                last = task_row_to_dict(rows[-1])
+                next_cursor = json.dumps([last[sort_field], last["id"]])
+
+            return {
+                "tasks": [task_row_to_dict(row) for row in rows],
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+                "next_cursor": next_cursor
+            }
+        except Exception as e:
+            print(f"Error in query_tasks: {e}")
+            return None
+
     def get_recent_activities(self):
         try:
             activities = self.storage.get_recent_activities()
@@ -64,6 +194,15 @@ class TaskAPI:
             return None
 
 
+    def get_reminders(self):
+        """Reminder activities written as tasks came due, newest first"""
+        try:
+            return self.storage.get_recent_activities("reminder")
+        except Exception as e:
+            print(f"Error in get_reminders: {e}")
+            return []
+
+
     def get_latest_tasks(self):
         try:
             tasks = self.storage.get_latest_tasks()
@@ -88,6 +227,9 @@ class TaskAPI:
 
             return activity
         except Exception as e:
+            # Inside a unit of work the whole transaction has to fail, not commit without the activity
+            if self.storage.in_transaction:
+                raise
             print(f"There has been error with adding the activity in our database for dashboard purposes: {e}")
             return False
 
@@ -96,15 +238,7 @@ class TaskAPI:
         # 0: Pending, 1: In Progress, 2: Completed
         
         # Parse due_date in a timezone-safe way if present
-        parsed_due_date = None
-        if due_date:
-            # Strip any time component to avoid timezone issues
-            if 'T' in due_date:
-                due_date = due_date.split('T')[0]
-            elif ' ' in due_date:
-                due_date = due_date.split(' ')[0]
-            
-            parsed_due_date = datetime.fromisoformat(due_date)
+        parsed_due_date = parse_due_date(due_date)
         
         new_task = Task(
             id= str(uuid.uuid4()),
@@ -117,173 +251,418 @@ class TaskAPI:
             completed=(status == 2)
         )
         
-        # Add it to the task manager
-        self.task_manager.add_task(new_task)
+        # Save to database and log the activity in one transaction
+        with self.storage.transaction():
+            self.save_task_to_db(new_task)
 
-        # Save to database
-        self.save_task_to_db(new_task)
-    
-        # Add activity
-        self.add_activity(
-            id=str(uuid.uuid4()),
-            type="tasks",
-            title=f"Task created: {title}",
-            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            status="Pending",
-            due_date=due_date
-        )
+            self.add_activity(
+                id=str(uuid.uuid4()),
+                type="tasks",
+                title=f"Task created: {title}",
+                timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                status="Pending",
+                due_date=parsed_due_date.strftime('%Y-%m-%d') if parsed_due_date else None
+            )
+
+        # Add it to the task manager once it is saved, so a failed write leaves nothing behind
+        self.task_manager.add_task(new_task)
+        if parsed_due_date is not None:
+            self.reminders.notify()
+        self._tasks_changed([new_task])
     
-        # Return the task with status string for frontend
-        try:
-            task_dict = new_task.dict()  # For older Pydantic
-        except AttributeError:
-            task_dict = new_task.model_dump()  # For newer Pydantic
-        
-        # Convert datetime to string before sending to frontend - date only
-        if task_dict.get('due_date') and isinstance(task_dict['due_date'], datetime):
-            task_dict['due_date'] = task_dict['due_date'].strftime('%Y-%m-%d')
-        
-        # Convert status code to string for frontend
-        status_strings = {0: "Pending", 1: "In Progress", 2: "Completed"}
-        task_dict["status"] = status_strings.get(status, "Pending")
-        task_dict["status_code"] = status
-        return task_dict
+        # Return the task with status string for frontend, built the same way as the bulk endpoints
+        return task_to_dict(new_task)
+
+    def _get_task(self, task_id):
+        # A completed task may not be loaded yet; wait for the background load rather than report it missing
+        task = self.task_manager.get(task_id)
+        if task is None and not self.tasks_loaded.is_set():
+            self.tasks_loaded.wait()
+            task = self.task_manager.get(task_id)
+        return task
 
     def complete_task(self, task_id):
         # Mark a task as completed using UUID
-        for task in self.task_manager.list_tasks():
-            if task.id == task_id:
-                task.completed = True
-                task.inProgress = False
-                task.pending = False
-                
-                # Update in database
-                self.storage.increment_stat("tasks_completed")
-                self.update_task_in_db_by_id(task)
-                
-                return True
-        return False
+        task = self._get_task(task_id)
+        if task is None:
+            return False
+        fields = dict(completed=True, inProgress=False, pending=False)
+        
+        # Update in database in one transaction, on a copy so memory only changes once it commits
+        with self.storage.transaction():
+            self.storage.increment_stat("tasks_completed")
+            self.update_task_in_db_by_id(task.model_copy(update=fields))
+
+        task = self.task_manager.update(task_id, **fields)
+        if task is None:
+            return False
+        self._tasks_changed([task])
+        
+        return True
     
     def set_task_status(self, task_id, status):
         # Set the task status based on integer code using UUID
         # 0: Pending, 1: In Progress, 2: Completed
-        for task in self.task_manager.list_tasks():
-            if task.id == task_id:
-                # Update status flags
-                task.pending = (status == 0)
-                task.inProgress = (status == 1)
-                task.completed = (status == 2)
-
-                if status == 2:
-                    self.storage.increment_stat("tasks_completed")
-                
-                # Update in database
-                self.update_task_in_db_by_id(task)
-                
-                # Add activity
-                status_strings = {0: "Pending", 1: "In Progress", 2: "Completed"}
-                self.add_activity(
-                    id=str(uuid.uuid4()),
-                    type="tasks",
-                    title=f"Task status updated: {task.title}",
-                    timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    status=status_strings.get(status, "Pending"),
-                    due_date=task.due_date.strftime('%Y-%m-%d') if task.due_date else None
-                )
-                
-                return True
-        return False
+        task = self._get_task(task_id)
+        if task is None:
+            return False
+        fields = dict(pending=(status == 0), inProgress=(status == 1), completed=(status == 2))
+
+        # Stat, task row and activity are written in one transaction, before memory changes
+        with self.storage.transaction():
+            if status == 2:
+                self.storage.increment_stat("tasks_completed")
+
+            self.update_task_in_db_by_id(task.model_copy(update=fields))
+
+            self.add_activity(
+                id=str(uuid.uuid4()),
+                type="tasks",
+                title=f"Task status updated: {task.title}",
+                timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                status=STATUS_STRINGS.get(status, "Pending"),
+                due_date=task.due_date.strftime('%Y-%m-%d') if task.due_date else None
+            )
+
+        task = self.task_manager.update(task_id, **fields)
+        if task is None:
+            return False
+        self._tasks_changed([task])
+        
+        return True
     
     def update_task(self, task_id, title, description, due_date=None, priority=1, status=0):
         # Find the task with the given UUID
-        for task in self.task_manager.list_tasks():
-            if task.id == task_id:  # Using UUID instead of index
-                # Update task attributes
-                task.title = title if title != "" else task.title
-                task.description = description if description != "" else task.description
-                
-                # Parse due_date in a timezone-safe way if present
-                if due_date:
-                    # Strip any time component to avoid timezone issues
-                    if 'T' in due_date:
-                        due_date = due_date.split('T')[0]
-                    elif ' ' in due_date:
-                        due_date = due_date.split(' ')[0]
-                    
-                    task.due_date = datetime.fromisoformat(due_date)
-                else:
-                    task.due_date = None
-                
-                task.priority = priority if priority != 0 else task.priority
-                
-                # Update status flags based on integer code
-                # 0: Pending, 1: In Progress, 2: Completed
-                task.pending = (status == 0)
-                task.inProgress = (status == 1)
-                task.completed = (status == 2)
-                
-                # Update in database using UUID
-                self.update_task_in_db_by_id(task)
-                
-                # Return updated task with status string
-                try:
-                    task_dict = task.dict()  # For older Pydantic
-                except AttributeError:
-                    task_dict = task.model_dump()  # For newer Pydantic
-                
-                # Convert datetime to string before sending to frontend - date only
-                if task_dict.get('due_date') and isinstance(task_dict['due_date'], datetime):
-                    task_dict['due_date'] = task_dict['due_date'].strftime('%Y-%m-%d')
-                
-                # Convert status code back to string for frontend
-                status_strings = {0: "Pending", 1: "In Progress", 2: "Completed"}
-                task_dict["status"] = status_strings.get(status, "Pending")
-                task_dict["status_code"] = status
-                return task_dict
-        return None
+        task = self._get_task(task_id)
+        if task is None:
+            return None
+
+        # Parse due_date in a timezone-safe way if present
+        parsed_due_date = parse_due_date(due_date)
+
+        # New task attributes and status flags based on integer code
+        # 0: Pending, 1: In Progress, 2: Completed
+        fields = dict(
+            title=title if title != "" else task.title,
+            description=description if description != "" else task.description,
+            due_date=parsed_due_date,
+            priority=priority if priority != 0 else task.priority,
+            pending=(status == 0),
+            inProgress=(status == 1),
+            completed=(status == 2)
+        )
+        # Validated like a new task, and written before anything changes in memory
+        updated = Task(**{**task.model_dump(), **fields})
+        previous_due_date = task.due_date
+
+        # Update in database using UUID
+        self.update_task_in_db_by_id(updated)
+
+        task = self.task_manager.update(task_id, **fields)
+        if task is None:
+            return None
+        if task.due_date != previous_due_date:
+            self.reminders.notify()
+        self._tasks_changed([task])
+        
+        # Return updated task with status string
+        return task_to_dict(task)
     
     def update_task_in_db_by_id(self, task):
-        with self.storage.get_connection() as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE tasks SET title = ?, description = ?, due_date = ?, completed = ?, in_progress = ?, pending = ?, priority = ? WHERE id = ?",
-                (task.title, task.description, task.due_date.strftime('%Y-%m-%d') if task.due_date else None,
-                1 if task.completed else 0, 1 if task.inProgress else 0, 1 if task.pending else 0,
-                task.priority, task.id)
+                task_db_values(task)[1:] + (task.id,)
             )
-            conn.commit()
     
     def delete_task(self, task_id):
         # Remove a task using UUID
-        for task in self.task_manager.list_tasks():
-            if task.id == task_id:
-                self.task_manager.remove_task(task)
-                
-                # Delete from database using UUID
-                self.delete_task_from_db_by_id(task_id)
-                
-                return True
-        return False
+        if self._get_task(task_id) is None:
+            return False
+        
+        # Delete from database using UUID, then from memory once that has committed
+        self.delete_task_from_db_by_id(task_id)
+        task = self.task_manager.remove_by_id(task_id)
+        if task is None:
+            return False
+        if task.due_date is not None:
+            self.reminders.notify()
+        self._tasks_deleted([task_id])
+        
+        return True
 
     def delete_task_from_db_by_id(self, task_id):
-        with self.storage.get_connection() as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))  # Fixed: added comma to make it a tuple
-            conn.commit()
     
+    # Bulk operations: one bridge call and one transaction for many tasks.
+    # Each returns {"results": [...], "succeeded": n, "failed": n} with one result per input item, in order.
+
+    def add_tasks(self, tasks):
+        """Creates tasks from dicts with title, description, due_date, priority and status keys"""
+        results = []
+        new_tasks = []
+        # Validate everything first; invalid items are reported and skipped, the rest are written together
+        for index, item in enumerate(tasks):
+            try:
+                status = int(item.get("status", 0))
+                if status not in STATUS_STRINGS:
+                    raise ValueError(f"Invalid status: {status}")
+                task = Task(
+                    id=str(uuid.uuid4()),
+                    title=item.get("title"),
+                    description=item.get("description"),
+                    due_date=parse_due_date(item.get("due_date")),
+                    priority=item.get("priority", 1),
+                    pending=(status == 0),
+                    inProgress=(status == 1),
+                    completed=(status == 2)
+                )
+                if not task.title.strip():
+                    raise ValueError("Title is required")
+                new_tasks.append(task)
+                results.append({"index": index, "ok": True, "task": task})
+            except Exception as e:
+                results.append({"index": index, "ok": False, "error": str(e)})
+
+        if new_tasks:
+            try:
+                with self.storage.transaction() as conn:
+                    conn.executemany(
+                        "INSERT INTO tasks (id, title, description, due_date, completed, in_progress, pending, priority) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [task_db_values(task) for task in new_tasks]
+                    )
+                    self.add_activity(
+                        id=str(uuid.uuid4()),
+                        type="tasks",
+                        title=f"Tasks created: {len(new_tasks)} tasks",
+                        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        status="Pending"
+                    )
+            except Exception as e:
+                print(f"Error in add_tasks: {e}")
+                return self._bulk_failed(results, e)
+
+            for task in new_tasks:
+                self.task_manager.add_task(task)
+            if any(task.due_date is not None for task in new_tasks):
+                self.reminders.notify()
+            self._tasks_changed(new_tasks)
+
+        for result in results:
+            if result["ok"]:
+                result["task"] = task_to_dict(result["task"])
+        return self._bulk_summary(results)
+
+    def update_tasks(self, updates):
+        """
+        Updates tasks from dicts with an id plus any of title, description, due_date, priority and status.
+        Only the keys given are changed.
+        """
+        results = []
+        changes = []
+        seen = set()
+        for index, item in enumerate(updates):
+            task_id = item.get("id")
+            try:
+                # Each copy would be checked against the same old task, so only the last would stick
+                # and a completion would count twice; send one update per task
+                if task_id in seen:
+                    raise ValueError(f"Task appears more than once in this batch: {task_id}")
+                seen.add(task_id)
+                task = self._get_task(task_id)
+                if task is None:
+                    raise LookupError(f"Task not found: {task_id}")
+                fields = {}
+                if "title" in item:
+                    if not str(item["title"]).strip():
+                        raise ValueError("Title is required")
+                    fields["title"] = str(item["title"])
+                if "description" in item:
+                    fields["description"] = item["description"]
+                if "due_date" in item:
+                    fields["due_date"] = parse_due_date(item["due_date"])
+                if "priority" in item:
+                    fields["priority"] = int(item["priority"])
+                if "status" in item:
+                    status = int(item["status"])
+                    if status not in STATUS_STRINGS:
+                        raise ValueError(f"Invalid status: {status}")
+                    fields.update(pending=(status == 0), inProgress=(status == 1), completed=(status == 2))
+                # Build the updated task as a new, validated Task so nothing changes in memory unless
+                # the write succeeds (model_copy would skip validation)
+                updated = Task(**{**task.model_dump(), **fields})
+                changes.append((task, updated, fields))
+                results.append({"id": task_id, "ok": True, "task": updated})
+            except Exception as e:
+                results.append({"id": task_id, "ok": False, "error": str(e)})
+
+        if changes:
+            newly_completed = sum(1 for task, updated, _ in changes if updated.completed and not task.completed)
+            try:
+                with self.storage.transaction() as conn:
+                    conn.executemany(
+                        "UPDATE tasks SET title = ?, description = ?, due_date = ?, completed = ?, in_progress = ?, pending = ?, priority = ? WHERE id = ?",
+                        [task_db_values(updated)[1:] + (updated.id,) for _, updated, _ in changes]
+                    )
+                    if newly_completed:
+                        self.storage.increment_stat("tasks_completed", newly_completed)
+                    self.add_activity(
+                        id=str(uuid.uuid4()),
+                        type="tasks",
+                        title=f"Tasks updated: {len(changes)} tasks",
+                        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        status="Completed"
+                    )
+            except Exception as e:
+                print(f"Error in update_tasks: {e}")
+                return self._bulk_failed(results, e)
+
+            due_changed = False
+            for task, updated, fields in changes:
+                due_changed = due_changed or updated.due_date != task.due_date
+                self.task_manager.update(task.id, **fields)
+            if due_changed:
+                self.reminders.notify()
+            self._tasks_changed([task for task, _, _ in changes])
+
+        for result in results:
+            if result["ok"]:
+                result["task"] = task_to_dict(result["task"])
+        return self._bulk_summary(results)
+
+    def set_tasks_status(self, task_ids, status):
+        """Sets the same status on many tasks; completing counts towards tasks_completed once per task"""
+        try:
+            status = int(status)
+            if status not in STATUS_STRINGS:
+                raise ValueError(f"Invalid status: {status}")
+        except Exception as e:
+            return self._bulk_summary([{"id": task_id, "ok": False, "error": str(e)} for task_id in task_ids])
+
+        results = []
+        found = []
+        seen = set()
+        for task_id in task_ids:
+            if task_id in seen:
+                results.append({"id": task_id, "ok": False, "error": f"Task appears more than once in this batch: {task_id}"})
+                continue
+            task = self._get_task(task_id)
+            if task is None:
+                results.append({"id": task_id, "ok": False, "error": f"Task not found: {task_id}"})
+            else:
+                seen.add(task_id)
+                found.append(task)
+                results.append({"id": task_id, "ok": True})
+
+        if found:
+            newly_completed = sum(1 for task in found if status == 2 and not task.completed)
+            flags = (1 if status == 2 else 0, 1 if status == 1 else 0, 1 if status == 0 else 0)
+            try:
+                with self.storage.transaction() as conn:
+                    conn.executemany(
+                        "UPDATE tasks SET completed = ?, in_progress = ?, pending = ? WHERE id = ?",
+                        [flags + (task.id,) for task in found]
+                    )
+                    if newly_completed:
+                        self.storage.increment_stat("tasks_completed", newly_completed)
+                    self.add_activity(
+                        id=str(uuid.uuid4()),
+                        type="tasks",
+                        title=f"Task status updated: {len(found)} tasks",
+                        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        status=STATUS_STRINGS[status]
+                    )
+            except Exception as e:
+                print(f"Error in set_tasks_status: {e}")
+                return self._bulk_failed(results, e)
+
+            for task in found:
+                self.task_manager.update(task.id, pending=(status == 0), inProgress=(status == 1), completed=(status == 2))
+            self._tasks_changed(found)
+
+        return self._bulk_summary(results)
+
+    def delete_tasks(self, task_ids):
+        results = []
+        found = []
+        seen = set()
+        for task_id in task_ids:
+            if task_id in seen:
+                results.append({"id": task_id, "ok": False, "error": f"Task appears more than once in this batch: {task_id}"})
+                continue
+            task = self._get_task(task_id)
+            if task is None:
+                results.append({"id": task_id, "ok": False, "error": f"Task not found: {task_id}"})
+            else:
+                seen.add(task_id)
+                found.append(task)
+                results.append({"id": task_id, "ok": True})
+
+        if found:
+            try:
+                with self.storage.transaction() as conn:
+                    conn.executemany("DELETE FROM tasks WHERE id = ?", [(task.id,) for task in found])
+            except Exception as e:
+                print(f"Error in delete_tasks: {e}")
+                return self._bulk_failed(results, e)
+
+            for task in found:
+                self.task_manager.remove_by_id(task.id)
+            if any(task.due_date is not None for task in found):
+                self.reminders.notify()
+            self._tasks_deleted([task.id for task in found])
+
+        return self._bulk_summary(results)
+
+    # Change feed entries for tasks, recorded once the write has committed and the task manager has
+    # the change. The commit already moved the data version on, but the pending count comes from the
+    # task manager, so a dashboard snapshot built between the two would be cached under the new
+    # version with the old count; moving the version on again here makes the next call rebuild it.
+
+    def _tasks_changed(self, tasks):
+        self.storage.bump_data_version()
+        self.changes.record_many("task", "upsert", ((task.id, task_to_dict(task)) for task in tasks))
+
+    def _tasks_deleted(self, task_ids):
+        self.storage.bump_data_version()
+        self.changes.record_many("task", "delete", ((task_id, None) for task_id in task_ids))
+
+    def changes_since(self, seq=0):
+        """Task, rule, activity and folder changes after seq, for pulling instead of waiting for a push"""
+        try:
+            return self.changes.changes_since(int(seq))
+        except Exception as e:
+            print(f"Error in changes_since: {e}")
+            return None
+
+    @staticmethod
+    def _bulk_summary(results):
+        succeeded = sum(1 for result in results if result["ok"])
+        return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+    @staticmethod
+    def _bulk_failed(results, error):
+        # The transaction rolled back, so items that passed validation weren't written either
+        for result in results:
+            if result["ok"]:
+                result.pop("task", None)
+                result.update(ok=False, error=str(error))
+        return TaskAPI._bulk_summary(results)
+
     # Database operations
     def save_task_to_db(self, task):
-        with self.storage.get_connection() as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO tasks (id, title, description, due_date, completed, in_progress, pending, priority) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (task.id, task.title, task.description, task.due_date.strftime('%Y-%m-%d') if task.due_date else None, 
-                 1 if task.completed else 0, 1 if task.inProgress else 0, 1 if task.pending else 0, task.priority)
+                task_db_values(task)
             )
-            conn.commit()
     
     def update_task_in_db(self, task):
-        with self.storage.get_connection() as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE tasks SET title = ?, description = ?, due_date = ?, completed = ?, in_progress = ?, pending = ?, priority = ? WHERE title = ? AND description = ?",
@@ -291,39 +670,80 @@ class TaskAPI:
                  1 if task.completed else 0, 1 if task.inProgress else 0, 1 if task.pending else 0, 
                  task.priority, task.title, task.description)
             )
-            conn.commit()
     
     def delete_task_from_db(self, task):
-        with self.storage.get_connection() as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "DELETE FROM tasks WHERE title = ? AND description = ?",
                 (task.title, task.description)
             )
-            conn.commit()
     
-    def load_tasks_from_db(self):
+    def load_tasks_from_db(self, lazy=None):
+        """
+        Replaces the task manager with every task in the database
+
+        The rows come from our own tasks table, so tasks are built without validation. With lazy
+        loading (LAZY_LOAD by default) only open tasks are loaded before this returns; completed
+        ones are added on a background thread and tasks_loaded is set once they are all in. Tasks the
+        API adds or changes in the meantime are kept over the rows the background thread reads, tasks
+        it deletes stay deleted, and a call for a task that isn't loaded yet waits for the load.
+        """
+        lazy = self.LAZY_LOAD if lazy is None else lazy
+        self.tasks_loaded = threading.Event()
+        # "+completed" keeps SQLite from using the status index, so rows still come back in the order they were added
+        query = f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks"
+        task_manager = self.TASK_MANAGER()
+        self._load_task_rows(task_manager, query + (" WHERE +completed = 0" if lazy else ""))
+        self.task_manager = task_manager
+        self._tasks_reloaded()
+
+        if lazy:
+            task_manager.begin_background_load()
+            threading.Thread(
+                target=self._load_remaining_tasks,
+                args=(task_manager, query + " WHERE +completed != 0", self.tasks_loaded),
+                name="task-loader",
+                daemon=True
+            ).start()
+        else:
+            self.tasks_loaded.set()
+
+    def _load_remaining_tasks(self, task_manager, query, loaded):
+        try:
+            # API calls are changing this manager meanwhile; each chunk is merged under its lock
+            self._load_task_rows(task_manager, query, keep_existing=True)
+            self._tasks_reloaded()
+        except Exception as e:
+            print(f"Error loading tasks: {e}")
+        finally:
+            task_manager.finish_background_load()
+            loaded.set()
+
+    def _load_task_rows(self, task_manager, query, keep_existing=False):
+        # Many tasks share a due date, so each distinct one is parsed once
+        due_dates = {}
         with self.storage.get_connection() as conn:
-            cursor = conn.cursor()
-            # Include id column in query
-            cursor.execute("SELECT id, title, description, due_date, completed, in_progress, pending, priority FROM tasks")
-            tasks_data = cursor.fetchall()
-            
-            # Clear current tasks
-            self.task_manager = TaskManager()
-            
-            # Add each loaded task to the task manager with UUID
-            for id, title, description, due_date, completed, in_progress, pending, priority in tasks_data:
-                self.task_manager.add_task(Task(
-                    id=id,  # Store the UUID
-                    title=title,
-                    description=description,
-                    due_date=datetime.fromisoformat(due_date) if due_date else None,
-                    completed=bool(completed),
-                    inProgress=bool(in_progress),
-                    pending=bool(pending),
-                    priority=priority
-                ))
+            cursor = conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(self.LOAD_CHUNK_SIZE)
+                if not rows:
+                    break
+                tasks = []
+                for id, title, description, due_date, completed, in_progress, pending, priority in rows:
+                    if due_date:
+                        parsed = due_dates.get(due_date)
+                        if parsed is None:
+                            parsed = due_dates[due_date] = datetime.fromisoformat(due_date)
+                    else:
+                        parsed = None
+                    tasks.append(trusted_task(id, title, description, parsed, completed, in_progress, pending, priority))
+                task_manager.load_tasks(tasks, keep_existing=keep_existing)
+
+    def _tasks_reloaded(self):
+        # Nothing was written, but every task just changed as far as the dashboard is concerned
+        self.storage.bump_data_version()
+        self.changes.record("task", "reset", None)
     
     # Folder Operations
 
@@ -349,80 +769,40 @@ class TaskAPI:
             print(f"Error in select_folder: {e}")
             return None
 
-    def scan_folder(self, folder_path):
-        """Scans a folder and returns its contents"""
+    def scan_folder(self, folder_path, depth=None, prefetch=False):
+        """
+        Scans a folder and returns its contents
+
+        Parameters:
+        - folder_path: Folder to scan
+        - depth: How many levels to list (1 returns only the folder's own entries); None walks the whole tree
+        - prefetch: List the next level of unexpanded folders in the background so expand_folder is instant
+
+        Folders that were not listed come back with "loaded": False and can be opened with expand_folder.
+        """
                 
         if not os.path.exists(folder_path):
             print(f"Folder does not exist: {folder_path}")
             return []
         
         try:
-            # Function to get file size in a human-readable format
-            def get_human_readable_size(size_bytes):
-                # Convert size to readable format (KB, MB, etc.)
-                for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                    if size_bytes < 1024.0:
-                        return f"{size_bytes:.1f} {unit}"
-                    size_bytes /= 1024.0
-                return f"{size_bytes:.1f} PB"
-            
-            # Function to get file extension
-            def get_file_extension(filename):
-                # Get file extension (e.g., '.txt', '.jpg')
-                _, ext = os.path.splitext(filename)
-                return ext.lower()
-                
-            # Recursive function to scan a directory
-            def scan_directory(dir_path):
-                items = []
-                
-                try:
-                    # List all files and folders in the directory
-                    with os.scandir(dir_path) as entries:
-                        for entry in entries:
-                            item_id = str(uuid.uuid4())
-                            
-                            if entry.is_dir():
-                                # it's a folder
-                                children = scan_directory(entry.path)
-                                items.append({
-                                    "id": f"folder-{item_id}",
-                                    "name": entry.name,
-                                    "type": "folder",
-                                    "path": entry.path,
-                                    "children": children
-                                })
-                            else:
-                                # it's a file
-                                try:
-                                    size = get_human_readable_size(entry.stat().st_size)
-                                    extension = get_file_extension(entry.name)
-                                    
-                                    items.append({
-                                        "id": f"file-{item_id}",
-                                        "name": entry.name,
-                                        "type": "file",
-                                        "path": entry.path,
-                                        "size": size,
-                                        "extension": extension
-                                    })
-                                except Exception as e:
-                                    print(f"Error processing file {entry.path}: {e}")
-                except PermissionError:
-                    print(f"Permission denied accessing: {dir_path}")
-                except Exception as e:
-                    print(f"Error scanning directory {dir_path}: {e}")
-                
-                return items
-                
-            # Start the scan from the root folder
-            result = scan_directory(folder_path)
-            return result
-            
+            return self.folder_scanner.scan(folder_path, depth, prefetch)
         except Exception as e:
             print(f"Error in scan_folder: {e}")
             return []
-        
+
+    def expand_folder(self, node_path, depth=1, prefetch=True):
+        """Returns the contents of one folder from a lazy scan_folder tree"""
+        if not os.path.isdir(node_path):
+            print(f"Folder does not exist: {node_path}")
+            return []
+
+        try:
+            return self.folder_scanner.expand(node_path, depth, prefetch)
+        except Exception as e:
+            print(f"Error in expand_folder: {e}")
+            return []
+
     # Organization Rules Operations
 
     def add_organization_rule(self, base_folder_directory: str, folder_name: str, desired_folder_directory: str, extensions: list[str]) -> dict:
@@ -477,6 +857,7 @@ class TaskAPI:
             
             # Add to in-memory rules
             self.organization_rules[base_folder_directory].append(rule)
+            self.changes.record("rule", "upsert", rule_id, rule)
 
             return rule
         
@@ -494,8 +875,21 @@ class TaskAPI:
         
         rules = self.organization_rules[base_folder]
         self.organization_rules[base_folder] = [rule for rule in rules if rule["id"] != rule_id]
+        self.changes.record("rule", "delete", rule_id)
 
         return True
+
+    def set_organization_rule_enabled(self, rule_id, enabled, base_folder=None):
+        """Turns a rule on or off without deleting it; find_misplaced and auto-organize skip disabled rules"""
+        if base_folder is None:
+            base_folder = self.current_folder_path
+
+        for rule in self.organization_rules.get(base_folder, []):
+            if rule["id"] == rule_id:
+                rule["enabled"] = bool(enabled)
+                self.changes.record("rule", "upsert", rule_id, rule)
+                return rule
+        return None
     
     def clear_organization_rules(self, base_folder=None):
         """Clear all organization rules for the specified folder"""
@@ -503,42 +897,175 @@ class TaskAPI:
             base_folder = self.current_folder_path
         
         if base_folder in self.organization_rules:
-            self.organization_rules[base_folder] = []
+            removed, self.organization_rules[base_folder] = self.organization_rules[base_folder], []
+            self.changes.record_many("rule", "delete", ((rule["id"], None) for rule in removed))
             return True
         return False
     
+    def find_misplaced(self, base_folder, offset=0, limit=500):
+        """
+        Finds files under base_folder that belong in another folder according to its organization rules
+
+        Parameters:
+        - base_folder: Base folder directory (the scanned folder)
+        - offset / limit: Which page of misplaced files to return
+
+        Returns:
+        A dictionary with the page of misplaced files (ready for organize_files) and the total count
+        """
+        try:
+            if not os.path.isdir(base_folder):
+                print(f"Base folder doesn't exist: {base_folder}")
+                return None
+
+            rules = self.organization_rules.get(base_folder, [])
+            misplaced = find_misplaced_files(self.folder_scanner.file_index, base_folder, rules)
+
+            offset = max(0, int(offset))
+            limit = max(1, int(limit))
+            return {
+                "files": misplaced[offset:offset + limit],
+                "total": len(misplaced),
+                "offset": offset,
+                "limit": limit
+            }
+        except Exception as e:
+            print(f"Error in find_misplaced: {e}")
+            return None
+
     def organize_files(self, misplaced_files):
         """Organize files by moving them to their correct folders"""
         try:
-            for file in misplaced_files:
-                source_path = file['source_path']
-                destination_path = os.path.join(
-                    os.path.dirname(file['destination_path']),
-                    file['name']
+            result = self.move_engine.run(self._organize_moves(misplaced_files))
+            self._record_organize_run(result)
+            return result
+        except Exception as e:
+            print(f"Error in organize_files: {e}")
+            return None
+
+    def start_organize(self, misplaced_files):
+        """
+        Starts organizing files in the background
+
+        Returns:
+        A job id to pass to job_status / cancel_job
+        """
+        try:
+            return self.organize_jobs.start(self._organize_moves(misplaced_files), on_finish=self._record_organize_run).id
+        except Exception as e:
+            print(f"Error in start_organize: {e}")
+            return None
+
+    def job_status(self, job_id):
+        """
+        Returns an organize job's progress: moved, failed and remaining files, bytes moved and bytes/sec.
+        "done" is true once the job has completed, failed or been cancelled.
+        """
+        try:
+            return self.organize_jobs.status(job_id)
+        except Exception as e:
+            print(f"Error in job_status: {e}")
+            return None
+
+    def cancel_job(self, job_id):
+        """Stops an organize job once the moves already under way finish; files not reached stay put"""
+        return self.organize_jobs.cancel(job_id)
+
+    def start_auto_organize(self, base_folder=None):
+        """
+        Starts organizing new and changed files in the background as they appear
+
+        Parameters:
+        - base_folder: The folder to watch; None watches every folder that has organization rules
+
+        Returns:
+        The list of folders being watched
+        """
+        try:
+            folders = [base_folder] if base_folder is not None else list(self.organization_rules)
+            for folder in folders:
+                if not os.path.isdir(folder):
+                    print(f"Base folder doesn't exist: {folder}")
+                    continue
+                self.auto_organizer.start(folder)
+            return self.auto_organizer.watching()
+        except Exception as e:
+            print(f"Error in start_auto_organize: {e}")
+            return None
+
+    def stop_auto_organize(self, base_folder=None):
+        """Stops watching base_folder, or every folder when it's None"""
+        try:
+            if base_folder is None:
+                self.auto_organizer.close()
+            else:
+                self.auto_organizer.stop(base_folder)
+            return self.auto_organizer.watching()
+        except Exception as e:
+            print(f"Error in stop_auto_organize: {e}")
+            return None
+
+    def get_auto_organize_folders(self):
+        return self.auto_organizer.watching()
+
+    def _organize_moves(self, misplaced_files):
+        return [
+            (file['source_path'], os.path.join(os.path.dirname(file['destination_path']), file['name']))
+            for file in misplaced_files
+        ]
+
+    def get_interrupted_organize_runs(self):
+        """Organize runs that were cut short, e.g. by the app closing mid-run"""
+        try:
+            return self.storage.get_unfinished_move_runs()
+        except Exception as e:
+            print(f"Error in get_interrupted_organize_runs: {e}")
+            return []
+
+    def resume_organize_run(self, run_id):
+        try:
+            result = self.move_engine.resume(run_id)
+            if result is not None:
+                self._record_organize_run(result)
+            return result
+        except Exception as e:
+            print(f"Error in resume_organize_run: {e}")
+            return None
+
+    def rollback_organize_run(self, run_id):
+        try:
+            result = self.move_engine.rollback(run_id)
+            if result is not None:
+                self._folders_changed(result)
+                self.add_activity(
+                    id=str(uuid.uuid4()),
+                    type="organization",
+                    title=f"Organize undone: {result['moved']} files moved back",
+                    timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    status="Completed"
                 )
-                
-                # Create the destination directory if it doesn't exist
-                os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            return result
+        except Exception as e:
+            print(f"Error in rollback_organize_run: {e}")
+            return None
 
-                self.storage.increment_stat("files_organized")
-                
-                # Move the file
-                shutil.move(source_path, destination_path)
-            
-            # Add activity
+    def _folders_changed(self, result):
+        # An organize run reports the folders it touched, so a 10,000-file run is a handful of changes
+        self.changes.record_many("folder", "changed", ((folder, None) for folder in result.get("folders", ())))
+
+    def _record_organize_run(self, result):
+        self._folders_changed(result)
+        # One transaction for the stat and the activity
+        with self.storage.transaction():
+            self.storage.increment_stat("files_organized", result["moved"])
             self.add_activity(
                 id=str(uuid.uuid4()),
                 type="organization",
-                title=f"Files organized: {len(misplaced_files)} files moved",
+                title=f"Files organized: {result['moved']} files moved",
                 timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                status="Completed"
+                status="Completed" if result["success"] else "Failed"
             )
-            
-            return True
-        except Exception as e:
-            print(f"Error in organize_files: {e}")
-            return False
-    
+
     def update_organization_rule(self, rule_id: str, base_folder_directory: str, folder_name: str, desired_folder_directory: str, extensions: list[str]) -> dict:
         """
         Update an existing organization rule
@@ -589,6 +1116,7 @@ class TaskAPI:
                     }
 
                     self.organization_rules[base_folder_directory][index] = updated_rule
+                    self.changes.record("rule", "upsert", rule_id, updated_rule)
                 
                 else: 
                     print("We couldn't find that rule in the list. Please try again.")
@@ -608,8 +1136,8 @@ class TaskAPI:
         
             stats = self.storage.get_stats()
 
-            # directly get our pending tasks from the task maanger
-            pending_count = sum(1 for task in self.task_manager.list_tasks() if task.pending)
+            # directly get our pending tasks from the task manager's status index
+            pending_count = self.task_manager.count_by_status(0)
 
             stats["pending_tasks"] = pending_count
 
@@ -622,3 +1150,34 @@ class TaskAPI:
                 "pending_tasks": 0,
             }
     
+
+    def get_dashboard_snapshot(self, since_version=None):
+        """
+        Stats, recent activities and latest tasks for the dashboard in one call
+
+        Pass the version from the previous snapshot; if no write has been committed since then the
+        answer is just {"version", "modified": False}. Otherwise the snapshot is built once per data
+        version and handed to every caller until the next write.
+        """
+        try:
+            # Read the version before the data, so a write landing mid-build makes the next call rebuild
+            version = self.storage.data_version
+            if since_version == version:
+                return {"version": version, "modified": False}
+
+            snapshot = self._dashboard_snapshot
+            if snapshot is None or snapshot["version"] != version:
+                stats = self.storage.get_stats()
+                stats["pending_tasks"] = self.task_manager.count_by_status(0)
+                snapshot = {
+                    "version": version,
+                    "modified": True,
+                    "stats": stats,
+                    "recent_activities": self.storage.get_recent_activities(),
+                    "latest_tasks": self.storage.get_latest_tasks(),
+                }
+                self._dashboard_snapshot = snapshot
+            return snapshot
+        except Exception as e:
+            print(f"Error in get_dashboard_snapshot: {e}")
+            return None
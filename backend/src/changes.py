@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+# Flushed changes kept for changes_since(); a client further behind than this is told to reload
+CHANGE_LOG_SIZE = 10_000
+# Changes are held this long after the first one of a burst, so the whole burst goes out as one message
+PUSH_DELAY = 0.1
+# A single flush with more changes than this for one kind sends a "reset" for that kind instead
+MAX_CHANGES_PER_KIND = 500
+# The JS function the webview defines to receive pushed changes
+PUSH_CALLBACK = "window.__chronosChanges"
+
+
+class ChangeFeed:
+    """
+    An ordered log of changes (tasks, rules, activities, folders) for the frontend to apply as deltas
+
+    record() only queues a change keyed by (kind, key); recording the same key again before the next
+    flush replaces the queued change, so ten edits to one task send one. A worker thread flushes the
+    queue PUSH_DELAY after the first change arrives: every change gets the next sequence number, is
+    appended to the log and pushed to the webview as one batch. A kind with more changes than
+    MAX_CHANGES_PER_KIND in one flush is collapsed to a single "reset" telling the frontend to reload
+    it. changes_since(seq) serves the same log for pulling.
+    """
+
+    def __init__(self, push=None, delay=PUSH_DELAY, log_size=CHANGE_LOG_SIZE,
+                 max_changes_per_kind=MAX_CHANGES_PER_KIND):
+        # Called with each flushed batch (a list of change dicts); see attach()
+        self.push = push
+        self.delay = delay
+        self.max_changes_per_kind = max_changes_per_kind
+        self._log = deque(maxlen=log_size)
+        # Starts from the clock, like Storage's data version, so a seq a client kept from before a
+        # restart is always older than the new log and gets a reset instead of unrelated changes
+        self._seq = time.time_ns() // 1000
+        # (kind, key) -> change waiting for the next flush, oldest first
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def attach(self, window):
+        """Pushes every batch to a PyWebView window from now on"""
+        def push(changes):
+            window.evaluate_js(f"{PUSH_CALLBACK} && {PUSH_CALLBACK}({json.dumps(changes, default=str)})")
+        self.push = push
+        return self
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None:
+                return self
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Flushes whatever is queued and stops the worker"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def record(self, kind, op, key, data=None):
+        """Queues a change: op is "upsert", "delete" or "changed"; data is the new value when there is one"""
+        with self._condition:
+            # Drop and re-add so a key edited again moves to the end, after the changes it now follows
+            self._pending.pop((kind, key), None)
+            self._pending[(kind, key)] = {"kind": kind, "op": op, "key": key, "data": data}
+            self._condition.notify()
+
+    def record_many(self, kind, op, items):
+        """Queues one change per (key, data) pair under a single lock"""
+        with self._condition:
+            for key, data in items:
+                self._pending.pop((kind, key), None)
+                self._pending[(kind, key)] = {"kind": kind, "op": op, "key": key, "data": data}
+            self._condition.notify()
+
+    def changes_since(self, seq=0):
+        """
+        Every change after seq, oldest first, with the latest sequence number
+
+        "reset" is True when seq is older than the log goes back, from before a restart, or ahead of
+        the feed, in which case the client should reload everything and carry on from the returned seq.
+        """
+        with self._condition:
+            latest = self._seq
+            oldest = self._log[0]["seq"] if self._log else latest + 1
+            if seq > latest or seq < oldest - 1:
+                return {"seq": latest, "reset": seq != latest, "changes": []}
+            # Sequence numbers in the log are consecutive, so the start is an offset, not a search
+            changes = list(islice(self._log, seq - oldest + 1, None))
+        return {"seq": latest, "reset": False, "changes": changes}
+
+    def flush(self):
+        """Numbers, logs and pushes everything queued; returns the batch"""
+        with self._condition:
+            batch = self._take_batch()
+        if batch and self.push is not None:
+            try:
+                self.push(batch)
+            except Exception as e:
+                print(f"Error in change feed push: {e}")
+        return batch
+
+    def _take_batch(self):
+        pending = list(self._pending.values())
+        self._pending = {}
+        if not pending:
+            return []
+
+        counts = {}
+        for change in pending:
+            counts[change["kind"]] = counts.get(change["kind"], 0) + 1
+
+        batch = []
+        reset_sent = set()
+        for change in pending:
+            kind = change["kind"]
+            if counts[kind] > self.max_changes_per_kind:
+                if kind in reset_sent:
+                    continue
+                reset_sent.add(kind)
+                change = {"kind": kind, "op": "reset", "key": None, "data": None}
+            self._seq += 1
+            change["seq"] = self._seq
+            self._log.append(change)
+            batch.append(change)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running and not self._pending:
+                    return
+                # Let the rest of the burst arrive before sending
+                deadline = time.monotonic() + self.delay
+                while self._running:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self.flush()
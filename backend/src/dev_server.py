@@ -18,8 +18,19 @@ def main():
         js_api=task_api
     )
 
+    # Changes are pushed to the page as they happen
+    task_api.changes.attach(window)
+
     # Start the window with debugging enabled
     webview.start(debug=True)
 
+    # The window is closed, so stop background work and release the database connections
+    task_api.folder_scanner.close()
+    task_api.auto_organizer.close()
+    task_api.reminders.stop()
+    task_api.changes.stop()
+    task_api.organize_jobs.close()
+    task_api.storage.close()
+
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -22,21 +22,40 @@ class FileManager:
     def organize_by_extension(self):
         # Look at each file in the folder (like picking up each toy in a messy room)
         for file in self.watch_folder.iterdir():
-            # Check if it's a file and not a folder (is it a toy or a toy box?)
-            if file.is_file():
-                # Get the file's extension (like checking if it's a LEGO or a doll)
-                # The [1:] skips the dot, like in ".txt" we just want "txt"
-                # If there's no extension, call it 'no extension'
-                ext = file.suffix[1:] or 'no extension'
-                
-                # Create a folder for this type of file (like a special box for LEGOs)
-                ext_folder = self.watch_folder / ext
-                
-                # Make sure the folder exists (if we don't have a LEGO box, make one)
-                ext_folder.mkdir(exist_ok=True)
-                
-                # Move the file to its proper folder (put the LEGO in the LEGO box)
-                shutil.move(str(file), str(ext_folder / file.name)) 
+            self._organize_file(file)
+
+    # Sort just the files we're told about instead of the whole folder (only tidy the toys that were just dropped)
+    def organize_paths(self, paths):
+        moved = 0
+        for path in paths:
+            file = Path(path)
+            # Only files sitting directly in the watched folder get sorted, same as organize_by_extension
+            if file.parent != self.watch_folder:
+                continue
+            if self._organize_file(file):
+                moved += 1
+        return moved
+
+    def _organize_file(self, file):
+        # Check if it's a file and not a folder (is it a toy or a toy box?)
+        # It may also be gone already if it was moved or deleted since we heard about it
+        if not file.is_file():
+            return False
+
+        # Get the file's extension (like checking if it's a LEGO or a doll)
+        # The [1:] skips the dot, like in ".txt" we just want "txt"
+        # If there's no extension, call it 'no extension'
+        ext = file.suffix[1:] or 'no extension'
+        
+        # Create a folder for this type of file (like a special box for LEGOs)
+        ext_folder = self.watch_folder / ext
+        
+        # Make sure the folder exists (if we don't have a LEGO box, make one)
+        ext_folder.mkdir(exist_ok=True)
+        
+        # Move the file to its proper folder (put the LEGO in the LEGO box)
+        shutil.move(str(file), str(ext_folder / file.name))
+        return True
     
     
 
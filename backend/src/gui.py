@@ -34,8 +34,10 @@ class AutomationGUI:
         # Create our backend components - like giving our robot a brain and muscles
         self.task_manager = TaskManager()  # The brain that remembers all our tasks
         self.file_manager = None  # We'll create this when the user picks a folder to watch
-        self.task_scheduler = TaskScheduler()  # The clock that helps run tasks on time
         self.storage = Storage("tasks.db")  # The memory bank that saves tasks even when the app is closed
+        self.task_scheduler = TaskScheduler(storage=self.storage)  # The clock that helps run tasks on time (and remembers its alarms)
+        # Scheduled jobs are saved by action name, so the clock knows what to do with them after a restart
+        self.task_scheduler.register_action("complete_task", self.complete_scheduled_task)
         
         # Now let's call another method to build all the controls for our robot
         self.setup_ui()
@@ -226,9 +228,9 @@ class AutomationGUI:
         # Clear the current list
         self.schedule_listbox.delete(0, tk.END)
         
-        # Add each scheduled task to the listbox
-        for task_name, time in self.task_scheduler.scheduled_tasks.items():
-            self.schedule_listbox.insert(tk.END, f"{task_name} - {time}")
+        # Add each scheduled task to the listbox, including ones saved before the app was restarted
+        for job in self.task_scheduler.list_jobs():
+            self.schedule_listbox.insert(tk.END, f"{job['name']} - {job['schedule_time']}")
     
     # This method is called when the Schedule Task button is clicked
     def schedule_task(self):
@@ -260,17 +262,13 @@ class AutomationGUI:
             messagebox.showerror("Error", "Task not found!")
             return
         
-        # Create a function that will be called when the task is scheduled
-        def scheduled_action():
-            # Mark the task as completed
-            selected_task.completed = True
-            # Update the task listbox (must use after to run in the main thread)
-            self.root.after(0, self.update_task_list)
-            # Show a message (must use after to run in the main thread)
-            self.root.after(0, lambda: messagebox.showinfo("Scheduled Task", f"Task '{task_title}' has been completed!"))
-        
-        # Add the task to the scheduler
-        self.task_scheduler.add_scheduled_task(scheduled_action, schedule_time)
+        # Add the task to the scheduler; it calls complete_scheduled_task with these arguments when it's time
+        self.task_scheduler.add_scheduled_task(
+            "complete_task",
+            schedule_time,
+            name=task_title,
+            args={"task_id": selected_task.id, "task_title": task_title}
+        )
         
         # Update the schedule listbox
         self.update_schedule_listbox()
@@ -278,6 +276,28 @@ class AutomationGUI:
         # Show a success message
         messagebox.showinfo("Success", f"Task '{task_title}' scheduled for {schedule_time}!")
     
+    # This method is what a scheduled "complete_task" job does when its time comes
+    def complete_scheduled_task(self, task_id, task_title):
+        # Mark the task as completed
+        task = self.task_manager.update(task_id, completed=True, inProgress=False, pending=False)
+        if task is None:
+            # Tasks get new ids each time they're loaded, so a job saved before a restart won't find its
+            # task by id; look it up by title instead, the same way schedule_task picked it
+            for candidate in self.task_manager.list_tasks():
+                if candidate.title == task_title:
+                    task = self.task_manager.update(candidate.id, completed=True, inProgress=False, pending=False)
+                    break
+        if task is None:
+            # Show a message (must use after to run in the main thread)
+            self.root.after(0, lambda: messagebox.showwarning(
+                "Scheduled Task", f"Task '{task_title}' couldn't be completed: it's no longer in the task list."
+            ))
+            return
+        # Update the task listbox (must use after to run in the main thread)
+        self.root.after(0, self.update_task_list)
+        # Show a message (must use after to run in the main thread)
+        self.root.after(0, lambda: messagebox.showinfo("Scheduled Task", f"Task '{task_title}' has been completed!"))
+    
     # This method is called when the Start Scheduler button is clicked
     def start_scheduler(self):
         # Check if the scheduler is already running
@@ -449,36 +469,24 @@ class AutomationGUI:
         # Get the pattern from the entry field
         pattern_text = self.pattern_entry.get()
         
-        # Create a pattern object that can match file paths
-        class PatternMatcher:
-            def __init__(self, pattern):
-                # Convert glob pattern to regex pattern (*.txt becomes .*\.txt$)
-                regex_pattern = pattern.replace(".", "\\.").replace("*", ".*") + "$"
-                self.pattern = re.compile(regex_pattern)
-            
-            def match(self, path):
-                # Check if the file path matches our pattern
-                return self.pattern.search(path) is not None
-        
-        # Create a pattern matcher with our pattern
-        pattern = PatternMatcher(pattern_text)
-        
-        # Define what happens when a matching file is detected
-        def auto_organize_action(path):
-            # Only organize if the path is a file (not a folder)
-            if os.path.isfile(path):
-                # Use our file manager to organize files
-                self.file_manager.organize_by_extension()
+        # The glob (e.g. *.txt) is compiled together with the watcher's other rules by FolderWatcher
+        pattern = pattern_text
+        
+        # Define what happens when matching files are detected; the watcher hands over a whole burst at once
+        def auto_organize_action(paths):
+            # Only sort the files that changed instead of the whole folder
+            moved = self.file_manager.organize_paths(paths)
+            if moved:
                 # Show a message in the GUI (must use after to run in the main thread)
                 self.root.after(0, lambda: self.automation_status.config(
-                    text=f"Organized files after change to: {os.path.basename(path)}"
+                    text=f"Organized {moved} changed file(s), latest: {os.path.basename(paths[-1])}"
                 ))
         
         # Create an automation rule
-        rule = AutomationRule(pattern, auto_organize_action)
+        rule = AutomationRule(pattern, action=None, batch_action=auto_organize_action)
         
         # Create a folder watcher with our rule
-        self.folder_watcher = FolderWatcher([rule])
+        self.folder_watcher = FolderWatcher([rule]).start()
         
         # Create an observer to watch the folder
         self.observer = Observer()
@@ -499,6 +507,10 @@ class AutomationGUI:
         if hasattr(self, 'observer') and self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
+            self.folder_watcher.stop()
+
+        # Tell the scheduler thread to stop waiting for alarms
+        self.task_scheduler.stop()
         
         # Close the window
         self.root.destroy()
@@ -0,0 +1,529 @@
+# Import os - it lets us build paths to where files should go
+import errno
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from watchdog.observers import Observer
+
+from automation import AutomationRule, FolderWatcher
+from scanner import get_human_readable_size, get_file_extension
+
+# Threads used for cross-device moves, which have to copy the bytes
+COPY_WORKERS = 4
+# Journal updates are written in batches of this many moves
+JOURNAL_BATCH_SIZE = 500
+# Suffix for a cross-device copy that hasn't finished yet
+PARTIAL_SUFFIX = ".chronos-part"
+# Organize runs are queued onto this many background threads; one keeps runs from racing for the same files
+ORGANIZE_WORKERS = 1
+# Finished jobs kept around so their final status can still be read
+FINISHED_JOBS_KEPT = 32
+# Auto-organize waits this long between two size checks; a file whose size changed is still being written
+SETTLE_SECONDS = 1.0
+
+
+def compile_rules(rules):
+    """
+    Turns a folder's organization rules into an extension -> rule lookup
+
+    Disabled rules are skipped. When several rules list the same extension the first one wins,
+    just like checking the rules in order would.
+    """
+    lookup = {}
+    for rule in rules:
+        if not rule.get("enabled", True):
+            continue
+        for extension in rule["extensions"]:
+            lookup.setdefault(extension.lower(), rule)
+    return lookup
+
+
+def find_misplaced_files(file_index, base_folder, rules):
+    """
+    Walks base_folder once and returns every file sitting in the wrong folder for its extension
+
+    A file counts as misplaced when a rule claims its extension and the folder it is in isn't
+    named after that rule. Files directly inside base_folder are left alone, the same as the
+    Files view has always done.
+    """
+    lookup = compile_rules(rules)
+    if not lookup:
+        return []
+
+    base_folder = os.path.normpath(base_folder)
+    misplaced = []
+
+    for dir_path, rows in file_index.walk(base_folder):
+        if dir_path == base_folder:
+            continue
+
+        current_folder = os.path.basename(dir_path)
+        prefix = os.path.join(dir_path, "")
+        for name, is_dir, size, extension, *_ in rows:
+            if is_dir:
+                continue
+
+            rule = lookup.get(extension)
+            if rule is None or rule["folder_name"] == current_folder:
+                continue
+
+            path = prefix + name
+            misplaced.append({
+                "id": f"file-{uuid.uuid4()}",
+                "name": name,
+                "type": "file",
+                "path": path,
+                "size": get_human_readable_size(size),
+                "extension": extension,
+                "current_folder": current_folder,
+                "correct_folder": rule["folder_name"],
+                "source_path": path,
+                "destination_path": os.path.join(rule["full_path"], name)
+            })
+
+    return misplaced
+
+
+def copy_move(source, destination):
+    """
+    Moves a file across devices: copy next to the destination, swap it into place, then delete the source
+
+    The copy only takes the destination name once it is complete, so an interrupted copy never
+    looks like a finished move. A file that appears at the destination while the copy runs is
+    never replaced; the move fails with "Destination already exists" and the source stays put.
+    If the source can't be deleted afterwards the copy is taken away again and the move fails,
+    so a failed move always leaves one file, where it was.
+    """
+    partial = destination + PARTIAL_SUFFIX
+    try:
+        shutil.copy2(source, partial)
+        publish_copy(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    try:
+        os.remove(source)
+    except OSError as e:
+        try:
+            os.remove(destination)
+        except OSError:
+            raise OSError(e.errno, f"Copied, but neither the source nor the copy could be deleted: {e.strerror}") from e
+        raise
+
+
+def publish_copy(partial, destination):
+    # A hard link only succeeds if nothing has the destination name, so unlike os.replace it can't
+    # overwrite a file created since the existence check
+    try:
+        os.link(partial, destination)
+    except FileExistsError:
+        raise FileExistsError("Destination already exists") from None
+    except OSError:
+        # No hard links on this filesystem (FAT, some network shares). Windows' rename already refuses
+        # an existing destination; elsewhere the check just before it leaves only a tiny window
+        if os.path.exists(destination):
+            raise FileExistsError("Destination already exists") from None
+        try:
+            os.rename(partial, destination)
+        except FileExistsError:
+            raise FileExistsError("Destination already exists") from None
+        return
+    os.remove(partial)
+
+
+class MoveEngine:
+    """
+    Moves batches of files for organize runs
+
+    Moves are grouped by destination folder so each folder is created once, and renamed in place
+    when source and destination share a device. Cross-device moves fall back to copying on a
+    small thread pool. Every run is written to the move journal before the first file moves,
+    so a run cut short by a crash can be resumed or rolled back.
+    """
+
+    def __init__(self, storage, copy_workers=COPY_WORKERS, journal_batch_size=JOURNAL_BATCH_SIZE):
+        self.storage = storage
+        self.copy_workers = copy_workers
+        self.journal_batch_size = journal_batch_size
+
+    def run(self, moves, run_id=None, progress=None, cancel_event=None):
+        """
+        Moves every (source, destination) pair and returns a summary of the run
+
+        progress, when given, is called as progress(size_bytes, error) after each move; error is None
+        for a successful one. Setting cancel_event stops the run after the moves already under way.
+        """
+        run_id = run_id or str(uuid.uuid4())
+        planned = [(seq, source, destination) for seq, (source, destination) in enumerate(moves)]
+        self.storage.start_move_run(run_id, planned)
+        return self._execute(run_id, planned, progress, cancel_event)
+
+    def resume(self, run_id):
+        """Finishes the moves an interrupted run hadn't got to"""
+        journal = self.storage.get_move_journal(run_id)
+        if not journal:
+            return None
+        planned = [(seq, source, destination) for seq, source, destination, state in journal if state != "done"]
+        return self._execute(run_id, planned)
+
+    def rollback(self, run_id):
+        """Moves every file an interrupted run had already moved back where it came from"""
+        journal = self.storage.get_move_journal(run_id)
+        if not journal:
+            return None
+        # Pending moves may have happened before the crash without being journaled, so check those too
+        planned = [
+            (seq, destination, source)
+            for seq, source, destination, state in reversed(journal)
+            if state == "done" or (state == "pending" and not os.path.exists(source) and os.path.exists(destination))
+        ]
+        return self._execute(run_id, planned)
+
+    def _execute(self, run_id, planned, progress=None, cancel_event=None):
+        start = time.perf_counter()
+        moved = 0
+        bytes_moved = 0
+        errors = []
+        updates = []
+        cancelled = False
+        # Folders whose contents this run changed: sources moved out of and destinations created or moved into
+        folders = set()
+
+        def record(seq, source, size, error=None):
+            nonlocal moved, bytes_moved
+            if error is None:
+                moved += 1
+                bytes_moved += size
+                folders.add(os.path.dirname(source))
+                updates.append((seq, "done", None))
+            else:
+                errors.append({"source_path": source, "error": error})
+                updates.append((seq, "failed", error))
+            if len(updates) >= self.journal_batch_size:
+                self.storage.mark_moves(run_id, updates)
+                updates.clear()
+            if progress is not None:
+                progress(size, error)
+
+        # Group by destination folder so each one is created once
+        groups = {}
+        for move in planned:
+            groups.setdefault(os.path.dirname(move[2]), []).append(move)
+
+        copies = {}
+        with ThreadPoolExecutor(max_workers=self.copy_workers) as pool:
+            for dir_path, group in groups.items():
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                try:
+                    os.makedirs(dir_path, exist_ok=True)
+                except OSError as e:
+                    for seq, source, _ in group:
+                        record(seq, source, 0, str(e))
+                    continue
+                folders.add(dir_path)
+
+                for seq, source, destination in group:
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled = True
+                        break
+                    try:
+                        size = os.stat(source).st_size
+                    except FileNotFoundError:
+                        # Already moved, by an earlier attempt at this run or by someone else
+                        if os.path.exists(destination):
+                            record(seq, source, 0)
+                        else:
+                            record(seq, source, 0, "Source file no longer exists")
+                        continue
+                    if os.path.exists(destination):
+                        # Never overwrite: the file that's there couldn't be put back on rollback
+                        record(seq, source, size, "Destination already exists")
+                        continue
+                    try:
+                        os.rename(source, destination)
+                        record(seq, source, size)
+                    except OSError as e:
+                        if e.errno == errno.EXDEV:
+                            copies[pool.submit(copy_move, source, destination)] = (seq, source, size)
+                        else:
+                            record(seq, source, size, str(e))
+                if cancelled:
+                    break
+
+            for future in as_completed(copies):
+                if cancel_event is not None and cancel_event.is_set() and not cancelled:
+                    # Copies that haven't started are dropped; their files stay where they are
+                    cancelled = True
+                    for pending in copies:
+                        pending.cancel()
+                if future.cancelled():
+                    continue
+                seq, source, size = copies[future]
+                try:
+                    future.result()
+                    record(seq, source, size)
+                except Exception as e:
+                    record(seq, source, size, str(e))
+
+        if updates:
+            self.storage.mark_moves(run_id, updates)
+        # Failed and skipped moves leave their files where they were, so there's nothing left to recover
+        self.storage.finish_move_run(run_id)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "run_id": run_id,
+            "success": not errors and not cancelled,
+            "cancelled": cancelled,
+            "moved": moved,
+            "failed": len(errors),
+            "remaining": len(planned) - moved - len(errors),
+            "errors": errors,
+            "folders": sorted(folders),
+            "bytes_moved": bytes_moved,
+            "elapsed": elapsed,
+            "files_per_second": moved / elapsed if elapsed > 0 else 0.0,
+            "bytes_per_second": bytes_moved / elapsed if elapsed > 0 else 0.0
+        }
+
+
+class OrganizeJob:
+    """An organize run queued on OrganizeJobs, with live counts for the UI to poll"""
+
+    def __init__(self, moves):
+        self.id = str(uuid.uuid4())
+        self.moves = moves
+        self.status = "queued"
+        self.total = len(moves)
+        self.moved = 0
+        self.failed = 0
+        self.bytes_moved = 0
+        self.error = None
+        self.result = None
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    @property
+    def done(self):
+        return self.status not in ("queued", "running")
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def snapshot(self):
+        with self._lock:
+            if self.started_at is None:
+                elapsed = 0.0
+            else:
+                end = self.finished_at if self.finished_at is not None else time.monotonic()
+                elapsed = end - self.started_at
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "total": self.total,
+                "moved": self.moved,
+                "failed": self.failed,
+                "remaining": self.total - self.moved - self.failed,
+                "bytes_moved": self.bytes_moved,
+                "elapsed": round(elapsed, 3),
+                "bytes_per_second": self.bytes_moved / elapsed if elapsed > 0 else 0.0,
+                "errors": self.result["errors"] if self.result else [],
+                "error": self.error,
+                "done": self.done
+            }
+
+    def _progress(self, size_bytes, error):
+        with self._lock:
+            if error is None:
+                self.moved += 1
+                self.bytes_moved += size_bytes
+            else:
+                self.failed += 1
+
+    def _run(self, move_engine, on_finish):
+        with self._lock:
+            if self._cancelled.is_set():
+                # Cancelled while still queued: nothing was touched
+                self.status = "cancelled"
+                self.started_at = self.finished_at = time.monotonic()
+                return
+            self.status = "running"
+            self.started_at = time.monotonic()
+
+        status = "failed"
+        try:
+            self.result = move_engine.run(self.moves, run_id=self.id, progress=self._progress, cancel_event=self._cancelled)
+            status = "cancelled" if self.result["cancelled"] else "completed"
+            if on_finish is not None:
+                on_finish(self.result)
+        except Exception as e:
+            print(f"Error in organize job {self.id}: {e}")
+            self.error = str(e)
+        finally:
+            with self._lock:
+                self.status = status
+                self.finished_at = time.monotonic()
+
+
+class OrganizeJobs:
+    """Runs organize jobs on a background executor so the API thread returns straight away"""
+
+    def __init__(self, move_engine, workers=ORGANIZE_WORKERS, keep_finished=FINISHED_JOBS_KEPT):
+        self.move_engine = move_engine
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="organize")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, moves, on_finish=None):
+        """Queues a run over (source, destination) pairs; on_finish gets the run's result once it's done"""
+        job = OrganizeJob(moves)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(job._run, self.move_engine, on_finish)
+        return job
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.cancel()
+        return True
+
+    def close(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=False)
+
+    def _prune(self):
+        # Jobs are kept in start order, so the oldest finished ones go first
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+
+class AutoOrganizer:
+    """
+    Keeps base folders organized as files arrive
+
+    Runs one watchdog Observer per base folder. Created, modified and moved-in files reach us in
+    debounced batches from FolderWatcher, and only those paths are checked against the folder's
+    rules, so nothing is ever rescanned. A file is only moved once its size holds steady across
+    SETTLE_SECONDS; files still being written are queued again for a later batch. Each batch is
+    queued on OrganizeJobs like a run started from the Files view, so the two never move the same
+    files at once.
+    """
+
+    def __init__(self, organize_jobs, get_rules, on_organized=None, settle_time=SETTLE_SECONDS):
+        self.organize_jobs = organize_jobs
+        # Called with a base folder and returns its current rules, so rule edits apply straight away
+        self.get_rules = get_rules
+        # Called with each batch's MoveEngine result once its job has run
+        self.on_organized = on_organized
+        self.settle_time = settle_time
+        # Base folder -> (observer, watcher)
+        self._watches = {}
+        self._lock = threading.Lock()
+
+    def start(self, base_folder):
+        """Starts watching base_folder; returns False if it's already watched"""
+        with self._lock:
+            if base_folder in self._watches:
+                return False
+            watcher = FolderWatcher([
+                AutomationRule("*", None, batch_action=lambda paths: self._organize(base_folder, paths))
+            ]).start()
+            observer = Observer()
+            observer.schedule(watcher, base_folder, recursive=True)
+            observer.start()
+            self._watches[base_folder] = (observer, watcher)
+        return True
+
+    def stop(self, base_folder):
+        with self._lock:
+            watch = self._watches.pop(base_folder, None)
+        if watch is None:
+            return False
+        self._stop_watch(*watch)
+        return True
+
+    def watching(self):
+        with self._lock:
+            return list(self._watches)
+
+    def close(self):
+        with self._lock:
+            watches, self._watches = list(self._watches.values()), {}
+        for watch in watches:
+            self._stop_watch(*watch)
+
+    @staticmethod
+    def _stop_watch(observer, watcher):
+        observer.stop()
+        observer.join()
+        watcher.stop()
+
+    def _organize(self, base_folder, paths):
+        lookup = compile_rules(self.get_rules(base_folder))
+        if not lookup:
+            return
+
+        # Same test as find_misplaced_files: files directly in the base folder are left alone, and
+        # otherwise the extension has a rule and the file isn't in that rule's folder
+        base_folder = os.path.normpath(base_folder)
+        candidates = []
+        for path in paths:
+            dir_path = os.path.dirname(os.path.normpath(path))
+            if dir_path == base_folder:
+                continue
+            rule = lookup.get(get_file_extension(path))
+            if rule is None or os.path.basename(dir_path) == rule["folder_name"]:
+                continue
+            try:
+                candidates.append((path, rule, os.stat(path).st_size))
+            except OSError:
+                # Deleted or moved away since the event
+                continue
+        if not candidates:
+            return
+
+        # One wait covers the whole batch
+        time.sleep(self.settle_time)
+        moves = []
+        for path, rule, size in candidates:
+            try:
+                settled = os.stat(path).st_size == size
+            except OSError:
+                continue
+            if settled:
+                moves.append((path, os.path.join(rule["full_path"], os.path.basename(path))))
+            else:
+                self._requeue(base_folder, path)
+        if not moves:
+            return
+
+        self.organize_jobs.start(moves, on_finish=self.on_organized)
+
+    def _requeue(self, base_folder, path):
+        with self._lock:
+            watch = self._watches.get(base_folder)
+        if watch is not None:
+            watch[1].queue(path)
@@ -0,0 +1,122 @@
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from task_manager import STATUS_STRINGS, task_status_code
+
+# Never sleep longer than this in one go, so a wall-clock change (DST, the laptop waking up) is noticed
+MAX_SLEEP_SECONDS = 300.0
+# app_state key holding the time up to which reminders have been written
+WATERMARK_KEY = "reminders_fired_until"
+
+
+class ReminderEngine:
+    """
+    Writes a "reminder" activity when a task's due date arrives
+
+    Works off TaskManager's sorted due-date index (loaded from the tasks table), so finding the next
+    deadline is one bisect however many tasks there are. The thread sleeps until that deadline and is
+    woken with notify() whenever a task's due date is added, changed or removed. The time reminders
+    have been written up to is kept in app_state, so reminders that came due while the app was closed
+    are all written on the next start and none are written twice. The condition is only held to
+    sleep, never while reading tasks or writing to the database, so notify() never waits on a write.
+    """
+
+    def __init__(self, get_task_manager, storage, lead_time=timedelta(0)):
+        # A function returning the current TaskManager (TaskAPI swaps it out when reloading from the database)
+        self.get_task_manager = get_task_manager
+        self.storage = storage
+        # Remind this long before the due date
+        self.lead_time = lead_time
+        self._condition = threading.Condition()
+        self._running = False
+        # Set by notify() so a due-date change made while the thread is working isn't slept through
+        self._changed = False
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None:
+                return self
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def notify(self):
+        """Call after a due date is added, changed or removed so the next wake-up is worked out again"""
+        with self._condition:
+            self._changed = True
+            self._condition.notify()
+
+    def fire_due(self, now=None):
+        """Writes reminders for every task whose reminder time has passed since the last call; returns how many"""
+        now = now or datetime.now()
+        fired_until = self._load_watermark(now)
+        if now <= fired_until:
+            return 0
+
+        # Reminder time is due_date - lead_time, so tasks due in (fired_until, now] shifted by the lead time
+        start = fired_until + self.lead_time
+        end = now + self.lead_time
+        due = [
+            task for task in self.get_task_manager().tasks_due_between(start, end)
+            if task.due_date > start and not task.completed
+        ]
+
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+        with self.storage.transaction():
+            for task in due:
+                self.storage.add_activity({
+                    "id": str(uuid.uuid4()),
+                    "type": "reminder",
+                    "title": f"Task due: {task.title}",
+                    "timestamp": timestamp,
+                    "status": STATUS_STRINGS[task_status_code(task)],
+                    "due_date": task.due_date.strftime('%Y-%m-%d')
+                })
+            self.storage.set_state(WATERMARK_KEY, now.isoformat())
+        return len(due)
+
+    def next_reminder_at(self, now=None):
+        """When the next reminder is due, or None if no task has a due date still ahead"""
+        now = now or datetime.now()
+        next_due = self.get_task_manager().next_due_after(now + self.lead_time)
+        return next_due - self.lead_time if next_due is not None else None
+
+    def _load_watermark(self, now):
+        value = self.storage.get_state(WATERMARK_KEY)
+        if value is None:
+            # First run: start from now rather than reminding about every task that was ever due
+            self.storage.set_state(WATERMARK_KEY, now.isoformat())
+            return now
+        return datetime.fromisoformat(value)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                self._changed = False
+            try:
+                self.fire_due()
+                next_at = self.next_reminder_at()
+            except Exception as e:
+                print(f"Error in reminders: {e}")
+                next_at = None
+
+            # Sleep until the next deadline, or until a due date changes
+            timeout = MAX_SLEEP_SECONDS
+            if next_at is not None:
+                timeout = min(timeout, max(0.0, (next_at - datetime.now()).total_seconds()))
+            with self._condition:
+                if self._running and not self._changed:
+                    self._condition.wait(timeout)
@@ -0,0 +1,424 @@
+# Import os - it lets us list folders and read file details
+import os
+import itertools
+# Import threading so the prefetch cache can be shared safely between threads
+import threading
+import time
+from collections import OrderedDict, deque
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# How many listed directories the prefetch cache remembers
+PREFETCH_CACHE_SIZE = 512
+# How many background threads list folders ahead of the user
+PREFETCH_WORKERS = 2
+# How many directories a full scan lists at once; listing is I/O bound, so this helps most on slow or network drives
+SCAN_WORKERS = 8
+# A folder modified this recently may change again within the same mtime tick, so its listing isn't trusted yet
+RACY_WINDOW_NS = 2_000_000_000
+
+
+# Function to get file size in a human-readable format
+def get_human_readable_size(size_bytes):
+    # Convert size to readable format (KB, MB, etc.)
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.1f} PB"
+
+
+# Function to get file extension
+def get_file_extension(filename):
+    # Get file extension (e.g., '.txt', '.jpg')
+    _, ext = os.path.splitext(filename)
+    return ext.lower()
+
+
+# Item ids only need to be unique within this process, and a counter is far cheaper than a uuid per entry
+_item_ids = itertools.count()
+
+
+def make_folder_item(name, path, children=None):
+    # A folder whose children are None has not been listed yet; the frontend asks for them with expand_folder
+    return {
+        "id": f"folder-{next(_item_ids)}",
+        "name": name,
+        "type": "folder",
+        "path": path,
+        "children": children if children is not None else [],
+        "loaded": children is not None
+    }
+
+
+def make_file_item(name, path, size_bytes, extension=None):
+    return {
+        "id": f"file-{next(_item_ids)}",
+        "name": name,
+        "type": "file",
+        "path": path,
+        "size": get_human_readable_size(size_bytes),
+        "size_bytes": size_bytes,
+        "extension": extension if extension is not None else get_file_extension(name)
+    }
+
+
+def iter_directory(dir_path):
+    """Yields one level of a directory as scandir produces it: files with their sizes and unexpanded folders"""
+    try:
+        # List all files and folders in the directory
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # it's a folder
+                    yield make_folder_item(entry.name, entry.path)
+                else:
+                    # it's a file
+                    try:
+                        size = entry.stat().st_size
+                    except Exception as e:
+                        print(f"Error processing file {entry.path}: {e}")
+                        continue
+                    yield make_file_item(entry.name, entry.path, size)
+    except PermissionError:
+        print(f"Permission denied accessing: {dir_path}")
+    except Exception as e:
+        print(f"Error scanning directory {dir_path}: {e}")
+
+
+def list_directory(dir_path):
+    """Lists one level of a directory: files with their sizes and folders that are not expanded yet"""
+    return list(iter_directory(dir_path))
+
+
+def scan_tree(dir_path, depth=None, list_dir=list_directory):
+    """Scans a directory down to `depth` levels (None walks the whole tree)"""
+    items = list_dir(dir_path)
+
+    if depth is None or depth > 1:
+        next_depth = None if depth is None else depth - 1
+        for item in items:
+            if item["type"] == "folder":
+                item["children"] = scan_tree(item["path"], next_depth, list_dir)
+                item["loaded"] = True
+
+    return items
+
+
+def scan_tree_parallel(dir_path, depth=None, workers=SCAN_WORKERS, list_dir=list_directory):
+    """Same result as scan_tree, but subfolders are listed concurrently on a thread pool.
+    Every listing is attached to its own folder item, so the output order never depends on which thread finishes first."""
+    # Finished listings arrive here as (folder item or None for the root, levels left, future)
+    finished = queue.Queue()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as executor:
+        def submit(path, folder, remaining):
+            future = executor.submit(list_dir, path)
+            future.add_done_callback(lambda f: finished.put((folder, remaining, f)))
+
+        submit(dir_path, None, depth)
+        outstanding = 1
+        items = []
+
+        while outstanding:
+            folder, remaining, future = finished.get()
+            outstanding -= 1
+            listing = future.result()
+
+            if folder is None:
+                items = listing
+            else:
+                folder["children"] = listing
+                folder["loaded"] = True
+
+            if remaining is None or remaining > 1:
+                next_depth = None if remaining is None else remaining - 1
+                for item in listing:
+                    if item["type"] == "folder":
+                        submit(item["path"], item, next_depth)
+                        outstanding += 1
+
+        return items
+
+
+class FileIndex:
+    """Remembers directory listings in the database, keyed by path with each folder's mtime.
+    A rescan only re-lists folders whose mtime changed and serves the rest from the index.
+    Adding, removing or renaming entries changes a folder's mtime; rewriting a file in place
+    does not, so sizes of files edited in unchanged folders are refreshed on the folder's next change.
+    Only folder mtimes are kept: checking every file's would mean a stat per file, which is the
+    cost the index is there to avoid."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        # The last fully walked subtree kept in memory as (root, {dir: mtime}, {dir: rows}), so repeat scans
+        # in the same session skip the database read. It is only a cache: every folder's mtime is still checked.
+        self._memory = None
+        self._memory_lock = threading.Lock()
+
+    def scan(self, root_path, depth=None, workers=SCAN_WORKERS):
+        root_path = os.path.normpath(root_path)
+        snapshot = self._snapshot_for(root_path, depth)
+        index_pass = _IndexPass(self.storage, snapshot)
+
+        def list_dir(dir_path):
+            return self._make_items(dir_path, index_pass.rows(dir_path))
+
+        # Listing is I/O bound and worth spreading over threads, but serving remembered listings is pure
+        # Python work, so once the index knows this tree it is built on one thread and only the folders
+        # that changed are re-listed on the pool
+        index_is_warm = snapshot is not None and bool(snapshot[0])
+        if workers > 1 and depth != 1 and index_is_warm:
+            index_pass.preload(root_path, depth, workers)
+            items = scan_tree(root_path, depth, list_dir)
+        elif workers > 1 and depth != 1:
+            items = scan_tree_parallel(root_path, depth, workers, list_dir)
+        else:
+            items = scan_tree(root_path, depth, list_dir)
+
+        self._finish(index_pass)
+        return items
+
+    def walk(self, root_path, workers=SCAN_WORKERS):
+        """Yields (dir_path, rows) for every folder under root_path, breadth-first, without building tree items.
+        Rows are (name, is_dir, size, extension) tuples."""
+        root_path = os.path.normpath(root_path)
+        snapshot = self._snapshot_for(root_path, None)
+        index_pass = _IndexPass(self.storage, snapshot)
+        if workers > 1 and snapshot[0]:
+            index_pass.preload(root_path, None, workers)
+        pending = deque([root_path])
+        try:
+            while pending:
+                dir_path = pending.popleft()
+                rows = index_pass.rows(dir_path)
+                prefix = os.path.join(dir_path, "")
+                pending.extend(prefix + row[0] for row in rows if row[1])
+                yield dir_path, rows
+        finally:
+            self._finish(index_pass)
+
+    def _finish(self, index_pass):
+        if index_pass.fresh or index_pass.removed:
+            self.storage.save_file_index(index_pass.fresh, index_pass.removed)
+            if index_pass.snapshot is not None:
+                self._remember(index_pass.snapshot, index_pass.fresh, index_pass.removed)
+
+    def _snapshot_for(self, root_path, depth):
+        with self._memory_lock:
+            memory = self._memory
+        if memory is not None and (root_path == memory[0] or root_path.startswith(os.path.join(memory[0], ""))):
+            return memory[1], memory[2]
+        if depth is not None:
+            # Shallow scans of folders we haven't walked look each folder up in the database instead
+            return None
+        dir_mtimes, listings = self.storage.load_file_index(root_path)
+        with self._memory_lock:
+            self._memory = (root_path, dir_mtimes, listings)
+        return dir_mtimes, listings
+
+    def _remember(self, snapshot, fresh, removed):
+        dir_mtimes, listings = snapshot
+        with self._memory_lock:
+            for path in removed:
+                prefix = os.path.join(path, "")
+                for stale in [key for key in listings if key == path or key.startswith(prefix)]:
+                    del listings[stale]
+                for stale in [key for key in dir_mtimes if key == path or key.startswith(prefix)]:
+                    del dir_mtimes[stale]
+            for dir_path, mtime, rows in fresh:
+                dir_mtimes[dir_path] = mtime
+                listings[dir_path] = rows
+
+    @staticmethod
+    def _read_directory(dir_path):
+        # One row per entry: (name, is_dir, size, extension)
+        rows = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            rows.append((entry.name, 1, None, None))
+                        else:
+                            rows.append((entry.name, 0, entry.stat().st_size, get_file_extension(entry.name)))
+                    except Exception as e:
+                        print(f"Error processing file {entry.path}: {e}")
+        except PermissionError:
+            print(f"Permission denied accessing: {dir_path}")
+        except Exception as e:
+            print(f"Error scanning directory {dir_path}: {e}")
+        return rows
+
+    @staticmethod
+    def _make_items(dir_path, rows):
+        # Joining once per folder and concatenating names is much cheaper than os.path.join per entry
+        prefix = os.path.join(dir_path, "")
+        return [
+            make_folder_item(row[0], prefix + row[0]) if row[1] else make_file_item(row[0], prefix + row[0], row[2], row[3])
+            for row in rows
+        ]
+
+
+class _IndexPass:
+    """One walk over the index: serves remembered listings of unchanged folders and collects the ones that were re-listed"""
+
+    def __init__(self, storage, snapshot):
+        self.storage = storage
+        # ({dir: mtime}, {dir: rows}) preloaded for the walk, or None to look folders up one at a time
+        self.snapshot = snapshot
+        self.fresh = []
+        self.removed = []
+        self._lock = threading.Lock()
+        # Rows worked out ahead of the walk by preload(), taken out as the walk reaches each folder
+        self._preloaded = {}
+
+    def preload(self, root_path, depth, workers):
+        """Works out the rows of every folder down to `depth` a level at a time: each folder's mtime is
+        checked on this thread and the folders that changed are re-listed together on a thread pool"""
+        level = [root_path]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as executor:
+            while level and (depth is None or depth > 0):
+                changed = []
+                for dir_path in level:
+                    checked = self._check(dir_path)
+                    if checked is None:
+                        self._preloaded[dir_path] = []
+                    elif checked[0] == checked[1]:
+                        self._preloaded[dir_path] = checked[2]
+                    else:
+                        changed.append((dir_path, checked))
+                listings = executor.map(FileIndex._read_directory, [dir_path for dir_path, _ in changed])
+                for (dir_path, (mtime, _, rows)), new_rows in zip(changed, listings):
+                    self._preloaded[dir_path] = self._record(dir_path, mtime, rows, new_rows)
+
+                level = [
+                    os.path.join(dir_path, "") + row[0]
+                    for dir_path in level for row in self._preloaded[dir_path] if row[1]
+                ]
+                depth = None if depth is None else depth - 1
+
+    def rows(self, dir_path):
+        preloaded = self._preloaded.pop(dir_path, None)
+        if preloaded is not None:
+            return preloaded
+        checked = self._check(dir_path)
+        if checked is None:
+            return []
+        mtime, known_mtime, rows = checked
+        if known_mtime == mtime:
+            return rows
+        return self._record(dir_path, mtime, rows, FileIndex._read_directory(dir_path))
+
+    def _check(self, dir_path):
+        # (current mtime, remembered mtime, remembered rows), or None when the folder can't be read
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError as e:
+            print(f"Error scanning directory {dir_path}: {e}")
+            return None
+
+        if self.snapshot is not None:
+            known_mtime, rows = self.snapshot[0].get(dir_path), self.snapshot[1].get(dir_path, [])
+        else:
+            known_mtime, rows = self.storage.load_directory_index(dir_path)
+        return mtime, known_mtime, rows
+
+    def _record(self, dir_path, mtime, rows, new_rows):
+        # Keeps a re-listed folder's rows for saving, and notes subfolders that have gone
+        gone = {row[0] for row in rows if row[1]} - {row[0] for row in new_rows if row[1]}
+        trusted = time.time_ns() - mtime > RACY_WINDOW_NS
+        with self._lock:
+            self.fresh.append((dir_path, mtime if trusted else None, new_rows))
+            self.removed.extend(os.path.join(dir_path, name) for name in gone)
+        return new_rows
+
+
+class FolderScanner:
+    """Serves folder listings level by level, optionally listing subfolders in the background"""
+
+    def __init__(self, cache_size=PREFETCH_CACHE_SIZE, workers=PREFETCH_WORKERS, scan_workers=SCAN_WORKERS, file_index=None):
+        self.cache_size = cache_size
+        self.workers = workers
+        # Threads used to walk multi-level scans; 1 keeps the plain depth-first walk
+        self.scan_workers = scan_workers
+        # Optional FileIndex; when set, scans reuse remembered listings of unchanged folders
+        self.file_index = file_index
+        # Directory path -> (directory mtime, listing); entries are dropped once the folder changes
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def scan(self, folder_path, depth=None, prefetch=False):
+        if self.file_index is not None:
+            items = self.file_index.scan(folder_path, depth, self.scan_workers)
+        elif self.scan_workers > 1 and depth != 1:
+            items = scan_tree_parallel(folder_path, depth, self.scan_workers, self.list_directory)
+        else:
+            items = scan_tree(folder_path, depth, self.list_directory)
+        if prefetch:
+            self.prefetch(self._unloaded_folders(items))
+        return items
+
+    def expand(self, folder_path, depth=1, prefetch=False):
+        return self.scan(folder_path, depth, prefetch)
+
+    def list_directory(self, dir_path):
+        # Serve prefetched listings as long as the folder has not changed since it was listed
+        mtime = self._mtime(dir_path)
+        with self._lock:
+            cached = self._cache.pop(dir_path, None)
+        if cached is not None and mtime is not None and cached[0] == mtime:
+            return cached[1]
+        return list_directory(dir_path)
+
+    def prefetch(self, folder_paths):
+        if not folder_paths:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan-prefetch")
+        for path in folder_paths:
+            self._executor.submit(self._prefetch_one, path)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self._cache.clear()
+
+    def _prefetch_one(self, dir_path):
+        if self.file_index is not None:
+            # Refreshing the stored listing is enough: the next expand reads it back from the index
+            self.file_index.scan(dir_path, depth=1, workers=1)
+            return
+        mtime = self._mtime(dir_path)
+        if mtime is None:
+            return
+        items = list_directory(dir_path)
+        with self._lock:
+            self._cache[dir_path] = (mtime, items)
+            self._cache.move_to_end(dir_path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _unloaded_folders(items):
+        # Folders at the edge of what was returned, i.e. what the user can expand next
+        folders = []
+        stack = list(items)
+        while stack:
+            item = stack.pop()
+            if item["type"] == "folder":
+                if item["loaded"]:
+                    stack.extend(item["children"])
+                else:
+                    folders.append(item["path"])
+        return folders
+
+    @staticmethod
+    def _mtime(dir_path):
+        try:
+            return os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None
@@ -1,42 +1,586 @@
 # Import a tool that helps us work with dates and times (like a digital calendar)
-from datetime import datetime
+from datetime import datetime, timedelta
 
-# Import a special helper that lets us schedule tasks (like setting an alarm clock)
-import schedule
+# Import a heap - a pile that always keeps the next alarm to ring on top
+import heapq
+import functools
+import itertools
+import json
+import pickle
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-# Import a tool that lets our program wait or sleep (like taking a short nap) 
+# Import a tool that lets our program wait or sleep (like taking a short nap)
 import time
+import uuid
+
+# Never sleep longer than this in one go, so a wall-clock change (DST, the laptop waking up) is noticed
+MAX_SLEEP_SECONDS = 300.0
+# Rebuild the heap once more than this share of its entries belong to cancelled jobs
+STALE_HEAP_RATIO = 0.5
+# Threads (or processes) that run due jobs
+SCHEDULER_WORKERS = 4
+# What to do with runs that were missed, e.g. while the computer slept:
+# "skip" drops runs that are more than MISFIRE_GRACE_SECONDS late, "coalesce" runs once for all of them,
+# "catch_up" runs every missed slot (at most MAX_CATCH_UP_RUNS of them)
+MISFIRE_POLICIES = ("skip", "coalesce", "catch_up")
+MISFIRE_GRACE_SECONDS = 1.0
+MAX_CATCH_UP_RUNS = 100
+# Recent runs kept per job for the percentile stats
+RECENT_RUNS_KEPT = 100
+# With a job store, only jobs due within this many seconds are held in memory; later ones are loaded as time goes on
+LOAD_AHEAD_SECONDS = 3600.0
+
+
+def next_daily_run(schedule_time, after=None):
+    """Returns the next time.time() at which the clock reads schedule_time ("HH:MM"), strictly after `after`"""
+    after = after if after is not None else time.time()
+    hour, minute = (int(part) for part in schedule_time.split(":"))
+    moment = datetime.fromtimestamp(after)
+    run_at = moment.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at.timestamp() <= after:
+        run_at += timedelta(days=1)
+    return run_at.timestamp()
+
+
+def _timed_call(func):
+    # Runs on the worker (possibly in another process), so the timings come from where the job really ran
+    started = time.time()
+    error = None
+    try:
+        func()
+    except Exception as e:
+        error = str(e)
+    return started, time.time(), error
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+# The scoreboard for one job: how often it ran and how long it took
+class JobStats:
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.last_run = None
+        self.last_error = None
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+        self.recent_latency = deque(maxlen=RECENT_RUNS_KEPT)
+        self.recent_queue_delay = deque(maxlen=RECENT_RUNS_KEPT)
+
+    def record(self, due, started, finished, error):
+        latency = finished - started
+        # How long the run waited past its due time: scheduler wake-up, pool queue and concurrency limit together
+        queue_delay = max(0.0, started - due)
+        self.runs += 1
+        self.last_run = finished
+        if error is not None:
+            self.failures += 1
+            self.last_error = error
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_queue_delay += queue_delay
+        self.max_queue_delay = max(self.max_queue_delay, queue_delay)
+        self.recent_latency.append(latency)
+        self.recent_queue_delay.append(queue_delay)
+
+    def to_dict(self):
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+            "mean_latency": self.total_latency / self.runs if self.runs else None,
+            "max_latency": self.max_latency,
+            "p95_latency": _percentile(self.recent_latency, 0.95),
+            "mean_queue_delay": self.total_queue_delay / self.runs if self.runs else None,
+            "max_queue_delay": self.max_queue_delay,
+            "p95_queue_delay": _percentile(self.recent_queue_delay, 0.95)
+        }
+
+
+# A single alarm on our clock
+class ScheduledJob:
+    def __init__(self, func, next_run, interval=None, schedule_time=None, name=None,
+                 max_concurrency=1, misfire="coalesce", timeout=None, action=None, args=None, job_id=None):
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"Unknown misfire policy: {misfire}")
+        self.id = job_id or str(uuid.uuid4())
+        self.func = func
+        self.name = name or action or getattr(func, "__name__", "job")
+        # Jobs that call a registered action by name (with JSON-friendly args) can be saved and reloaded;
+        # jobs built around any other callable only live as long as the scheduler does
+        self.action = action
+        self.args = args or {}
+        # When the job should fire next, as a time.time() timestamp
+        self.next_run = next_run
+        # Repeat every `interval` seconds, every day at `schedule_time`, or neither for a one-off job
+        self.interval = interval
+        self.schedule_time = schedule_time
+        # How many runs of this job may be going at once; extra runs wait their turn (or are dropped for "skip")
+        self.max_concurrency = max_concurrency
+        self.misfire = misfire
+        # Seconds a run may take before it's written off as timed out and stops holding its concurrency slot
+        self.timeout = timeout
+        self.cancelled = False
+        self.stats = JobStats()
+        self.running = 0
+        # Due times of runs waiting for a free concurrency slot
+        self.waiting = deque()
+
+    def step(self, slot):
+        """The slot after `slot`, or None for one-off jobs"""
+        if self.schedule_time is not None:
+            return next_daily_run(self.schedule_time, slot)
+        if self.interval is not None:
+            return slot + self.interval
+        return None
+
+    def due_slots(self, now):
+        """
+        Every slot from next_run up to now, oldest first, and the first slot after now (None when there isn't one)
+
+        At most MAX_CATCH_UP_RUNS slots are returned; the rest are counted as skipped.
+        """
+        slots = []
+        dropped = 0
+        slot = self.next_run
+        while slot is not None and slot <= now:
+            if len(slots) == MAX_CATCH_UP_RUNS:
+                # Far behind (the app was closed for days): stop stepping and jump straight to the future
+                if self.interval is not None:
+                    missed = int((now - slot) // self.interval) + 1
+                    dropped += missed
+                    slot += missed * self.interval
+                else:
+                    dropped += 1
+                    slot = self.step(max(slot, now))
+                break
+            slots.append(slot)
+            slot = self.step(slot)
+        return slots, slot, dropped
+
+    def to_row(self):
+        # The scheduled_jobs row for this job
+        return {
+            "id": self.id,
+            "name": self.name,
+            "action": self.action,
+            "args": json.dumps(self.args),
+            "next_run": self.next_run,
+            "interval": self.interval,
+            "schedule_time": self.schedule_time,
+            "max_concurrency": self.max_concurrency,
+            "misfire": self.misfire,
+            "timeout": self.timeout
+        }
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "action": self.action,
+            "next_run": self.next_run,
+            "interval": self.interval,
+            "schedule_time": self.schedule_time,
+            "max_concurrency": self.max_concurrency,
+            "misfire": self.misfire,
+            "timeout": self.timeout,
+            "running": self.running,
+            "waiting": len(self.waiting),
+            "stats": self.stats.to_dict()
+        }
+
+
+# One run of a job handed to the pool
+class _Run:
+    def __init__(self, job, due):
+        self.job = job
+        self.due = due
+        self.future = None
+        self.timed_out = False
+        self.finished = False
+
 
 # Create a TaskScheduler class - think of it as an alarm clock for our program
 class TaskScheduler():
+    """
+    Runs jobs at their due times from a min-heap of next-fire times
+
+    The scheduler thread sleeps until the earliest deadline on the heap and is woken early through a
+    condition variable whenever a job is added or cancelled, so an idle scheduler doesn't wake at all.
+    Adding a job is a heap push; cancelling marks the job and its heap entry is thrown away when it
+    reaches the top (the heap is rebuilt if cancelled entries pile up), so both are O(log n).
+
+    Due jobs are handed to a thread pool, or a process pool with executor="process" (jobs must then
+    be picklable, i.e. module-level functions, and anything else is refused when it's added or
+    registered), so a slow job never holds up the others. stop() shuts the pool down and starting
+    again makes a new one.
+
+    Given a Storage, jobs that call a registered action are saved in its scheduled_jobs table. Only
+    the ones due within LOAD_AHEAD_SECONDS are kept on the heap, the rest are read in as their time
+    comes closer, and runs missed while the app was closed are all handled in the first pass.
+    """
+
     # When we create a new scheduler, we set up an empty list to store our alarms
-    def __init__(self):
-        # This is like a notebook where we write down all our scheduled tasks.
+    def __init__(self, workers=SCHEDULER_WORKERS, executor="thread", storage=None):
+        # This is like a notebook where we write down all our scheduled tasks, by job id
+        # (names aren't unique: two jobs can call the same function)
         self.scheduled_tasks = {}
-    
+        # Optional job store, and the actions stored jobs may call
+        self.storage = storage
+        self.actions = {}
+        # Stored jobs due up to this time have been loaded onto the heap; None until the first load
+        self._loaded_until = None
+        # Job id -> ScheduledJob for every job that hasn't been cancelled or finished
+        self.jobs = {}
+        # (next_run, sequence, job); the sequence keeps jobs due at the same moment in the order they were added
+        self._heap = []
+        self._sequence = itertools.count()
+        self._stale = 0
+        # (deadline, sequence, run) for runs that have a timeout
+        self._deadlines = []
+        self._condition = threading.Condition()
+        self._running = False
+        self.workers = workers
+        # "thread", "process" or any concurrent.futures executor
+        self.executor_kind = executor
+        self._executor = self._make_executor()
+        # Set by stop(); start_scheduler() and run_pending_tasks() make a new pool before using it again
+        self._executor_stopped = False
+
+    def _make_executor(self):
+        if self.executor_kind == "process":
+            return ProcessPoolExecutor(max_workers=self.workers)
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scheduler")
+        # Any concurrent.futures executor works; one passed in is used as it is and not recreated
+        return self.executor_kind
+
+    def _restart_executor(self):
+        # Called with the lock held
+        if self._executor_stopped and self.executor_kind in ("thread", "process"):
+            self._executor = self._make_executor()
+            self._executor_stopped = False
+
+    def _check_picklable(self, func, name):
+        # A process pool pickles every call it's sent; find out now rather than when the job first fires
+        if self.executor_kind != "process" and not isinstance(self._executor, ProcessPoolExecutor):
+            return
+        try:
+            pickle.dumps(func)
+        except Exception as e:
+            raise ValueError(
+                f"{name} can't run in a process pool, it can't be pickled ({e}); use a module-level function"
+            ) from None
+
+    def register_action(self, name, func):
+        """Makes func callable from stored jobs as `name`; stored jobs skipped for want of it are loaded now"""
+        self._check_picklable(func, name)
+        with self._condition:
+            self.actions[name] = func
+            if self.storage is not None and self._loaded_until is not None:
+                # Later loads only read jobs due after _loaded_until, so ones already passed over are read here
+                rows = self.storage.load_scheduled_jobs(self._loaded_until)
+                self._add_rows([row for row in rows if row["action"] == name])
+                self._condition.notify()
+
     # This is how we add a new alarm to our clock
-    def add_scheduled_task(self, task, schedule_time):
-        # Tell the schedule tool to run our task every day at the specific time
+    def add_scheduled_task(self, task, schedule_time, **options):
+        # Run our task every day at the specific time
         # (Like telling your alarm: "Wake me up at 7:00 AM every day")
+        # task is a function, or the name of a registered action so the alarm is saved
+        if isinstance(task, str):
+            options.setdefault("action", task)
+            task = self._resolve(task, options.get("args"))
+        job = self.add_job(ScheduledJob(task, next_daily_run(schedule_time), schedule_time=schedule_time, **options))
 
-        schedule.every().day.at(schedule_time).do(task)
-        
         # Write down this task in our notebook so we remember it
-        # We use the task's name as a label (like writing "Wake up" on your alarm)
-        self.scheduled_tasks[task.__name__] = schedule_time
-    
+        # We use the job's name as a label (like writing "Wake up" on your alarm)
+        self.scheduled_tasks[job.id] = (job.name, schedule_time)
+        return job.id
+
+    def every(self, seconds, task, name=None, **options):
+        """Runs task every `seconds` seconds, starting one interval from now"""
+        return self.add_job(ScheduledJob(task, time.time() + seconds, interval=seconds, name=name, **options)).id
+
+    def run_at(self, timestamp, task, name=None, **options):
+        """Runs task once at a time.time() timestamp"""
+        return self.add_job(ScheduledJob(task, timestamp, name=name, **options)).id
+
+    def add_job(self, job):
+        self._check_picklable(job.func, job.name)
+        with self._condition:
+            if job.action is not None and self.storage is not None:
+                self.storage.save_scheduled_job(job.to_row())
+                if self._loaded_until is not None and job.next_run > self._loaded_until:
+                    # Not due soon: it's read back in when its window comes up
+                    return job
+            self.jobs[job.id] = job
+            self._push(job)
+            # Only wake the scheduler thread if this job is now the first one due
+            if self._heap[0][2] is job:
+                self._condition.notify()
+        return job
+
+    def cancel(self, job_id):
+        with self._condition:
+            stored = self.storage is not None and self.storage.delete_scheduled_job(job_id)
+            self.scheduled_tasks.pop(job_id, None)
+            job = self.jobs.pop(job_id, None)
+            if job is None:
+                return stored
+            job.cancelled = True
+            # Runs still waiting for a slot won't happen; a run already going is left to finish
+            job.waiting.clear()
+            self._stale += 1
+            if self._stale > len(self._heap) * STALE_HEAP_RATIO:
+                self._compact()
+            self._condition.notify()
+            return True
+
+    def get_job_stats(self, job_id=None):
+        """Run counts, latency and queue delay for one job, or for every job keyed by id"""
+        with self._condition:
+            if job_id is not None:
+                job = self.jobs.get(job_id)
+                return job.to_dict() if job is not None else None
+            return {job.id: job.to_dict() for job in self.jobs.values()}
+
+    def list_jobs(self):
+        """Every job, stored or in memory, as (id, name, next_run, schedule_time, interval) dicts soonest first"""
+        with self._condition:
+            jobs = {
+                job.id: {key: value for key, value in job.to_dict().items() if key != "stats"}
+                for job in self.jobs.values()
+            }
+            if self.storage is not None:
+                for row in self.storage.get_scheduled_jobs():
+                    jobs.setdefault(row["id"], {
+                        "id": row["id"],
+                        "name": row["name"],
+                        "action": row["action"],
+                        "next_run": row["next_run"],
+                        "interval": row["interval"],
+                        "schedule_time": row["schedule_time"]
+                    })
+        return sorted(jobs.values(), key=lambda job: job["next_run"])
+
+    def load_jobs(self, now=None):
+        """Reads stored jobs due within LOAD_AHEAD_SECONDS (including any that were missed) onto the heap"""
+        with self._condition:
+            self._load_until((now if now is not None else time.time()) + LOAD_AHEAD_SECONDS)
+            self._condition.notify()
+
     # This method runs all our scheduled tasks (like letting all alarms ring when it's time)
     def run_pending_tasks(self):
-        # Check if any alarms need to ring right now
-        schedule.run_pending()
-    
-    # This method keeps checking our alarms forever (like a real alarm clock that's always on)
+        # Hand every alarm that should be ringing right now to the pool
+        with self._condition:
+            self._restart_executor()
+            now = time.time()
+            if self.storage is not None and (self._loaded_until is None or self._loaded_until <= now + LOAD_AHEAD_SECONDS / 2):
+                self._load_until(now + LOAD_AHEAD_SECONDS)
+            return self._dispatch_due(now)
+
+    # This method keeps our alarm clock running until stop() is called
     def start_scheduler(self):
-        # Keep doing this forever (or until someone stops the program)
-        while True:
-            # Check if any tasks need to run
-            self.run_pending_tasks()
-            # Wait a little bit before checking again (like hitting snooze for 1 second)
-            time.sleep(1)
+        with self._condition:
+            self._running = True
+            self._restart_executor()
+            while self._running:
+                now = time.time()
+                # Top up the heap from the job store before the loaded window runs out
+                if self.storage is not None and (self._loaded_until is None or self._loaded_until <= now + LOAD_AHEAD_SECONDS / 2):
+                    self._load_until(now + LOAD_AHEAD_SECONDS)
+                self._expire_runs(now)
+                self._dispatch_due(now)
+
+                # Sleep until the next alarm or timeout (or until a job is added or cancelled)
+                wake_at = now + MAX_SLEEP_SECONDS
+                if self._loaded_until is not None:
+                    wake_at = min(wake_at, self._loaded_until - LOAD_AHEAD_SECONDS / 2)
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                if self._deadlines:
+                    wake_at = min(wake_at, self._deadlines[0][0])
+                if wake_at > now:
+                    self._condition.wait(wake_at - now)
+
+    def stop(self, wait=False):
+        """Stops the scheduler thread and its pool; with wait=True also waits for runs already in the pool"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+            executor = self._executor
+            self._executor_stopped = True
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    def next_run_time(self):
+        """The time.time() at which the next job is due, or None when nothing is scheduled"""
+        with self._condition:
+            self._drop_stale_top()
+            return self._heap[0][0] if self._heap else None
+
+    def _resolve(self, action, args):
+        func = self.actions.get(action)
+        if func is None:
+            raise ValueError(f"No action registered as {action}")
+        return functools.partial(func, **(args or {}))
+
+    def _load_until(self, until):
+        # Called with the lock held
+        self._add_rows(self.storage.load_scheduled_jobs(until, self._loaded_until))
+        self._loaded_until = until
+
+    def _add_rows(self, rows):
+        # Called with the lock held
+        for row in rows:
+            if row["id"] in self.jobs:
+                continue
+            args = json.loads(row["args"]) if row["args"] else {}
+            try:
+                func = self._resolve(row["action"], args)
+            except ValueError as e:
+                # Left in the store: register_action loads it once something registers the action
+                print(f"Error loading scheduled job {row['name']}: {e}")
+                continue
+            job = ScheduledJob(
+                func, row["next_run"], interval=row["interval"], schedule_time=row["schedule_time"],
+                name=row["name"], max_concurrency=row["max_concurrency"], misfire=row["misfire"],
+                timeout=row["timeout"], action=row["action"], args=args, job_id=row["id"]
+            )
+            self.jobs[job.id] = job
+            self._push(job)
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.next_run, next(self._sequence), job))
+
+    def _dispatch_due(self, now):
+        # Called with the lock held; repeating jobs are pushed back with their next time straight away
+        started = 0
+        # Stored jobs get their new next run written back in one go, however many fired
+        next_runs = []
+        finished = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job = heapq.heappop(self._heap)
+            if job.cancelled:
+                self._stale -= 1
+                continue
+
+            slots, following, dropped = job.due_slots(now)
+            job.stats.skipped += dropped
+            if following is None:
+                self.jobs.pop(job.id, None)
+                self.scheduled_tasks.pop(job.id, None)
+                if job.action is not None:
+                    finished.append(job.id)
+            else:
+                job.next_run = following
+                self._push(job)
+                if job.action is not None:
+                    next_runs.append((following, job.id))
+
+            if job.misfire == "skip":
+                # Only a run that's (nearly) on time happens
+                on_time = [slot for slot in slots[-1:] if now - slot <= MISFIRE_GRACE_SECONDS]
+                job.stats.skipped += len(slots) - len(on_time)
+                slots = on_time
+            elif job.misfire == "coalesce" and len(slots) > 1:
+                job.stats.coalesced += len(slots) - 1
+                slots = slots[-1:]
+
+            for due in slots:
+                started += self._start_or_queue(job, due)
+
+        if self.storage is not None and (next_runs or finished):
+            self.storage.update_scheduled_jobs(next_runs, finished)
+        return started
+
+    def _start_or_queue(self, job, due):
+        if job.running < job.max_concurrency:
+            self._submit(job, due)
+            return 1
+        if job.misfire == "catch_up":
+            job.waiting.append(due)
+        elif job.misfire == "coalesce" and not job.waiting:
+            job.waiting.append(due)
+        elif job.misfire == "coalesce":
+            # A run is already waiting for this job; it covers this one too
+            job.stats.coalesced += 1
+        else:
+            job.stats.skipped += 1
+        return 0
+
+    def _submit(self, job, due):
+        # Called with the lock held
+        run = _Run(job, due)
+        job.running += 1
+        try:
+            run.future = self._executor.submit(_timed_call, job.func)
+        except RuntimeError:
+            # The pool has been shut down
+            job.running -= 1
+            return
+        if job.timeout is not None:
+            heapq.heappush(self._deadlines, (time.time() + job.timeout, next(self._sequence), run))
+        run.future.add_done_callback(lambda future: self._finished(run, future))
+
+    def _finished(self, run, future):
+        with self._condition:
+            if run.timed_out or future.cancelled():
+                return
+            run.finished = True
+            job = run.job
+            try:
+                started, finished, error = future.result()
+            except Exception as e:
+                # The job never ran properly, e.g. it couldn't be sent to a worker process
+                started = finished = time.time()
+                error = str(e)
+            job.stats.record(run.due, started, finished, error)
+            if error is not None:
+                print(f"Error in scheduled job {job.name}: {error}")
+            self._release_slot(job)
+
+    def _expire_runs(self, now):
+        # Called with the lock held
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, run = heapq.heappop(self._deadlines)
+            if run.finished:
+                continue
+            # Threads can't be killed, so a timed-out run is written off: it stops holding its slot and
+            # whatever it does afterwards isn't counted. A run still queued in the pool is cancelled outright.
+            run.timed_out = True
+            run.future.cancel()
+            run.job.stats.timeouts += 1
+            print(f"Scheduled job {run.job.name} timed out after {run.job.timeout}s")
+            self._release_slot(run.job)
+
+    def _release_slot(self, job):
+        job.running -= 1
+        if job.waiting and not job.cancelled:
+            self._submit(job, job.waiting.popleft())
 
+    def _drop_stale_top(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._stale -= 1
 
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+        heapq.heapify(self._heap)
+        self._stale = 0
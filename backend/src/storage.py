@@ -1,8 +1,59 @@
 # Import sqlite3 - it's like bringing a special toolbox that helps us store information in a mini-database
 import sqlite3
+# Import threading - the pool of connections is shared by every thread, so it needs a lock
+import threading
+import time
 # Import contextmanager - it's like a helper that makes sure we clean up after ourselves when using resources
 from contextlib import contextmanager
 import uuid
+import os
+from itertools import groupby
+from operator import itemgetter
+
+# Pragmas applied to every connection we open. WAL lets readers keep reading while a writer commits,
+# NORMAL sync is safe under WAL and avoids an fsync on every commit, and the cache/mmap sizes keep hot pages in memory.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+# How many prepared statements each connection keeps around for reuse
+STATEMENT_CACHE_SIZE = 256
+
+# How many idle connections the pool keeps open between calls
+POOL_SIZE = 4
+
+# Columns returned for each task row, in order
+TASK_COLUMNS = ("id", "title", "description", "due_date", "completed", "in_progress", "pending", "priority")
+
+# Fields the task query can sort by (only these are ever put into the SQL text)
+TASK_SORT_FIELDS = ("due_date", "priority", "title")
+
+# SQL condition for each status code
+# 0: Pending, 1: In Progress, 2: Completed
+TASK_STATUS_CONDITIONS = {
+    0: "(completed = 0 AND in_progress = 0)",
+    1: "(completed = 0 AND in_progress = 1)",
+    2: "(completed = 1)",
+}
+
+# Columns of the scheduled_jobs table, in the order rows are read and written
+SCHEDULED_JOB_COLUMNS = (
+    "id", "name", "action", "args", "next_run", "interval", "schedule_time",
+    "max_concurrency", "misfire", "timeout"
+)
+
+# Columns returned for each activity row, in order
+ACTIVITY_COLUMNS = ("id", "type", "title", "timestamp", "status", "due_date")
+
+# How many activities of each type are kept; older ones are dropped as new ones arrive
+ACTIVITY_RETENTION = {"organization": 4, "tasks": 4, "reminder": 20}
+# Kept for any type not listed above
+DEFAULT_ACTIVITY_RETENTION = 4
 
 # Create a Storage class - think of it as a digital filing cabinet for our tasks
 class Storage:
@@ -10,25 +61,147 @@ class Storage:
     def __init__(self, db_path: str):
         # Save the location of our filing cabinet (like writing the room number on a map)
         self.db_path = db_path
+        # Warm connections waiting to be reused. PyWebView runs every API call on a fresh thread,
+        # so connections are checked out per call rather than tied to a thread's lifetime.
+        self._idle = []
+        self._pool_lock = threading.Lock()
+        # The connection (and unit-of-work state) the current thread has checked out
+        self._local = threading.local()
+        # Newest-first activities per type, exactly as they are in the database (filled on first read)
+        self._activity_cache = {}
+        # Bumped whenever the cache changes, so a read that raced a commit doesn't store stale rows
+        self._activity_generation = 0
+        self._activity_lock = threading.Lock()
+        # Type -> how many activities of it are kept (read from activity_retention by init_db)
+        self._activity_retention = {}
+        # Functions called with the list of activities each transaction wrote, once it has committed
+        self.activity_listeners = []
+        # Goes up after every commit that changed a row. It starts from the clock so it keeps
+        # increasing across restarts and a version a client saw before a restart is never reused.
+        # Microseconds, because nanoseconds would be too big for a JavaScript number to hold exactly.
+        self._data_version = time.time_ns() // 1000
+        self._version_lock = threading.Lock()
         # Call another method to set up the drawers in our filing cabinet
         self.init_db()
 
-    # This method creates a special helper that makes sure we always close our filing cabinet when we're done
+    def _open_connection(self):
+        # check_same_thread is off because a pooled connection can be used by a different thread on each
+        # checkout; it is still only ever used by one thread at a time
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        with self._pool_lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open_connection()
+
+    def _release(self, conn):
+        # Anything the caller didn't commit is discarded, just like closing a connection would
+        if conn.in_transaction:
+            conn.rollback()
+        with self._pool_lock:
+            if len(self._idle) < POOL_SIZE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    # This method lends out a warm connection from the pool and takes it back when the block ends.
+    # Nested calls on the same thread share the connection that is already checked out.
     @contextmanager
     def get_connection(self):
-        # Open a connection to our filing cabinet (like unlocking it with a key)
-        conn = sqlite3.connect(self.db_path)
+        conn = getattr(self._local, "conn", None)
+        owner = conn is None
+        if owner:
+            conn = self._acquire()
+            self._local.conn = conn
         try:
             # Let the code that called this method use the connection (like letting someone use the cabinet)
             yield conn
+        except Exception:
+            # Never leave a half-done transaction behind.
+            # Inside a unit of work the outermost transaction() decides what to roll back.
+            if conn.in_transaction and not getattr(self._local, "depth", 0):
+                conn.rollback()
+            raise
         finally:
-            # Always close the connection when done (like locking the cabinet when finished)
-            conn.close()
+            if owner:
+                self._local.conn = None
+                self._release(conn)
+
+    # A unit of work: every write made inside the block (including nested transaction() blocks and
+    # increment_stat calls) is committed once when the outermost block exits, or rolled back on error
+    @contextmanager
+    def transaction(self):
+        with self.get_connection() as conn:
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0:
+                self._local.pending_stats = {}
+                self._local.pending_activities = []
+                changes_before = conn.total_changes
+            self._local.depth = depth + 1
+            try:
+                yield conn
+                if depth == 0:
+                    self._flush_stats(conn)
+                    conn.commit()
+                    self._cache_activities()
+                    if conn.total_changes != changes_before:
+                        self.bump_data_version()
+            except Exception:
+                if depth == 0:
+                    self._local.pending_stats = {}
+                    self._local.pending_activities = []
+                    if conn.in_transaction:
+                        conn.rollback()
+                raise
+            finally:
+                self._local.depth = depth
+
+    @property
+    def in_transaction(self):
+        """True inside a transaction() block on this thread"""
+        return getattr(self._local, "depth", 0) > 0
+
+    def _flush_stats(self, conn):
+        # Write every deferred counter with one UPDATE per key
+        pending = self._local.pending_stats
+        self._local.pending_stats = {}
+        updates = [(amount, key) for key, amount in pending.items() if amount]
+        if updates:
+            conn.executemany("UPDATE stats SET value = value + ? WHERE key = ?", updates)
+
+    @property
+    def data_version(self):
+        """Changes whenever a committed write changed the database; compare two reads to see if anything did"""
+        return self._data_version
+
+    def bump_data_version(self):
+        with self._version_lock:
+            self._data_version += 1
+
+    # Close the idle connections (call this once when the app shuts down)
+    def close(self):
+        with self._pool_lock:
+            connections, self._idle = self._idle, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing database connection: {e}")
     
+    # Counters are coalesced per transaction, so bumping the same key many times costs a single UPDATE
     def increment_stat(self, key, amount=1):
-        with self.get_connection() as conn:
-            conn.execute("UPDATE stats SET value = value + ? WHERE key = ?", (amount, key))
-            conn.commit()
+        with self.transaction():
+            pending = self._local.pending_stats
+            pending[key] = pending.get(key, 0) + amount
 
     def get_stats(self):
         with self.get_connection() as conn:
@@ -36,68 +209,298 @@ class Storage:
             cursor.execute("SELECT key, value FROM stats")
             return dict(cursor.fetchall())
         
+    # Activities are a ring per type: each row gets the next sequence number for its type and a trigger
+    # drops the row that falls out of the retention window, so a write never counts or sorts anything.
+    # Reads come from an in-process cache that is updated when the writing transaction commits.
+    # (Another process writing the same database file isn't seen until this one writes that type too.)
+
     def get_recent_activities(self, activity_type="organization"):
+        return self._read_activities(activity_type)
+
+    def get_latest_tasks(self, activity_type="tasks"):
+        return self._read_activities(activity_type)
+
+    def _read_activities(self, activity_type):
+        with self._activity_lock:
+            cached = self._activity_cache.get(activity_type)
+            generation = self._activity_generation
+        if cached is None:
+            # Newest first straight off the covering index, no table lookups and no sort
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(ACTIVITY_COLUMNS)} FROM activities WHERE type = ? ORDER BY seq DESC LIMIT ?",
+                    (activity_type, self._retention_for(activity_type))
+                ).fetchall()
+            cached = [dict(zip(ACTIVITY_COLUMNS, row)) for row in rows]
+            with self._activity_lock:
+                if generation == self._activity_generation:
+                    self._activity_cache[activity_type] = cached
+        return [dict(activity) for activity in cached]
+
+    def _retention_for(self, activity_type):
+        return self._activity_retention.get(activity_type, DEFAULT_ACTIVITY_RETENTION)
+
+    def add_activity(self, activity_data):
+        activity = {column: activity_data.get(column) for column in ACTIVITY_COLUMNS}
+        with self.transaction() as conn:
+            # The MAX is one seek to the end of the type's range in the (type, seq) index
+            conn.execute(
+                f"INSERT INTO activities ({', '.join(ACTIVITY_COLUMNS)}, seq) "
+                f"SELECT ?, ?, ?, ?, ?, ?, COALESCE(MAX(seq), 0) + 1 FROM activities WHERE type = ?",
+                tuple(activity[column] for column in ACTIVITY_COLUMNS) + (activity["type"],)
+            )
+            self._local.pending_activities.append(activity)
+        return True
+
+    def set_activity_retention(self, activity_type, keep):
+        """Changes how many activities of a type are kept, dropping any beyond the new limit right away"""
+        keep = max(1, int(keep))
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO activity_retention (type, keep) VALUES (?, ?)", (activity_type, keep))
+            conn.execute(
+                "DELETE FROM activities WHERE type = ? AND seq <= "
+                "(SELECT COALESCE(MAX(seq), 0) FROM activities WHERE type = ?) - ?",
+                (activity_type, activity_type, keep)
+            )
+        with self._activity_lock:
+            self._activity_retention[activity_type] = keep
+            self._activity_cache.pop(activity_type, None)
+            self._activity_generation += 1
+
+    def _cache_activities(self):
+        # Called after a commit: put what was just written at the front of each cached ring
+        pending = self._local.pending_activities
+        self._local.pending_activities = []
+        if not pending:
+            return
+        with self._activity_lock:
+            self._activity_generation += 1
+            for activity in pending:
+                cached = self._activity_cache.get(activity["type"])
+                if cached is not None:
+                    cached.insert(0, activity)
+                    del cached[self._retention_for(activity["type"]):]
+        for listener in self.activity_listeners:
+            try:
+                listener(pending)
+            except Exception as e:
+                print(f"Error in activity listener: {e}")
+
+    # Fetch one page of tasks with filtering and sorting done by SQLite.
+    # `after` is the (sort value, id) pair of the last row already seen, for keyset pagination.
+    # Returns (rows, total) where total counts every task matching the filters.
+    def query_tasks(self, status=None, priority=None, due_from=None, due_to=None, search=None,
+                    sort="due_date", descending=False, offset=0, limit=50, after=None):
+        if sort not in TASK_SORT_FIELDS:
+            raise ValueError(f"Cannot sort tasks by {sort!r}")
+
+        where = []
+        params = []
+
+        if status is not None:
+            codes = status if isinstance(status, (list, tuple)) else [status]
+            where.append("(" + " OR ".join(TASK_STATUS_CONDITIONS[int(code)] for code in codes) + ")")
+
+        if priority is not None:
+            priorities = priority if isinstance(priority, (list, tuple)) else [priority]
+            where.append(f"priority IN ({', '.join('?' for _ in priorities)})")
+            params.extend(int(value) for value in priorities)
+
+        if due_from:
+            where.append("due_date >= ?")
+            params.append(due_from)
+
+        if due_to:
+            where.append("due_date <= ?")
+            params.append(due_to)
+
+        if search:
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, type, title, timestamp, status, due_date FROM activities WHERE type = ? ORDER BY timestamp DESC",
-                            (activity_type,) 
+            filter_sql = f" WHERE {' AND '.join(where)}" if where else ""
+            total = conn.execute(f"SELECT COUNT(*) FROM tasks{filter_sql}", params).fetchone()[0]
+
+            page_where = list(where)
+            page_params = list(params)
+            if after is not None:
+                condition, condition_params = self._keyset_condition(sort, descending, *after)
+                page_where.append(condition)
+                page_params.extend(condition_params)
+
+            page_sql = f" WHERE {' AND '.join(page_where)}" if page_where else ""
+            direction = "DESC" if descending else "ASC"
+            cursor = conn.execute(
+                f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks{page_sql} "
+                f"ORDER BY {sort} {direction}, id {direction} LIMIT ? OFFSET ?",
+                (*page_params, limit, offset)
             )
-            return [dict(zip(["id", "type", "title", "timestamp", "status", "due_date"], row)) for row in cursor.fetchall()]
-    
-    def get_latest_tasks(self, activity_type="tasks"):
+            return cursor.fetchall(), total
+
+    @staticmethod
+    def _keyset_condition(column, descending, last_value, last_id):
+        # Rows strictly after (last_value, last_id) in ORDER BY column, id.
+        # SQLite puts NULLs first when ascending and last when descending.
+        if not descending:
+            if last_value is None:
+                return f"(({column} IS NULL AND id > ?) OR {column} IS NOT NULL)", [last_id]
+            return f"({column} > ? OR ({column} = ? AND id > ?))", [last_value, last_value, last_id]
+        if last_value is None:
+            return f"({column} IS NULL AND id < ?)", [last_id]
+        return f"({column} < ? OR ({column} = ? AND id < ?) OR {column} IS NULL)", [last_value, last_value, last_id]
+
+    # File metadata index: remembered directory listings so a rescan can skip folders that haven't changed
+
+    @staticmethod
+    def _subtree_bounds(path):
+        # Every path strictly below `path` sorts between path + separator and path + separator + the highest character
+        prefix = os.path.join(path, "")
+        return prefix, prefix + "\U0010ffff"
+
+    def load_file_index(self, root_path):
+        """Returns ({dir path: mtime}, {dir path: [(name, is_dir, size, extension), ...]}) for root_path and everything below it"""
+        low, high = self._subtree_bounds(root_path)
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, type, title, timestamp, status, due_date FROM activities WHERE type = ? ORDER BY timestamp DESC",
-                            (activity_type,) 
+            dir_mtimes = dict(conn.execute(
+                "SELECT path, mtime_ns FROM dir_index WHERE path = ? OR (path >= ? AND path < ?)",
+                (root_path, low, high)
+            ))
+            cursor = conn.execute(
+                "SELECT parent, name, is_dir, size, extension FROM file_index "
+                "WHERE parent = ? OR (parent >= ? AND parent < ?) ORDER BY parent, position",
+                (root_path, low, high)
             )
-            return [dict(zip(["id", "type", "title", "timestamp", "status", "due_date"], row)) for row in cursor.fetchall()]
-        
-    def add_activity(self, activity_data):
+            # Rows arrive grouped by parent, so each folder's listing is one contiguous run
+            listings = {
+                parent: [row[1:] for row in rows]
+                for parent, rows in groupby(cursor, key=itemgetter(0))
+            }
+            return dir_mtimes, listings
+
+    def load_directory_index(self, dir_path):
+        """Returns (mtime, rows) remembered for a single directory; mtime is None if it was never indexed"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            row = conn.execute("SELECT mtime_ns FROM dir_index WHERE path = ?", (dir_path,)).fetchone()
+            rows = conn.execute(
+                "SELECT name, is_dir, size, extension FROM file_index WHERE parent = ? ORDER BY position",
+                (dir_path,)
+            ).fetchall()
+            return (row[0] if row else None), rows
 
-            # Check if the activities table exists
-            cursor.execute("SELECT name from sqlite_master WHERE type='table' AND name='activities'")
-            table_exists = cursor.fetchone() is not None
-            
-            if not table_exists:
-                # Table doesn't exist, so we can't add the activity
-                return False
-            
-            # Get the activity type
-            activity_type = activity_data['type']
-            
-            # Count existing activities of the same type
-            cursor.execute("SELECT COUNT(*) FROM activities WHERE type = ?", (activity_type,))
-            count = cursor.fetchone()[0]
-            
-            # If we already have 4 activities of this type, delete the oldest one
-            if count >= 4:
-                cursor.execute("""
-                    DELETE FROM activities 
-                    WHERE id = (
-                        SELECT id FROM activities 
-                        WHERE type = ? 
-                        ORDER BY timestamp ASC 
-                        LIMIT 1
-                    )
-                """, (activity_type,))
-            
-            # Insert the new activity data
-            conn.execute(
-                "INSERT INTO activities (id, type, title, timestamp, status, due_date) VALUES (?, ?, ?, ?, ?, ?)",
-                (
-                    activity_data['id'],
-                    activity_data['type'],
-                    activity_data['title'],
-                    activity_data['timestamp'],
-                    activity_data['status'],
-                    activity_data.get('due_date', None),
+    def save_file_index(self, listings, removed_dirs=()):
+        """Stores fresh directory listings as (dir path, mtime or None, rows) and forgets removed folders and everything below them"""
+        with self.transaction() as conn:
+            for path in removed_dirs:
+                low, high = self._subtree_bounds(path)
+                conn.execute("DELETE FROM file_index WHERE parent = ? OR (parent >= ? AND parent < ?)", (path, low, high))
+                conn.execute("DELETE FROM dir_index WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+            for dir_path, mtime, rows in listings:
+                conn.execute("DELETE FROM file_index WHERE parent = ?", (dir_path,))
+                conn.executemany(
+                    "INSERT INTO file_index (parent, position, name, is_dir, size, extension) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((dir_path, position, *row) for position, row in enumerate(rows))
                 )
+                conn.execute("INSERT OR REPLACE INTO dir_index (path, mtime_ns) VALUES (?, ?)", (dir_path, mtime))
+
+    # Move journal: every organize run is written down before any file moves, so an interrupted run can be
+    # resumed or rolled back later
+
+    def start_move_run(self, run_id, moves):
+        """Records a run and its planned moves as (seq, source, destination) before anything is moved"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO move_runs (run_id, started_at, state) VALUES (?, datetime('now', 'localtime'), 'running')",
+                (run_id,)
+            )
+            conn.executemany(
+                "INSERT INTO move_journal (run_id, seq, source, destination) VALUES (?, ?, ?, ?)",
+                ((run_id, seq, source, destination) for seq, source, destination in moves)
             )
 
-            conn.commit()
-            return True
+    def mark_moves(self, run_id, updates):
+        """Updates journal entries from (seq, state, error) tuples"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE move_journal SET state = ?, error = ? WHERE run_id = ? AND seq = ?",
+                ((state, error, run_id, seq) for seq, state, error in updates)
+            )
+
+    def finish_move_run(self, run_id):
+        """Forgets a run once it has completed or been rolled back"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM move_journal WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM move_runs WHERE run_id = ?", (run_id,))
+
+    def get_unfinished_move_runs(self):
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT r.run_id, r.started_at, COUNT(j.seq), SUM(j.state = 'done'), SUM(j.state = 'pending') "
+                "FROM move_runs r LEFT JOIN move_journal j ON j.run_id = r.run_id "
+                "GROUP BY r.run_id ORDER BY r.started_at"
+            )
+            return [
+                dict(zip(["run_id", "started_at", "total", "done", "pending"], row))
+                for row in cursor.fetchall()
+            ]
+
+    def get_move_journal(self, run_id):
+        """Returns (seq, source, destination, state) for every move in a run, in order"""
+        with self.get_connection() as conn:
+            return conn.execute(
+                "SELECT seq, source, destination, state FROM move_journal WHERE run_id = ? ORDER BY seq",
+                (run_id,)
+            ).fetchall()
+
+    # Small named values the app needs to remember between runs (not shown on the dashboard like stats)
+
+    def get_state(self, key, default=None):
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT value FROM app_state WHERE key = ?", (key,)).fetchone()
+            return row[0] if row is not None else default
+
+    def set_state(self, key, value):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO app_state (key, value) VALUES (?, ?)", (key, value))
+
+    # Scheduled jobs: kept here so they survive a restart; the scheduler only loads the ones due soon
+
+    def save_scheduled_job(self, job_row):
+        """Inserts or replaces a job from a dict with SCHEDULED_JOB_COLUMNS keys"""
+        columns = SCHEDULED_JOB_COLUMNS
+        with self.transaction() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO scheduled_jobs ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                tuple(job_row[column] for column in columns)
+            )
+
+    def delete_scheduled_job(self, job_id):
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM scheduled_jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def load_scheduled_jobs(self, until, after=None):
+        """Jobs whose next run is at or before `until` (and after `after`, when given), soonest first"""
+        query = f"SELECT {', '.join(SCHEDULED_JOB_COLUMNS)} FROM scheduled_jobs WHERE next_run <= ?"
+        params = [until]
+        if after is not None:
+            query += " AND next_run > ?"
+            params.append(after)
+        query += " ORDER BY next_run"
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(zip(SCHEDULED_JOB_COLUMNS, row)) for row in rows]
+
+    def get_scheduled_jobs(self):
+        return self.load_scheduled_jobs(float("inf"))
+
+    def update_scheduled_jobs(self, next_runs, finished_ids=()):
+        """Moves jobs on to their next run from (next_run, id) pairs and deletes one-off jobs that have fired"""
+        with self.transaction() as conn:
+            conn.executemany("UPDATE scheduled_jobs SET next_run = ? WHERE id = ?", next_runs)
+            conn.executemany("DELETE FROM scheduled_jobs WHERE id = ?", ((job_id,) for job_id in finished_ids))
 
     # This method creates the structure of our filing cabinet if it doesn't exist yet
     def init_db(self):
@@ -138,7 +541,8 @@ class Storage:
                         timestamp TEXT,
                         status TEXT,
                         due_date TEXT,
-                        progress INTEGER DEFAULT 0
+                        progress INTEGER DEFAULT 0,
+                        seq INTEGER
                     )       
                 ''')
 
@@ -152,6 +556,18 @@ class Storage:
                     # Add due_date column if it doesn't exist
                     conn.execute("ALTER TABLE activities ADD COLUMN due_date TEXT")
                     conn.commit()
+                if "seq" not in columns:
+                    # Number the existing rows of each type oldest first, the order the ring keeps them in
+                    conn.execute("ALTER TABLE activities ADD COLUMN seq INTEGER")
+                    conn.execute('''
+                        UPDATE activities SET seq = (
+                            SELECT n FROM (
+                                SELECT rowid AS row_id, ROW_NUMBER() OVER (PARTITION BY type ORDER BY timestamp, rowid) AS n
+                                FROM activities
+                            ) WHERE row_id = activities.rowid
+                        )
+                    ''')
+                    conn.commit()
 
             # Getting the tasks table second
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='tasks'")
@@ -209,4 +625,98 @@ class Storage:
                     
                     # Replace the old table with the new one
                     conn.execute("DROP TABLE tasks")
-                    conn.execute("ALTER TABLE tasks_new RENAME TO tasks")
\ No newline at end of file
+                    conn.execute("ALTER TABLE tasks_new RENAME TO tasks")
+                    conn.commit()
+
+            # Indexes for the paginated task query: the sort columns carry id as a tie-breaker
+            # so ORDER BY column, id LIMIT n can walk the index without a temp sort
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(completed, in_progress, pending)")
+            conn.commit()
+
+            # Remembered directory listings for the folder scanner. A NULL mtime means the folder
+            # was changing while it was listed and must be listed again next time.
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dir_index (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_index (
+                    parent TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    is_dir INTEGER NOT NULL,
+                    size INTEGER,
+                    extension TEXT,
+                    PRIMARY KEY (parent, position)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+
+            # Write-ahead journal for organize runs; rows are removed once a run finishes
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS move_runs (
+                    run_id TEXT PRIMARY KEY,
+                    started_at TEXT,
+                    state TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS move_journal (
+                    run_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    destination TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    error TEXT,
+                    PRIMARY KEY (run_id, seq)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+
+            # Persistent scheduled jobs; args is JSON for the registered action the job calls
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    args TEXT,
+                    next_run REAL NOT NULL,
+                    interval REAL,
+                    schedule_time TEXT,
+                    max_concurrency INTEGER NOT NULL DEFAULT 1,
+                    misfire TEXT NOT NULL DEFAULT 'coalesce',
+                    timeout REAL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON scheduled_jobs(next_run)")
+            conn.commit()
+
+            conn.execute("CREATE TABLE IF NOT EXISTS app_state (key TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+
+            # How many activities of each type to keep; types not listed keep DEFAULT_ACTIVITY_RETENTION
+            conn.execute("CREATE TABLE IF NOT EXISTS activity_retention (type TEXT PRIMARY KEY, keep INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO activity_retention (type, keep) VALUES (?, ?)", ACTIVITY_RETENTION.items()
+            )
+            # Covers "latest N of this type" completely, so those reads never touch the table itself
+            conn.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_activities_type_seq
+                ON activities (type, seq, {', '.join(ACTIVITY_COLUMNS[2:])}, id)
+            ''')
+            # The ring: once a type has more rows than it keeps, the one that fell out of the window goes
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS activities_ring AFTER INSERT ON activities
+                BEGIN
+                    DELETE FROM activities
+                    WHERE type = NEW.type AND seq <= NEW.seq - COALESCE(
+                        (SELECT keep FROM activity_retention WHERE type = NEW.type), {DEFAULT_ACTIVITY_RETENTION}
+                    );
+                END
+            ''')
+            conn.commit()
+            self._activity_retention = dict(conn.execute("SELECT type, keep FROM activity_retention"))
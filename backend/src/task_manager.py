@@ -1,15 +1,22 @@
 # Import datetime module for handling dates and times
-from datetime import datetime
+from datetime import datetime, time
 
 # Import typing module for type hints
 # List: for creating lists with specific types
 # Optional: for fields that can be None
 from typing import List, Optional
 
+# Import bisect - it keeps the due-date index sorted without re-sorting on every change
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
 # Import BaseModel from pydantic for data validation
 from pydantic import BaseModel
 
+import sys
+import threading
 import uuid
+from array import array
 
 # Define a Task class that inherits from BaseModel
 # This provides automatic validation and serialization
@@ -41,15 +48,483 @@ class Task(BaseModel):
     # Defaults to 1 (lowest priority) if not specified
     priority: int = 1
 
+# Every field is set when a task is built from a row. Pydantic updates a task's fields-set in place,
+# so each task gets its own copy rather than sharing this one
+_ALL_FIELDS = frozenset(Task.model_fields)
+
+def trusted_task(id, title, description, due_date, completed, in_progress, pending, priority) -> Task:
+    """
+    Builds a Task from values that came out of our own tasks table, skipping validation
+
+    Does what Task.model_construct does, minus its per-field default handling, which makes it
+    slower than validating in the pydantic version we use. Only for rows we wrote ourselves.
+    """
+    task = object.__new__(Task)
+    object.__setattr__(task, "__dict__", {
+        "id": id,
+        "title": title,
+        "description": description,
+        "due_date": due_date,
+        "completed": bool(completed),
+        "inProgress": bool(in_progress),
+        "pending": bool(pending),
+        "priority": priority,
+    })
+    object.__setattr__(task, "__pydantic_fields_set__", set(_ALL_FIELDS))
+    object.__setattr__(task, "__pydantic_extra__", None)
+    object.__setattr__(task, "__pydantic_private__", None)
+    return task
+
+# Status codes shared with the frontend
+# 0: Pending, 1: In Progress, 2: Completed
+STATUS_STRINGS = {0: "Pending", 1: "In Progress", 2: "Completed"}
+
+def task_status_code(task: Task) -> int:
+    if task.completed:
+        return 2
+    if task.inProgress:
+        return 1
+    return 0
+
 class TaskManager():
     def __init__(self):
-        self.tasks = []
+        # Every API call runs on its own thread and tasks are loaded in the background, so changes to the
+        # tasks and their indexes, and reads spanning more than one of them, happen under this lock
+        self._lock = threading.RLock()
+        # Tasks keyed by UUID; dicts keep insertion order, so listing stays in the order tasks were added
+        self.tasks = {}
+        # Secondary indexes, kept in step with self.tasks by add/update/remove
+        self._by_status = {0: set(), 1: set(), 2: set()}
+        self._by_priority = {}
+        # Parallel sorted lists of due dates and the ids of tasks due then
+        self._due_dates = []
+        self._due_ids = []
+        # Ids removed since begin_background_load(), or None when no load is running
+        self._removed_during_load = None
+    def begin_background_load(self):
+        # A background loader may hold rows it read before a task was removed; remembering removed ids
+        # until finish_background_load() stops load_tasks(keep_existing=True) from bringing them back
+        with self._lock:
+            self._removed_during_load = set()
+    def finish_background_load(self):
+        with self._lock:
+            self._removed_during_load = None
     def add_task(self, task: Task):
-        self.tasks.append(task)
+        # Every task needs an id to be indexed, so give new ones a UUID
+        if task.id is None:
+            task.id = str(uuid.uuid4())
+        with self._lock:
+            if task.id in self.tasks:
+                self._unindex(self.tasks[task.id])
+            self.tasks[task.id] = task
+            self._index(task)
+    def load_tasks(self, tasks: List[Task], keep_existing: bool = False):
+        # Adds many tasks at once: the due-date index is re-sorted once instead of inserted into per task.
+        # With keep_existing, tasks whose id is already here, or was removed during a background
+        # load, are skipped rather than replaced.
+        for task in tasks:
+            if task.id is None:
+                task.id = str(uuid.uuid4())
+        with self._lock:
+            removed = (self._removed_during_load or ()) if keep_existing else ()
+            due = []
+            for task in tasks:
+                if task.id in removed:
+                    continue
+                if task.id in self.tasks:
+                    if keep_existing:
+                        continue
+                    self._unindex(self.tasks[task.id])
+                self.tasks[task.id] = task
+                self._by_status[task_status_code(task)].add(task.id)
+                self._by_priority.setdefault(task.priority, set()).add(task.id)
+                if task.due_date is not None:
+                    due.append((task.due_date, task.id))
+            self._merge_due(due)
+    def get(self, task_id: str) -> Optional[Task]:
+        return self.tasks.get(task_id)
+    def update(self, task_id: str, **changes) -> Optional[Task]:
+        # Change tasks through here rather than setting attributes directly so the indexes stay correct
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return None
+            self._unindex(task)
+            try:
+                for field, value in changes.items():
+                    setattr(task, field, value)
+            finally:
+                self._index(task)
+            return task
+    def remove_by_id(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            if self._removed_during_load is not None:
+                self._removed_during_load.add(task_id)
+            task = self.tasks.pop(task_id, None)
+            if task is not None:
+                self._unindex(task)
+            return task
     def remove_task(self, task: Task):
-        self.tasks.remove(task)
-    def list_tasks(self):
-        return self.tasks
+        self.remove_by_id(task.id)
+    def list_tasks(self) -> List[Task]:
+        with self._lock:
+            return list(self.tasks.values())
     def complete_tasks(self, task_index: int):
-        if 0 <= task_index < len(self.tasks):
-            self.tasks[task_index].completed = True
+        tasks = self.list_tasks()
+        if 0 <= task_index < len(tasks):
+            self.update(tasks[task_index].id, completed=True)
+    def __len__(self):
+        return len(self.tasks)
+
+    # Index queries
+
+    def tasks_by_status(self, status: int) -> List[Task]:
+        with self._lock:
+            return [self.tasks[task_id] for task_id in self._by_status.get(status, ())]
+    def count_by_status(self, status: int) -> int:
+        return len(self._by_status.get(status, ()))
+    def tasks_by_priority(self, priority: int) -> List[Task]:
+        with self._lock:
+            return [self.tasks[task_id] for task_id in self._by_priority.get(priority, ())]
+    def count_by_priority(self, priority: int) -> int:
+        return len(self._by_priority.get(priority, ()))
+    def tasks_due_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Task]:
+        # Tasks due in [start, end], earliest first; either bound can be left open
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self._due_dates, start)
+            hi = len(self._due_dates) if end is None else bisect_right(self._due_dates, end)
+            return [self.tasks[task_id] for task_id in self._due_ids[lo:hi]]
+    def next_due_after(self, moment: datetime) -> Optional[datetime]:
+        # The earliest due date strictly after moment, found with one bisect
+        with self._lock:
+            position = bisect_right(self._due_dates, moment)
+            return self._due_dates[position] if position < len(self._due_dates) else None
+
+    # Index maintenance; callers hold self._lock
+
+    def _merge_due(self, due):
+        # Adds (due_date, id) pairs to the due-date index with one sort
+        if due:
+            # A stable sort keeps tasks with the same due date in the order they were added, like bisect_right does
+            merged = list(zip(self._due_dates, self._due_ids)) + due
+            merged.sort(key=itemgetter(0))
+            # Both lists are built before either is replaced, so they never disagree in between
+            due_dates = [due_date for due_date, _ in merged]
+            due_ids = [task_id for _, task_id in merged]
+            self._due_dates, self._due_ids = due_dates, due_ids
+    def _index(self, task: Task):
+        self._by_status[task_status_code(task)].add(task.id)
+        self._by_priority.setdefault(task.priority, set()).add(task.id)
+        self._index_due(task)
+    def _unindex(self, task: Task):
+        self._by_status[task_status_code(task)].discard(task.id)
+        bucket = self._by_priority.get(task.priority)
+        if bucket is not None:
+            bucket.discard(task.id)
+            if not bucket:
+                del self._by_priority[task.priority]
+        self._unindex_due(task)
+    def _index_due(self, task: Task):
+        if task.due_date is not None:
+            position = bisect_right(self._due_dates, task.due_date)
+            self._due_dates.insert(position, task.due_date)
+            self._due_ids.insert(position, task.id)
+    def _unindex_due(self, task: Task):
+        if task.due_date is not None:
+            # Only tasks sharing this exact due date need to be checked
+            lo = bisect_left(self._due_dates, task.due_date)
+            hi = bisect_right(self._due_dates, task.due_date)
+            for position in range(lo, hi):
+                if self._due_ids[position] == task.id:
+                    del self._due_dates[position]
+                    del self._due_ids[position]
+                    break
+
+
+# A compact alternative to TaskManager for very large boards.
+# Each field lives in its own column (flags, priorities and due dates in typed arrays, text interned),
+# so a task costs a few dozen bytes plus its strings instead of a whole pydantic object.
+
+TASK_FIELDS = tuple(Task.model_fields)
+
+# Bits of the flags column
+COMPLETED_BIT = 1
+IN_PROGRESS_BIT = 2
+PENDING_BIT = 4
+FLAG_BITS = {"completed": COMPLETED_BIT, "inProgress": IN_PROGRESS_BIT, "pending": PENDING_BIT}
+
+# Flags of a slot no task is using, so status scans skip it
+FREE_SLOT = -1
+# Flags byte -> status code (as a byte), for scanning the flags column with bytes.translate;
+# completed wins over in progress, like task_status_code
+STATUS_OF_FLAGS = bytes(
+    255 if flags >= 8 else 2 if flags & COMPLETED_BIT else 1 if flags & IN_PROGRESS_BIT else 0
+    for flags in range(256)
+)
+
+# due_days value for a task with no due date, and for one kept in due_exact because it isn't a plain date
+NO_DUE_DATE = 0
+EXACT_DUE_DATE = -1
+
+
+class TaskColumns:
+    """
+    Task fields stored column by column, one slot per task
+
+    Behaves like the {id: Task} dict TaskManager keeps in self.tasks, so TaskManager's methods work on
+    it unchanged, but hands out TaskView objects that read and write the columns. Due dates are
+    stored as date ordinals; the rare one with a time of day or timezone is kept as is in due_exact.
+    Slots of removed tasks are reused by the next task added. Slots are handed out and read under
+    lock, which CompactTaskManager shares, so two threads never get the same slot.
+    """
+
+    def __init__(self, lock=None):
+        self.lock = threading.RLock() if lock is None else lock
+        # Task id -> slot, in the order tasks were added, and slot -> id (None for a free slot)
+        self.slots = {}
+        self.ids = []
+        self.free = []
+        self.titles = []
+        self.descriptions = []
+        self.flags = array("b")
+        self.priorities = array("i")
+        self.due_days = array("i")
+        self.due_exact = {}
+        # Ordinal -> datetime, so every task due on the same day shares one datetime object
+        self._days = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, task_id):
+        return task_id in self.slots
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __getitem__(self, task_id):
+        if task_id not in self.slots:
+            raise KeyError(task_id)
+        return TaskView(self, task_id)
+
+    def get(self, task_id, default=None):
+        return TaskView(self, task_id) if task_id in self.slots else default
+
+    def values(self):
+        with self.lock:
+            return [TaskView(self, task_id) for task_id in self.slots]
+
+    def __setitem__(self, task_id, task):
+        values = [(field, getattr(task, field)) for field in TASK_FIELDS if field != "id"]
+        with self.lock:
+            slot = self.slots.get(task_id)
+            if slot is None:
+                if self.free:
+                    slot = self.free.pop()
+                else:
+                    slot = len(self.titles)
+                    self.ids.append(None)
+                    self.titles.append(None)
+                    self.descriptions.append(None)
+                    self.flags.append(0)
+                    self.priorities.append(0)
+                    self.due_days.append(NO_DUE_DATE)
+                self.slots[task_id] = slot
+                self.ids[slot] = task_id
+                self.flags[slot] = 0
+            for field, value in values:
+                self.write(slot, field, value)
+
+    def pop(self, task_id, default=None):
+        # The slot is about to be reused, so the caller gets a standalone Task rather than a view
+        with self.lock:
+            slot = self.slots.get(task_id)
+            if slot is None:
+                return default
+            task = self.to_task(slot, task_id)
+            del self.slots[task_id]
+            self.ids[slot] = None
+            self.flags[slot] = FREE_SLOT
+            self.titles[slot] = None
+            self.descriptions[slot] = None
+            self.due_exact.pop(slot, None)
+            self.free.append(slot)
+            return task
+
+    def to_task(self, slot, task_id):
+        return Task.model_construct(id=task_id, **{field: self.read(slot, field) for field in TASK_FIELDS if field != "id"})
+
+    def read(self, slot, field):
+        if field == "title":
+            return self.titles[slot]
+        if field == "description":
+            return self.descriptions[slot]
+        if field == "priority":
+            return self.priorities[slot]
+        if field == "due_date":
+            day = self.due_days[slot]
+            if day == NO_DUE_DATE:
+                return None
+            if day == EXACT_DUE_DATE:
+                return self.due_exact[slot]
+            due_date = self._days.get(day)
+            if due_date is None:
+                due_date = self._days[day] = datetime.fromordinal(day)
+            return due_date
+        return bool(self.flags[slot] & FLAG_BITS[field])
+
+    def write(self, slot, field, value):
+        if field == "title":
+            self.titles[slot] = sys.intern(value) if isinstance(value, str) else value
+        elif field == "description":
+            self.descriptions[slot] = sys.intern(value) if isinstance(value, str) else value
+        elif field == "priority":
+            self.priorities[slot] = value
+        elif field == "due_date":
+            self.due_exact.pop(slot, None)
+            if value is None:
+                self.due_days[slot] = NO_DUE_DATE
+            elif value.tzinfo is None and value.time() == time.min:
+                self.due_days[slot] = value.toordinal()
+            else:
+                self.due_days[slot] = EXACT_DUE_DATE
+                self.due_exact[slot] = value
+        elif field in FLAG_BITS:
+            if value:
+                self.flags[slot] |= FLAG_BITS[field]
+            else:
+                self.flags[slot] &= ~FLAG_BITS[field]
+        else:
+            raise AttributeError(f"Task has no field {field!r}")
+
+
+def _column_property(field):
+    # The slot lookup and the read or write happen under one lock, so a slot freed and reused in
+    # between can't hand back another task's value
+    def get(view):
+        columns = view._columns
+        with columns.lock:
+            return columns.read(columns.slots[view.id], field)
+
+    def set(view, value):
+        columns = view._columns
+        with columns.lock:
+            columns.write(columns.slots[view.id], field, value)
+
+    return property(get, set)
+
+
+class TaskView:
+    """
+    One task in a TaskColumns store, with the attributes and methods code uses on Task
+
+    A view looks its slot up by id on every access, so it stays correct while tasks are added and
+    removed, and raises KeyError once its task has been removed. model_copy returns a real Task.
+    """
+
+    __slots__ = ("_columns", "id")
+
+    def __init__(self, columns, task_id):
+        self._columns = columns
+        self.id = task_id
+
+    def model_dump(self):
+        columns = self._columns
+        with columns.lock:
+            slot = columns.slots[self.id]
+            return {field: self.id if field == "id" else columns.read(slot, field) for field in TASK_FIELDS}
+
+    # Older pydantic name, which TaskAPI still tries first
+    dict = model_dump
+
+    def model_copy(self, update=None):
+        return Task.model_construct(**{**self.model_dump(), **(update or {})})
+
+    def __eq__(self, other):
+        if isinstance(other, (Task, TaskView)):
+            return self.model_dump() == other.model_dump()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TaskView({', '.join(f'{field}={value!r}' for field, value in self.model_dump().items())})"
+
+
+for _field in TASK_FIELDS:
+    if _field != "id":
+        setattr(TaskView, _field, _column_property(_field))
+
+
+class CompactTaskManager(TaskManager):
+    """
+    TaskManager keeping its tasks in TaskColumns; get, list_tasks and the index queries return TaskView objects
+
+    Status and priority are answered from the columns themselves rather than from sets of ids, which
+    would cost more than the columns do: counts are kept up to date and the task lists scan the
+    flags or priorities array. The due-date index is the same sorted list TaskManager uses.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tasks = TaskColumns(self._lock)
+        self._by_status = None
+        self._by_priority = None
+        self._status_counts = [0, 0, 0]
+        self._priority_counts = {}
+
+    def load_tasks(self, tasks: List[Task], keep_existing: bool = False):
+        for task in tasks:
+            if task.id is None:
+                task.id = str(uuid.uuid4())
+        with self._lock:
+            removed = (self._removed_during_load or ()) if keep_existing else ()
+            due = []
+            for task in tasks:
+                if task.id in removed:
+                    continue
+                if task.id in self.tasks:
+                    if keep_existing:
+                        continue
+                    self._unindex(self.tasks[task.id])
+                self.tasks[task.id] = task
+                self._count(task, 1)
+                if task.due_date is not None:
+                    due.append((task.due_date, task.id))
+            self._merge_due(due)
+
+    def tasks_by_status(self, status: int) -> List[TaskView]:
+        with self._lock:
+            # bytes.translate turns the whole flags column into status codes in one C call
+            codes = self.tasks.flags.tobytes().translate(STATUS_OF_FLAGS)
+            ids = self.tasks.ids
+            found = []
+            position = codes.find(status)
+            while position != -1:
+                found.append(TaskView(self.tasks, ids[position]))
+                position = codes.find(status, position + 1)
+            return found
+    def count_by_status(self, status: int) -> int:
+        return self._status_counts[status] if status in (0, 1, 2) else 0
+    def tasks_by_priority(self, priority: int) -> List[TaskView]:
+        with self._lock:
+            ids = self.tasks.ids
+            return [
+                TaskView(self.tasks, ids[slot])
+                for slot, value in enumerate(self.tasks.priorities)
+                if value == priority and ids[slot] is not None
+            ]
+    def count_by_priority(self, priority: int) -> int:
+        return self._priority_counts.get(priority, 0)
+
+    def _count(self, task, change):
+        self._status_counts[task_status_code(task)] += change
+        count = self._priority_counts.get(task.priority, 0) + change
+        if count:
+            self._priority_counts[task.priority] = count
+        else:
+            self._priority_counts.pop(task.priority, None)
+    def _index(self, task):
+        self._count(task, 1)
+        self._index_due(task)
+    def _unindex(self, task):
+        self._count(task, -1)
+        self._unindex_due(task)
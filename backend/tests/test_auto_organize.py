@@ -0,0 +1,47 @@
+"""
+AutoOrganizer decides which changed files to move the same way find_misplaced_files does, and
+moves them through OrganizeJobs. Run from the backend directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from organizer import AutoOrganizer, MoveEngine, OrganizeJobs
+from storage import Storage
+
+
+def test_organizes_like_find_misplaced(tmp_path):
+    base = tmp_path / "Downloads"
+    documents = base / "Documents"
+    (base / "inbox").mkdir(parents=True)
+    documents.mkdir()
+    at_top, nested, in_place = base / "top.pdf", base / "inbox" / "nested.pdf", documents / "done.pdf"
+    for path in (at_top, nested, in_place):
+        path.write_text(path.name)
+
+    rules = [{"folder_name": "Documents", "full_path": str(documents), "extensions": [".pdf"]}]
+    storage = Storage(str(tmp_path / "tasks.db"))
+    jobs = OrganizeJobs(MoveEngine(storage))
+    results = []
+    organized = threading.Event()
+
+    def on_organized(result):
+        results.append(result)
+        organized.set()
+
+    auto_organizer = AutoOrganizer(jobs, get_rules=lambda folder: rules, on_organized=on_organized, settle_time=0)
+    try:
+        auto_organizer._organize(str(base), [str(at_top), str(nested), str(in_place)])
+        assert organized.wait(5)
+    finally:
+        jobs.close()
+        storage.close()
+
+    # Only the file in a subfolder moves; files directly in the base folder are left alone
+    assert results[0]["moved"] == 1
+    assert at_top.exists() and in_place.exists()
+    assert not nested.exists() and (documents / "nested.pdf").exists()
@@ -0,0 +1,97 @@
+"""
+find_misplaced_files works from the file index in one walk; it has to report the same files the
+old per-rule scans did, and keep doing so after the folder changes. Run from the backend directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+from organizer import find_misplaced_files
+from scanner import FileIndex
+from storage import Storage
+
+
+@pytest.fixture
+def file_index(tmp_path):
+    storage = Storage(str(tmp_path / "tasks.db"))
+    yield FileIndex(storage)
+    storage.close()
+
+
+def make_tree(base, paths):
+    for path in paths:
+        full = base / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_text(path)
+
+
+def rules_for(base):
+    return [
+        {"folder_name": "Documents", "full_path": str(base / "Documents"), "extensions": [".pdf", ".docx"]},
+        {"folder_name": "Images", "full_path": str(base / "Images"), "extensions": [".jpg"]},
+        {"folder_name": "Music", "full_path": str(base / "Music"), "extensions": [".mp3"], "enabled": False},
+        # Never wins: .pdf is already claimed by the first rule
+        {"folder_name": "Papers", "full_path": str(base / "Papers"), "extensions": [".pdf"]},
+    ]
+
+
+def misplaced_paths(file_index, base):
+    found = find_misplaced_files(file_index, str(base), rules_for(base))
+    return {
+        os.path.relpath(item["source_path"], base): (
+            item["current_folder"], item["correct_folder"], os.path.relpath(item["destination_path"], base)
+        )
+        for item in found
+    }
+
+
+def test_reports_files_in_the_wrong_folder(file_index, tmp_path):
+    base = tmp_path / "Downloads"
+    make_tree(base, [
+        "top.pdf",                      # directly in the base folder: left alone
+        "Documents/report.pdf",         # already in place
+        "Documents/photo.jpg",
+        "Images/scan.PDF",              # extensions match case-insensitively
+        "Images/holiday.jpg",
+        "inbox/nested/letter.docx",     # any depth below the base folder counts
+        "inbox/song.mp3",               # its rule is disabled
+        "inbox/notes.txt",              # no rule for it
+        "Papers/paper.pdf",
+    ])
+
+    assert misplaced_paths(file_index, base) == {
+        os.path.join("Documents", "photo.jpg"): ("Documents", "Images", os.path.join("Images", "photo.jpg")),
+        os.path.join("Images", "scan.PDF"): ("Images", "Documents", os.path.join("Documents", "scan.PDF")),
+        os.path.join("inbox", "nested", "letter.docx"): ("nested", "Documents", os.path.join("Documents", "letter.docx")),
+        os.path.join("Papers", "paper.pdf"): ("Papers", "Documents", os.path.join("Documents", "paper.pdf")),
+    }
+
+
+def test_sees_changes_after_the_first_walk(file_index, tmp_path):
+    base = tmp_path / "Downloads"
+    make_tree(base, ["Documents/photo.jpg", "inbox/a.pdf"])
+    assert set(misplaced_paths(file_index, base)) == {
+        os.path.join("Documents", "photo.jpg"), os.path.join("inbox", "a.pdf")
+    }
+
+    # Changed folders are re-listed; the remembered listing of the others is still right
+    os.remove(base / "inbox" / "a.pdf")
+    make_tree(base, ["Images/b.pdf", "inbox/deeper/c.jpg"])
+
+    assert set(misplaced_paths(file_index, base)) == {
+        os.path.join("Documents", "photo.jpg"),
+        os.path.join("Images", "b.pdf"),
+        os.path.join("inbox", "deeper", "c.jpg"),
+    }
+
+
+def test_no_enabled_rules_finds_nothing(file_index, tmp_path):
+    base = tmp_path / "Downloads"
+    make_tree(base, ["inbox/a.pdf"])
+    rules = [dict(rule, enabled=False) for rule in rules_for(base)]
+    assert find_misplaced_files(file_index, str(base), rules) == []
@@ -0,0 +1,102 @@
+"""
+Organize runs are journaled so one cut short can be resumed or rolled back, and a move that
+fails must leave its file where it was. Run from the backend directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+import organizer
+from organizer import MoveEngine, copy_move
+from storage import Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(str(tmp_path / "tasks.db"))
+    yield storage
+    storage.close()
+
+
+def make_files(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for name in names:
+        path = os.path.join(folder, name)
+        with open(path, "w") as f:
+            f.write(name)
+        paths.append(path)
+    return paths
+
+
+def interrupted_run(storage, tmp_path, moved=1, unjournaled=0):
+    """Starts a three-file run, moves the first files by hand and journals only `moved` of them, as a crash would leave it"""
+    sources = make_files(str(tmp_path / "Downloads"), ["a.pdf", "b.pdf", "c.pdf"])
+    moves = [(source, str(tmp_path / "Documents" / os.path.basename(source))) for source in sources]
+    run_id = "run-1"
+    storage.start_move_run(run_id, [(seq, source, destination) for seq, (source, destination) in enumerate(moves)])
+    os.makedirs(tmp_path / "Documents")
+    for seq, (source, destination) in enumerate(moves[:moved + unjournaled]):
+        os.rename(source, destination)
+        if seq < moved:
+            storage.mark_moves(run_id, [(seq, "done", None)])
+    return run_id, moves
+
+
+def test_resume_finishes_the_remaining_moves(storage, tmp_path):
+    run_id, moves = interrupted_run(storage, tmp_path, moved=1, unjournaled=1)
+    assert [row[3] for row in storage.get_move_journal(run_id)] == ["done", "pending", "pending"]
+
+    result = MoveEngine(storage).resume(run_id)
+
+    assert result["success"]
+    assert all(not os.path.exists(source) and os.path.exists(destination) for source, destination in moves)
+    assert storage.get_move_journal(run_id) == []
+    assert storage.get_unfinished_move_runs() == []
+
+
+def test_rollback_puts_moved_files_back(storage, tmp_path):
+    run_id, moves = interrupted_run(storage, tmp_path, moved=1, unjournaled=1)
+
+    result = MoveEngine(storage).rollback(run_id)
+
+    # Both the journaled move and the one that happened without reaching the journal are undone
+    assert result["moved"] == 2
+    assert all(os.path.exists(source) and not os.path.exists(destination) for source, destination in moves)
+    assert storage.get_unfinished_move_runs() == []
+
+
+def test_move_never_overwrites_destination(storage, tmp_path):
+    source, = make_files(str(tmp_path / "Downloads"), ["a.pdf"])
+    existing, = make_files(str(tmp_path / "Documents"), ["a.pdf"])
+
+    result = MoveEngine(storage).run([(source, existing)])
+
+    assert result["errors"] == [{"source_path": source, "error": "Destination already exists"}]
+    assert os.path.exists(source)
+    with open(existing) as f:
+        assert f.read() == "a.pdf"
+
+
+def test_copy_move_takes_the_copy_back_if_the_source_stays(tmp_path, monkeypatch):
+    source, = make_files(str(tmp_path / "Downloads"), ["a.pdf"])
+    destination = str(tmp_path / "a.pdf")
+    remove = os.remove
+
+    def remove_all_but_source(path):
+        if path == source:
+            raise PermissionError(13, "Permission denied", path)
+        remove(path)
+
+    monkeypatch.setattr(organizer.os, "remove", remove_all_but_source)
+    with pytest.raises(PermissionError):
+        copy_move(source, destination)
+
+    assert os.path.exists(source)
+    assert not os.path.exists(destination)
+    assert not os.path.exists(destination + organizer.PARTIAL_SUFFIX)
@@ -0,0 +1,86 @@
+"""
+ReminderEngine keeps the time it has written reminders up to in app_state, so each task is
+reminded about once, including tasks that came due while the app was closed. Run from the
+backend directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+from reminders import WATERMARK_KEY, ReminderEngine
+from storage import Storage
+from task_manager import Task, TaskManager
+
+START = datetime(2025, 3, 1, 9, 0)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(str(tmp_path / "tasks.db"))
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def manager():
+    manager = TaskManager()
+    for hours in (1, 2, 3, 5):
+        manager.add_task(Task(id=f"due-{hours}", title=f"Due in {hours}h", due_date=START + timedelta(hours=hours)))
+    manager.add_task(Task(id="done", title="Done", due_date=START + timedelta(hours=2), completed=True, pending=False))
+    manager.add_task(Task(id="undated", title="Undated"))
+    return manager
+
+
+def reminded(storage):
+    return sorted(activity["title"] for activity in storage.get_recent_activities("reminder"))
+
+
+def test_first_run_only_sets_the_watermark(storage, manager):
+    engine = ReminderEngine(lambda: manager, storage)
+
+    # Everything already overdue on the first start is left alone
+    assert engine.fire_due(START + timedelta(hours=4)) == 0
+    assert storage.get_state(WATERMARK_KEY) == (START + timedelta(hours=4)).isoformat()
+    assert engine.fire_due(START + timedelta(hours=6)) == 1
+    assert reminded(storage) == ["Task due: Due in 5h"]
+
+
+def test_each_task_is_reminded_once(storage, manager):
+    engine = ReminderEngine(lambda: manager, storage)
+    engine.fire_due(START)
+
+    assert engine.fire_due(START + timedelta(hours=1)) == 1
+    # Calling again for the same moment writes nothing more
+    assert engine.fire_due(START + timedelta(hours=1)) == 0
+    assert engine.fire_due(START + timedelta(hours=2, minutes=30)) == 1
+    # Going back in time (a clock change) writes nothing
+    assert engine.fire_due(START + timedelta(hours=2)) == 0
+    assert engine.fire_due(START + timedelta(hours=3)) == 1
+
+    # The completed task due at 2h is never reminded about
+    assert reminded(storage) == ["Task due: Due in 1h", "Task due: Due in 2h", "Task due: Due in 3h"]
+
+
+def test_reminders_missed_while_closed_are_written_on_the_next_start(storage, manager):
+    ReminderEngine(lambda: manager, storage).fire_due(START + timedelta(hours=1, minutes=30))
+
+    # A new engine on the same database, as after a restart hours later
+    engine = ReminderEngine(lambda: manager, storage)
+    assert engine.fire_due(START + timedelta(hours=4)) == 2
+    assert engine.fire_due(START + timedelta(hours=4)) == 0
+    assert reminded(storage) == ["Task due: Due in 2h", "Task due: Due in 3h"]
+
+
+def test_lead_time_reminds_early(storage, manager):
+    engine = ReminderEngine(lambda: manager, storage, lead_time=timedelta(hours=1))
+    engine.fire_due(START)
+
+    assert engine.fire_due(START + timedelta(hours=2)) == 2
+    assert reminded(storage) == ["Task due: Due in 2h", "Task due: Due in 3h"]
+    assert engine.next_reminder_at(START + timedelta(hours=2)) == START + timedelta(hours=4)
@@ -0,0 +1,65 @@
+"""
+RuleMatcher files globs in several tables; whichever table a glob lands in, it has to match the
+same paths fnmatch would. Run from the backend directory:
+
+    python -m pytest tests
+"""
+import fnmatch
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+from automation import AutomationRule, RuleMatcher
+
+PATTERNS = [
+    "*.txt",            # plain extension
+    "*.tar.gz",
+    "report_*.pdf",     # literal start
+    "*_draft.docx",     # literal end only
+    "*report*",         # no literal start or end
+    "[abc]*.csv",
+    "notes.md",         # no wildcard at all
+    "*/invoices/*.pdf",  # matched against the whole path
+]
+
+NAMES = [
+    "a.txt", "A.TXT", "backup.tar.gz", "backup.gz", "report_q1.pdf", "Report_Q1.PDF", "report.pdf",
+    "summary_draft.docx", "draft.docx", "annual-report-2024.xlsx", "b_data.csv", "d_data.csv",
+    "notes.md", "old-notes.md", "plain",
+]
+
+
+def fnmatch_agrees(pattern, path):
+    target = path if "/" in pattern else os.path.basename(path)
+    return fnmatch.fnmatchcase(target.lower(), pattern.lower())
+
+
+@pytest.mark.parametrize("folder", ["/home/user/Downloads", "/home/user/invoices"])
+def test_matches_like_fnmatch(folder):
+    rules = [AutomationRule(pattern, None) for pattern in PATTERNS]
+    matcher = RuleMatcher(rules)
+
+    for name in NAMES:
+        path = f"{folder}/{name}"
+        expected = [rule.pattern for rule in rules if fnmatch_agrees(rule.pattern, path)]
+        assert [rule.pattern for rule in matcher.match(path)] == expected, path
+
+
+def test_name_globs_ignore_the_folder():
+    matcher = RuleMatcher([AutomationRule("report_*", None)])
+    assert matcher.match("/home/report_archive/notes.txt") == []
+    assert len(matcher.match("/home/user/report_2024.txt")) == 1
+
+
+def test_custom_matchers_get_the_whole_path():
+    class InFolder:
+        def match(self, path):
+            return path.startswith("/home/user/inbox/")
+
+    rule = AutomationRule(InFolder(), None)
+    matcher = RuleMatcher([rule])
+    assert matcher.match("/home/user/inbox/a.txt") == [rule]
+    assert matcher.match("/home/user/a.txt") == []
@@ -0,0 +1,201 @@
+"""
+TaskScheduler: stored jobs and the policies for missed and overlapping runs. Jobs are driven with
+run_pending_tasks() and explicit times rather than a running scheduler thread. Run from the
+backend directory:
+
+    python -m pytest tests
+"""
+import functools
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+from scheduler import ScheduledJob, TaskScheduler
+from storage import Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(str(tmp_path / "tasks.db"))
+    yield storage
+    storage.close()
+
+
+def test_job_loaded_before_its_action_runs_once_registered(storage):
+    calls = []
+    # Saved, but never run by this scheduler
+    first = TaskScheduler(storage=storage)
+    first.add_job(ScheduledJob(lambda: calls.append("first"), time.time() - 1, action="remind", args={"note": "stand up"}))
+    first.stop()
+
+    # After a restart the jobs are loaded before anything has registered "remind"
+    scheduler = TaskScheduler(storage=storage)
+    try:
+        scheduler.load_jobs()
+        assert scheduler.list_jobs()[0]["name"] == "remind"
+        assert scheduler.run_pending_tasks() == 0
+
+        scheduler.register_action("remind", lambda note: calls.append(("second", note)))
+        assert scheduler.run_pending_tasks() == 1
+    finally:
+        scheduler.stop(wait=True)
+    assert calls == [("second", "stand up")]
+    assert storage.get_scheduled_jobs() == []
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def record_run(path):
+    # Module-level, so a process pool can pickle it
+    with open(path, "a") as f:
+        f.write("ran\n")
+
+
+class Reminders:
+    def remind(self):
+        pass
+
+
+def test_process_pool_refuses_unpicklable_jobs(tmp_path):
+    scheduler = TaskScheduler(workers=1, executor="process")
+    try:
+        with pytest.raises(ValueError, match="can't be pickled"):
+            scheduler.register_action("remind", lambda: None)
+        with pytest.raises(ValueError, match="can't be pickled"):
+            scheduler.run_at(time.time(), functools.partial(lambda note: None, note="x"))
+        assert scheduler.list_jobs() == []
+
+        # Module-level functions, and bound methods of picklable objects, are fine
+        scheduler.register_action("record", record_run)
+        scheduler.run_at(time.time() - 1, Reminders().remind)
+        scheduler.run_at(time.time() - 1, functools.partial(record_run, str(tmp_path / "runs")))
+        assert scheduler.run_pending_tasks() == 2
+        assert wait_for(lambda: (tmp_path / "runs").exists())
+    finally:
+        scheduler.stop(wait=True)
+    assert (tmp_path / "runs").read_text() == "ran\n"
+
+
+def test_scheduler_runs_again_after_stop():
+    calls = []
+    scheduler = TaskScheduler(workers=1)
+    scheduler.run_at(time.time() - 1, lambda: calls.append("first"))
+    assert scheduler.run_pending_tasks() == 1
+    scheduler.stop(wait=True)
+
+    scheduler.run_at(time.time() - 1, lambda: calls.append("second"))
+    thread = threading.Thread(target=scheduler.start_scheduler)
+    thread.start()
+    try:
+        wait_for(lambda: len(calls) == 2)
+    finally:
+        scheduler.stop(wait=True)
+        thread.join()
+    assert calls == ["first", "second"]
+
+
+class Gate:
+    """A job function that holds every run until released, counting how many run at once"""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.most_active = 0
+
+    def __call__(self):
+        with self.lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+        self.released.wait(10)
+        with self.lock:
+            self.active -= 1
+
+
+@pytest.mark.parametrize("misfire, started, skipped, coalesced", [
+    ("skip", 0, 11, 0),
+    ("coalesce", 1, 0, 10),
+    ("catch_up", 11, 0, 0),
+])
+def test_missed_runs_follow_the_misfire_policy(misfire, started, skipped, coalesced):
+    scheduler = TaskScheduler(workers=4)
+    now = time.time()
+    # Eleven missed slots, the latest already five seconds late
+    job = scheduler.add_job(ScheduledJob(lambda: None, now - 105, interval=10, max_concurrency=20, misfire=misfire))
+    try:
+        assert scheduler.run_pending_tasks() == started
+        assert wait_for(lambda: scheduler.get_job_stats(job.id)["stats"]["runs"] == started)
+    finally:
+        scheduler.stop(wait=True)
+
+    stats = scheduler.get_job_stats(job.id)["stats"]
+    assert (stats["skipped"], stats["coalesced"]) == (skipped, coalesced)
+    # Whatever happened to the missed slots, the job carries on from the next one
+    assert now < job.next_run <= now + 10
+
+
+def test_skip_still_runs_a_slot_within_the_grace_period():
+    scheduler = TaskScheduler(workers=1)
+    job = scheduler.add_job(ScheduledJob(lambda: None, time.time() - 20.5, interval=10, misfire="skip"))
+    try:
+        assert scheduler.run_pending_tasks() == 1
+    finally:
+        scheduler.stop(wait=True)
+    assert scheduler.get_job_stats(job.id)["stats"]["skipped"] == 2
+
+
+def test_runs_over_max_concurrency_wait_for_a_slot():
+    gate = Gate()
+    scheduler = TaskScheduler(workers=4)
+    job = scheduler.add_job(ScheduledJob(gate, time.time() - 45, interval=10, max_concurrency=2, misfire="catch_up"))
+    try:
+        assert scheduler.run_pending_tasks() == 2
+        assert wait_for(lambda: gate.active == 2)
+        stats = scheduler.get_job_stats(job.id)
+        assert (stats["running"], stats["waiting"]) == (2, 3)
+
+        gate.released.set()
+        assert wait_for(lambda: scheduler.get_job_stats(job.id)["stats"]["runs"] == 5)
+    finally:
+        gate.released.set()
+        scheduler.stop(wait=True)
+    assert gate.most_active == 2
+    assert scheduler.get_job_stats(job.id)["waiting"] == 0
+
+
+@pytest.mark.parametrize("misfire, waiting, runs", [("coalesce", 1, 2), ("skip", 0, 1)])
+def test_runs_due_while_the_job_is_busy(misfire, waiting, runs):
+    gate = Gate()
+    scheduler = TaskScheduler(workers=4)
+    job = scheduler.add_job(ScheduledJob(gate, time.time(), interval=0.1, misfire=misfire))
+    try:
+        assert scheduler.run_pending_tasks() == 1
+        # Come due twice more while the first run is still going
+        time.sleep(0.25)
+        assert scheduler.run_pending_tasks() == 0
+        time.sleep(0.25)
+        assert scheduler.run_pending_tasks() == 0
+        stats = scheduler.get_job_stats(job.id)
+        assert (stats["running"], stats["waiting"]) == (1, waiting)
+        # Coalesce keeps a single run for everything that came due; skip drops them all
+        if misfire == "coalesce":
+            assert stats["stats"]["coalesced"] >= 3 and stats["stats"]["skipped"] == 0
+        else:
+            assert stats["stats"]["skipped"] >= 4 and stats["stats"]["coalesced"] == 0
+
+        gate.released.set()
+        assert wait_for(lambda: scheduler.get_job_stats(job.id)["stats"]["runs"] == runs)
+    finally:
+        gate.released.set()
+        scheduler.stop(wait=True)
+    assert gate.most_active == 1
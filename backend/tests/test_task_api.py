@@ -0,0 +1,241 @@
+"""
+TaskAPI endpoints, run against a fresh tasks.db in a temporary directory. Run from the backend
+directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+from api import TaskAPI
+from task_manager import TaskManager
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # TaskAPI opens tasks.db in the working directory
+    monkeypatch.chdir(tmp_path)
+    api = TaskAPI()
+    api.tasks_loaded.wait()
+    # The reminder thread writes its watermark whenever it wakes; stop it so only the test writes
+    api.reminders.stop()
+    yield api
+    api.changes.stop()
+    api.auto_organizer.close()
+    api.organize_jobs.close()
+    api.folder_scanner.close()
+    api.storage.close()
+
+
+def test_snapshot_built_before_memory_update_is_rebuilt(api):
+    # Build a snapshot in the gap between the commit and the task manager update, as another
+    # bridge thread calling get_dashboard_snapshot at that moment would
+    seen = []
+    add_task = api.task_manager.add_task
+
+    def add_after_snapshot(task):
+        seen.append(api.get_dashboard_snapshot())
+        add_task(task)
+
+    api.task_manager.add_task = add_after_snapshot
+    api.add_task("Write report", "", status=0)
+
+    assert seen[0]["stats"]["pending_tasks"] == 0
+    snapshot = api.get_dashboard_snapshot(since_version=seen[0]["version"])
+    assert snapshot["modified"] is True
+    assert snapshot["stats"]["pending_tasks"] == 1
+
+
+def db_task_ids(api):
+    with api.storage.get_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM tasks")}
+
+
+def test_add_tasks_skips_invalid_items(api):
+    result = api.add_tasks([
+        {"title": "First"},
+        {"title": "  "},
+        {"title": "Bad status", "status": 7},
+        {"title": "Second", "status": 2, "due_date": "2025-03-01"},
+    ])
+
+    assert (result["succeeded"], result["failed"]) == (2, 2)
+    assert [item["ok"] for item in result["results"]] == [True, False, False, True]
+    assert [item["index"] for item in result["results"]] == [0, 1, 2, 3]
+    added = {item["task"]["id"] for item in result["results"] if item["ok"]}
+    assert db_task_ids(api) == added
+    assert {task.id for task in api.task_manager.list_tasks()} == added
+
+
+def test_update_tasks_reports_each_failure(api):
+    first, second = (item["task"]["id"] for item in api.add_tasks([{"title": "First"}, {"title": "Second"}])["results"])
+    completed_before = api.storage.get_stats().get("tasks_completed", 0)
+
+    result = api.update_tasks([
+        {"id": first, "status": 2},
+        {"id": first, "status": 2},
+        {"id": "missing", "title": "Nope"},
+        {"id": second, "description": 42},
+        {"id": second, "title": ""},
+    ])
+
+    assert [item["ok"] for item in result["results"]] == [True, False, False, False, False]
+    assert "more than once" in result["results"][1]["error"]
+    assert "not found" in result["results"][2]["error"]
+    # The duplicate didn't count the completion twice, and the rejected updates changed nothing
+    assert api.storage.get_stats()["tasks_completed"] == completed_before + 1
+    assert api.task_manager.get(first).completed
+    assert api.task_manager.get(second).description is None
+    assert api.task_manager.get(second).title == "Second"
+
+
+def test_set_status_and_delete_skip_missing_and_duplicate_ids(api):
+    first, second = (item["task"]["id"] for item in api.add_tasks([{"title": "First"}, {"title": "Second"}])["results"])
+    completed_before = api.storage.get_stats().get("tasks_completed", 0)
+
+    result = api.set_tasks_status([first, first, "missing", second], 2)
+    assert [item["ok"] for item in result["results"]] == [True, False, False, True]
+    assert api.storage.get_stats()["tasks_completed"] == completed_before + 2
+
+    result = api.delete_tasks([first, "missing", first])
+    assert [item["ok"] for item in result["results"]] == [True, False, False]
+    assert db_task_ids(api) == {second}
+    assert api.task_manager.get(first) is None
+
+
+def test_failed_write_leaves_every_item_unchanged(api):
+    task_id = api.add_tasks([{"title": "Keep"}])["results"][0]["task"]["id"]
+
+    def fail(activity):
+        raise RuntimeError("disk full")
+
+    api.storage.add_activity = fail
+    result = api.update_tasks([{"id": task_id, "title": "Changed"}, {"id": "missing", "title": "Nope"}])
+
+    assert result["succeeded"] == 0
+    assert result["results"][0]["error"] == "disk full"
+    assert "not found" in result["results"][1]["error"]
+    assert api.task_manager.get(task_id).title == "Keep"
+    with api.storage.get_connection() as conn:
+        assert conn.execute("SELECT title FROM tasks WHERE id = ?", (task_id,)).fetchone()[0] == "Keep"
+
+
+@pytest.mark.parametrize("call", [
+    lambda api, task_id: api.complete_task(task_id),
+    lambda api, task_id: api.set_task_status(task_id, 1),
+    lambda api, task_id: api.update_task(task_id, "Changed", "", status=2),
+    lambda api, task_id: api.delete_task(task_id),
+])
+def test_single_task_write_failure_leaves_memory_unchanged(api, call):
+    task_id = api.add_task("Keep", "")["id"]
+
+    def fail(*args):
+        raise RuntimeError("disk full")
+
+    api.update_task_in_db_by_id = fail
+    api.delete_task_from_db_by_id = fail
+    with pytest.raises(RuntimeError):
+        call(api, task_id)
+
+    task = api.task_manager.get(task_id)
+    assert (task.title, task.pending) == ("Keep", True)
+    assert api.task_manager.count_by_status(0) == 1
+
+
+class GatedTaskManager(TaskManager):
+    # Holds the background loader back until the test lets it go
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+
+    def load_tasks(self, tasks, keep_existing=False):
+        if keep_existing:
+            self.gate.wait()
+        super().load_tasks(tasks, keep_existing=keep_existing)
+
+
+class GatedTaskAPI(TaskAPI):
+    TASK_MANAGER = GatedTaskManager
+    LAZY_LOAD = True
+
+
+def test_calls_on_unloaded_tasks_wait_for_the_load(api):
+    done, deleted = (item["task"]["id"] for item in api.add_tasks([
+        {"title": "Done", "status": 2}, {"title": "Deleted", "status": 2}
+    ])["results"])
+
+    lazy = GatedTaskAPI()
+    lazy.reminders.stop()
+    try:
+        assert lazy.task_manager.get(done) is None
+        results = {}
+        calls = [
+            threading.Thread(target=lambda: results.update(status=lazy.set_task_status(done, 0))),
+            threading.Thread(target=lambda: results.update(delete=lazy.delete_task(deleted))),
+        ]
+        for call in calls:
+            call.start()
+        lazy.task_manager.gate.set()
+        for call in calls:
+            call.join()
+
+        assert results == {"status": True, "delete": True}
+        assert lazy.task_manager.get(done).pending
+        assert lazy.task_manager.get(deleted) is None
+        assert db_task_ids(lazy) == {done}
+    finally:
+        lazy.task_manager.gate.set()
+        lazy.changes.stop()
+        lazy.auto_organizer.close()
+        lazy.organize_jobs.close()
+        lazy.folder_scanner.close()
+        lazy.storage.close()
+
+
+@pytest.mark.parametrize("sort", ["due_date", "-due_date", "priority", "-priority", "title", "-title"])
+def test_query_pages_with_cursor_cover_every_task_once(api, sort):
+    # Repeated sort values and missing due dates make the id tie-breaker and NULL handling matter
+    api.add_tasks([
+        {
+            "title": f"Task {i % 4}",
+            "priority": i % 3 + 1,
+            "due_date": None if i % 5 == 0 else f"2025-03-{i % 7 + 1:02d}",
+            "status": 2 if i % 6 == 0 else 0,
+        }
+        for i in range(23)
+    ])
+    everything = api.query_tasks(sort=sort, limit=100)
+    assert everything["total"] == 23 and everything["next_cursor"] is None
+
+    pages = [api.query_tasks(sort=sort, limit=4)]
+    while pages[-1]["next_cursor"]:
+        pages.append(api.query_tasks(sort=sort, limit=4, cursor=pages[-1]["next_cursor"]))
+
+    assert [len(page["tasks"]) for page in pages] == [4, 4, 4, 4, 4, 3]
+    paged_ids = [task["id"] for page in pages for task in page["tasks"]]
+    assert paged_ids == [task["id"] for task in everything["tasks"]]
+    # Same order as the database's, checked against the sort key
+    keys = [task[sort.lstrip("-")] for task in everything["tasks"]]
+    present = [key for key in keys if key is not None]
+    assert present == sorted(present, reverse=sort.startswith("-"))
+    # Missing due dates come first going up and last going down
+    missing = [key is None for key in keys]
+    assert missing == sorted(missing, reverse=not sort.startswith("-"))
+
+
+def test_query_cursor_keeps_filters(api):
+    api.add_tasks([{"title": f"Task {i}", "priority": i % 2 + 1, "status": i % 3} for i in range(30)])
+    filters = {"status": [0, 1], "priority": 2}
+    expected = api.query_tasks(filters=filters, sort="title", limit=100)["tasks"]
+
+    first = api.query_tasks(filters=filters, sort="title", limit=3)
+    second = api.query_tasks(filters=filters, sort="title", limit=3, cursor=first["next_cursor"])
+
+    assert first["total"] == len(expected)
+    assert [task["id"] for task in first["tasks"] + second["tasks"]] == [task["id"] for task in expected[:6]]
+    assert all(task["priority"] == 2 and task["status_code"] in (0, 1) for task in expected)
@@ -0,0 +1,149 @@
+"""
+The in-memory task store is changed from several threads at once: every PyWebView
+API call runs on its own thread, and the lazy loader adds completed tasks in the
+background. These tests race those writers and then check the indexes still agree
+with the tasks. Run from the backend directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pytest
+
+from task_manager import CompactTaskManager, Task, TaskManager, task_status_code, trusted_task
+
+LOADED_TASKS = 200_000
+CHUNK_SIZE = 5_000
+WRITER_THREADS = 2
+START = datetime(2025, 1, 1)
+
+
+def completed_tasks(count):
+    return [
+        trusted_task(f"loaded-{i}", f"Task {i}", "", START + timedelta(days=i % 700), 1, 0, 0, i % 5 + 1)
+        for i in range(count)
+    ]
+
+
+def race_writers_with_load(manager, tasks):
+    """Loads tasks in chunks like TaskAPI's background loader while other threads add and update tasks"""
+    loading = threading.Event()
+    added = [[] for _ in range(WRITER_THREADS)]
+
+    def load():
+        loading.set()
+        for start in range(0, len(tasks), CHUNK_SIZE):
+            manager.load_tasks(tasks[start:start + CHUNK_SIZE], keep_existing=True)
+
+    def write(number):
+        loading.wait()
+        i = 0
+        while loader.is_alive():
+            task = Task(id=f"added-{number}-{i}", title="Added", due_date=START + timedelta(days=i % 500))
+            manager.add_task(task)
+            added[number].append(task.id)
+            if i % 2:
+                manager.update(task.id, due_date=START + timedelta(days=i % 300), inProgress=True, pending=False)
+            i += 1
+
+    loader = threading.Thread(target=load)
+    writers = [threading.Thread(target=write, args=(number,)) for number in range(WRITER_THREADS)]
+    loader.start()
+    for writer in writers:
+        writer.start()
+    loader.join()
+    for writer in writers:
+        writer.join()
+    return [task_id for ids in added for task_id in ids]
+
+
+def assert_indexes_match(manager):
+    tasks = manager.list_tasks()
+    assert manager._due_dates == sorted(manager._due_dates)
+    assert len(manager._due_dates) == len(manager._due_ids)
+    assert sorted(zip(manager._due_dates, manager._due_ids)) == sorted(
+        (task.due_date, task.id) for task in tasks if task.due_date is not None
+    )
+    for status in (0, 1, 2):
+        expected = {task.id for task in tasks if task_status_code(task) == status}
+        assert {task.id for task in manager.tasks_by_status(status)} == expected
+        assert manager.count_by_status(status) == len(expected)
+
+
+@pytest.mark.parametrize("manager_class", [TaskManager, CompactTaskManager])
+def test_writes_during_load_keep_due_index(manager_class):
+    manager = manager_class()
+    added = race_writers_with_load(manager, completed_tasks(LOADED_TASKS))
+
+    assert added, "no writes overlapped the load"
+    assert len(manager) == LOADED_TASKS + len(added)
+    assert all(manager.get(task_id) is not None for task_id in added)
+    assert_indexes_match(manager)
+    # Every dated task can be found again through the due-date index
+    assert len(manager.tasks_due_between()) == sum(1 for task in manager.list_tasks() if task.due_date is not None)
+
+
+@pytest.mark.parametrize("manager_class", [TaskManager, CompactTaskManager])
+def test_load_keeps_existing_tasks(manager_class):
+    manager = manager_class()
+    manager.add_task(Task(id="loaded-3", title="Changed while loading", inProgress=True, pending=False))
+    manager.load_tasks(completed_tasks(10), keep_existing=True)
+
+    assert len(manager) == 10
+    assert manager.get("loaded-3").title == "Changed while loading"
+    assert_indexes_match(manager)
+
+
+@pytest.mark.parametrize("manager_class", [TaskManager, CompactTaskManager])
+def test_load_skips_tasks_removed_while_loading(manager_class):
+    manager = manager_class()
+    rows = completed_tasks(10)
+    manager.begin_background_load()
+    # Completed and deleted through the API after the loader read its rows, but before it added them
+    manager.add_task(Task(id="loaded-3", title="Completed", completed=True, pending=False))
+    manager.remove_by_id("loaded-3")
+    manager.load_tasks(rows, keep_existing=True)
+    manager.finish_background_load()
+
+    assert len(manager) == 9
+    assert manager.get("loaded-3") is None
+    assert_indexes_match(manager)
+
+
+def test_compact_slots_from_two_threads():
+    manager = CompactTaskManager()
+    per_thread = 20_000
+    start = threading.Barrier(2)
+
+    def insert(number):
+        start.wait()
+        for i in range(per_thread):
+            task_id = f"thread-{number}-{i}"
+            manager.add_task(Task(id=task_id, title=task_id, priority=number + 1, due_date=START + timedelta(days=i % 50)))
+            # Free every third slot again so the threads also race for reused ones
+            if i % 3 == 0:
+                manager.remove_by_id(task_id)
+
+    threads = [threading.Thread(target=insert, args=(number,)) for number in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    columns = manager.tasks
+    expected = {f"thread-{number}-{i}" for number in range(2) for i in range(per_thread) if i % 3}
+    assert set(columns) == expected
+    # Every id has a slot of its own, and that slot holds the task's own values
+    assert len(set(columns.slots.values())) == len(expected)
+    for task_id in expected:
+        view = manager.get(task_id)
+        assert columns.ids[columns.slots[task_id]] == task_id
+        assert view.title == task_id
+        assert view.priority == int(task_id.split("-")[1]) + 1
+    assert len(columns.ids) == len(columns.titles) == len(columns.flags) == len(columns.priorities) == len(columns.due_days)
+    assert_indexes_match(manager)
@@ -9,7 +9,7 @@ import {
   Lightbulb 
 } from "lucide-react"
 import { Button } from './ui/button';
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Activity, api, DashboardStats } from "@/lib/api";
 
 // Tips to show when there's empty space
@@ -45,16 +45,25 @@ const Dashboard = ({ setActiveTab } : { setActiveTab: (tab: string) => void }) =
   const [recentActivities, setRecentActivities] = useState<Activity[]>([]);
   const [latestTasks, setLatestTasks] = useState<Activity[]>([]);
 
+  // Version of the snapshot on screen, so a refresh with nothing new costs almost nothing
+  const snapshotVersion = useRef<number | null>(null);
+
   useEffect(() => {
-    fetchStatistics();
-    fetchActivities();
+    fetchDashboard();
+    // Refresh when the window comes back into focus; unchanged data answers "not modified"
+    window.addEventListener('focus', fetchDashboard);
+    return () => window.removeEventListener('focus', fetchDashboard);
   }, []);
 
-  const fetchStatistics = async () => {
+  const fetchDashboard = async () => {
     try {
-      setLoading(true);
-      const result = await api.getDashboardStats();
-      setStatistics(result);
+      const snapshot = await api.getDashboardSnapshot(snapshotVersion.current);
+      if (snapshot && snapshot.modified) {
+        snapshotVersion.current = snapshot.version;
+        setStatistics(snapshot.stats!);
+        setRecentActivities(snapshot.recent_activities || []);
+        setLatestTasks(snapshot.latest_tasks || []);
+      }
       setError(null);
     } catch (error) {
       console.log(`There has been an error with fetching the dashboard statistics: ${error}`);
@@ -64,17 +73,6 @@ const Dashboard = ({ setActiveTab } : { setActiveTab: (tab: string) => void }) =
     }
   }
 
-  const fetchActivities = async() => {
-    try {
-      const activities = await api.get_recent_activities();
-      const tasks = await api.get_latest_tasks();
-      setRecentActivities(activities);
-      setLatestTasks(tasks);
-    } catch (error) {
-      console.error('Error fetching dashboard activities and tasks', error);
-    }
-  }
-
   if (loading) {
     return <div className="flex justify-center p-8 dark:text-white">Loading dashboard stats...</div>;
   }
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
@@ -38,7 +38,7 @@ import {
   Circle,
   CircleX,
 } from "lucide-react"
-import { api, FileSystemItem } from "../lib/api"
+import { api, Change, FileSystemItem, subscribeChanges } from "../lib/api"
 
 // Define types for our component
 interface FileTypeInfo {
@@ -71,11 +71,44 @@ interface EnhancedFileSystemItem extends FileSystemItem {
   icon?: JSX.Element;
 }
 
+// Levels listed when a folder is scanned; deeper folders are listed as they are opened
+const SCAN_DEPTH = 2;
+
 // Helper function to normalize paths
 const normalizePath = (path: string): string => {
   return path.replace(/\\/g, '/');
 };
 
+// Helpers for patching one folder of the tree; paths are compared normalized
+const isInsideFolder = (path: string, folder: string): boolean => {
+  return normalizePath(path).startsWith(normalizePath(folder).replace(/\/$/, "") + "/");
+};
+
+const parentFolder = (path: string): string => {
+  const normalized = normalizePath(path);
+  return normalized.slice(0, normalized.lastIndexOf("/"));
+};
+
+const findFolder = (items: FileSystemItem[], path: string): FileSystemItem | null => {
+  for (const item of items) {
+    if (item.type !== "folder" || !item.path) continue;
+    if (normalizePath(item.path) === normalizePath(path)) return item;
+    if (item.children && isInsideFolder(path, item.path)) return findFolder(item.children, path);
+  }
+  return null;
+};
+
+const replaceFolderChildren = <T extends FileSystemItem>(items: T[], path: string, children: T[]): T[] => {
+  return items.map(item => {
+    if (item.type !== "folder" || !item.path) return item;
+    if (normalizePath(item.path) === normalizePath(path)) return { ...item, children, loaded: true };
+    if (item.children && isInsideFolder(path, item.path)) {
+      return { ...item, children: replaceFolderChildren(item.children as T[], path, children) };
+    }
+    return item;
+  });
+};
+
 // Mock data for file types
 const fileTypes: FileTypeInfo[] = [
   {
@@ -139,8 +172,62 @@ export default function FileOrganizer() {
     extensions: [] as string[],
   })
   const [misplacedFiles, setMisplacedFiles] = useState<MisplacedFile[]>([]);
+  // Misplaced files under the folder in total; misplacedFiles holds the first page of them
+  const [misplacedTotal, setMisplacedTotal] = useState(0);
   const [editingRule, setEditingRule] = useState<OrganizationRule | null>(null);
 
+  // Latest values for the change feed listener, which is only subscribed once
+  const latest = useRef({ selectedFolder, folderContents });
+  latest.current = { selectedFolder, folderContents };
+
+  // When the backend reports folders as changed (e.g. after an organize run), list just those
+  // folders again and patch them into the tree instead of rescanning the whole selected folder
+  useEffect(() => {
+    return subscribeChanges((changes: Change[]) => {
+      const folders = changes.filter(change => change.kind === "folder").map(change => change.key as string);
+      if (folders.length > 0) {
+        refreshFolders(folders);
+      }
+    });
+  }, []);
+
+  const refreshFolders = async (changedFolders: string[]) => {
+    const root = latest.current.selectedFolder;
+    if (!root) return;
+    const inTree = (path: string) => findFolder(latest.current.folderContents, path) !== null;
+
+    // A folder that isn't in the tree yet (say a new rule folder) shows up by listing its parent
+    const targets = new Set<string>();
+    for (let path of changedFolders) {
+      if (!isInsideFolder(path, root) && normalizePath(path) !== normalizePath(root)) continue;
+      while (isInsideFolder(path, root) && !inTree(path)) {
+        path = parentFolder(path);
+      }
+      targets.add(normalizePath(path));
+    }
+    // Folders inside another target are listed along with it
+    const listed = [...targets].filter(path => ![...targets].some(other => isInsideFolder(path, other)));
+    if (listed.length === 0) return;
+
+    try {
+      let contents = latest.current.folderContents;
+      for (const path of listed) {
+        if (path === normalizePath(root)) {
+          contents = addIconsToFileItems(await api.scan_folder(root, SCAN_DEPTH, true) || []);
+        } else {
+          contents = replaceFolderChildren(contents, path, addIconsToFileItems(await api.expand_folder(path)));
+        }
+      }
+      setFolderContents(contents);
+      if (listed.includes(normalizePath(root))) {
+        setExpandedFolders(contents.filter(item => item.type === "folder").map(item => item.id));
+      }
+      refreshMisplaced(root);
+    } catch (error) {
+      console.error("Error refreshing changed folders:", error);
+    }
+  }
+
   const handleSelectFolder = async () => {
     try {
       const folderPath = await api.select_folder();
@@ -161,15 +248,17 @@ export default function FileOrganizer() {
     setIsScanning(true);
     
     try {
-      // Get folder contents from API (Python backend or mock)
-      const contents = await api.scan_folder(folderPath);
+      // Get the first levels of the folder from the API; the rest is listed as folders are opened
+      const contents = await api.scan_folder(folderPath, SCAN_DEPTH, true);
       
       if (contents && Array.isArray(contents)) {
         // Add icons to files based on their extension
         const contentsWithIcons = addIconsToFileItems(contents);
         setFolderContents(contentsWithIcons);
+        // Open the top-level folders of a freshly scanned folder
+        setExpandedFolders(contentsWithIcons.filter(item => item.type === "folder").map(item => item.id));
         // Find misplaced files based on organization rules
-        findMisplacedFiles(contentsWithIcons, organizationRules);
+        refreshMisplaced(folderPath);
       } else {
         console.warn("Received invalid folder contents", contents);
         // If we get invalid data, use an empty array
@@ -212,65 +301,20 @@ export default function FileOrganizer() {
     );
   }
 
-  // Function to find misplaced files based on organization rules
-  const findMisplacedFiles = (contents: FileSystemItem[], rules: OrganizationRule[]): void => {
-    const misplaced: MisplacedFile[] = []
-
-    // Helper function to check if a file should be in a different folder
-    const checkFileLocation = (file: FileSystemItem, currentFolder: string) => {
-      if (file.type === "file" && file.extension) {
-        const matchingRule = rules.find(r => r.enabled && r.extensions.includes(file.extension))
-        if (matchingRule && currentFolder !== matchingRule.folder_name) {
-          return {
-            ...file,
-            current_folder: currentFolder,
-            correct_folder: matchingRule.folder_name,
-            source_path: file.path || '',
-            destination_path: `${matchingRule.full_path}/${file.name}`
-          }
-        }
-      }
-      return null
-    }
-
-    // Recursive function to scan folders
-    const scanFolderRecursively = (folder: FileSystemItem, currentPath: string): MisplacedFile[] => {
-      const folderMisplaced: MisplacedFile[] = []
-
-      // Check files in current folder
-      if (folder.children) {
-        folder.children.forEach(item => {
-          if (item.type === "file") {
-            const misplacedFile = checkFileLocation(item, folder.name)
-            if (misplacedFile) {
-              folderMisplaced.push(misplacedFile as MisplacedFile)
-            }
-          }
-        })
-      }
-
-      // Recursively check subfolders
-      if (folder.children) {
-        folder.children.forEach(item => {
-          if (item.type === "folder") {
-            const subfolderMisplaced = scanFolderRecursively(item, `${currentPath}/${item.name}`)
-            folderMisplaced.push(...subfolderMisplaced)
-          }
-        })
-      }
-
-      return folderMisplaced
+  // The backend walks the whole folder and applies the rules, so only misplaced files cross the bridge
+  const refreshMisplaced = async (folderPath: string | null) => {
+    if (!folderPath) return;
+    try {
+      const result = await api.find_misplaced(folderPath);
+      const files = result ? result.files : [];
+      setMisplacedFiles(files.map(file => ({
+        ...file,
+        icon: getFileTypeByExtension(file.extension)?.icon ?? <FileText className="h-4 w-4 text-gray-500" />
+      })));
+      setMisplacedTotal(result ? result.total : 0);
+    } catch (error) {
+      console.error("Error finding misplaced files:", error);
     }
-
-    // Start scanning from each top-level folder
-    contents.forEach(folder => {
-      if (folder.type === "folder") {
-        const folderMisplaced = scanFolderRecursively(folder, folder.name)
-        misplaced.push(...folderMisplaced)
-      }
-    })
-
-    setMisplacedFiles(misplaced)
   }
 
   // Function to handle adding a new organization rule
@@ -299,7 +343,7 @@ export default function FileOrganizer() {
         
         // Re-check for misplaced files with all rules including the new one
         if (folderContents.length > 0) {
-          findMisplacedFiles(folderContents, updatedRules);
+          refreshMisplaced(selectedFolder);
         }
         
       } else {
@@ -311,16 +355,29 @@ export default function FileOrganizer() {
   }
 
   // Function to toggle folder expansion
-  const toggleFolderExpand = (folderId: string) => {
+  const toggleFolderExpand = (folder: FileSystemItem) => {
+    // Folders below the scanned depth aren't listed yet; list one the first time it is opened
+    if (!expandedFolders.includes(folder.id) && folder.loaded === false && folder.path) {
+      loadFolder(folder.path);
+    }
     setExpandedFolders((prev) => {
-      if (prev.includes(folderId)) {
-        return prev.filter((id) => id !== folderId)
+      if (prev.includes(folder.id)) {
+        return prev.filter((id) => id !== folder.id)
       } else {
-        return [...prev, folderId]
+        return [...prev, folder.id]
       }
     })
   }
 
+  const loadFolder = async (folderPath: string) => {
+    try {
+      const children = addIconsToFileItems(await api.expand_folder(folderPath));
+      setFolderContents(prev => replaceFolderChildren(prev, folderPath, children));
+    } catch (error) {
+      console.error("Error expanding folder:", error);
+    }
+  }
+
   // Function to handle organizing files
   const handleOrganizeFiles = async () => {
     
@@ -331,41 +388,50 @@ export default function FileOrganizer() {
     setIsOrganizing(true)
     setOrganizingProgress(0)
 
+    const finish = () => {
+      // After organizing, update the folder structure
+      // (the folders the run touched are listed again when the backend reports them as changed)
+      updateFolderStructure()
+      setIsOrganizing(false)
+      // Only the first page was organized; the next one (if any) shows up here
+      refreshMisplaced(selectedFolder)
+    }
+
     try {
-      const success = await api.organize_files(misplacedFiles);
-      if (success) {
-        // Don't scan folder immediately - we'll do it after the progress reaches 100%
-        setMisplacedFiles([]);
-      } else {
+      const jobId = await api.start_organize(misplacedFiles);
+      if (!jobId) {
         console.error("Failed to organize files.")
+        setIsOrganizing(false)
+        return
       }
+
+      // Follow the real progress of the background job
+      const interval = setInterval(async () => {
+        const status = await api.job_status(jobId);
+        if (!status) {
+          clearInterval(interval)
+          finish()
+          return
+        }
+
+        if (status.total > 0) {
+          setOrganizingProgress(Math.round(((status.moved + status.failed) / status.total) * 100))
+        }
+
+        if (status.done) {
+          clearInterval(interval)
+          if (status.status === "completed" && status.failed === 0) {
+            setMisplacedFiles([]);
+          } else {
+            console.error(`Organizing finished with status ${status.status}: ${status.failed} files failed`)
+          }
+          finish()
+        }
+      }, 500)
     } catch (error) {
       console.log(`There has been an error with organizing the file: ${error}`)
+      setIsOrganizing(false)
     }
-
-    // Simulate organizing process
-    const totalFiles = misplacedFiles.length
-    let processed = 0
-
-    const interval = setInterval(() => {
-      processed++
-      const progress = Math.round((processed / totalFiles) * 100)
-      setOrganizingProgress(progress)
-
-      if (processed >= totalFiles) {
-        clearInterval(interval)
-        setTimeout(() => {
-          // After organizing, update the folder structure
-          updateFolderStructure()
-          setIsOrganizing(false)
-          
-          // Only re-scan the folder after the organizing process is complete
-          if (selectedFolder) {
-            scanFolder(selectedFolder);
-          }
-        }, 1000)
-      }
-    }, 500)
   }
 
   // Function to update folder structure after organizing
@@ -403,7 +469,18 @@ export default function FileOrganizer() {
   }
 
   // Function to toggle a rule's enabled state
-  const toggleRuleEnabled = (ruleId: string) => {
+  const toggleRuleEnabled = async (ruleId: string) => {
+    const rule = organizationRules.find((rule) => rule.id === ruleId)
+    if (!rule) return
+
+    try {
+      // The backend applies the rules when finding misplaced files, so it has to know first
+      await api.set_organization_rule_enabled(ruleId, !rule.enabled, selectedFolder)
+    } catch (error) {
+      console.error("Error updating organization rule:", error)
+      return
+    }
+
     const updatedRules = organizationRules.map((rule) => {
       if (rule.id === ruleId) {
         return { ...rule, enabled: !rule.enabled }
@@ -415,18 +492,25 @@ export default function FileOrganizer() {
 
     // Re-check for misplaced files with the updated rules
     if (folderContents.length > 0) {
-      findMisplacedFiles(folderContents, updatedRules)
+      refreshMisplaced(selectedFolder)
     }
   }
 
   // Function to delete a rule
-  const deleteRule = (ruleId: string) => {
+  const deleteRule = async (ruleId: string) => {
+    try {
+      await api.delete_organization_rules(ruleId, selectedFolder)
+    } catch (error) {
+      console.error("Error deleting organization rule:", error)
+      return
+    }
+
     const updatedRules = organizationRules.filter((rule) => rule.id !== ruleId)
     setOrganizationRules(updatedRules)
 
     // Re-check for misplaced files with the updated rules
     if (folderContents.length > 0) {
-      findMisplacedFiles(folderContents, updatedRules)
+      refreshMisplaced(selectedFolder)
     }
   }
 
@@ -471,7 +555,7 @@ export default function FileOrganizer() {
         setShowRuleDialog(false);
 
         if (folderContents.length > 0) {
-          findMisplacedFiles(folderContents, updatedRules)
+          refreshMisplaced(selectedFolder)
         }
 
       } else {
@@ -484,6 +568,9 @@ export default function FileOrganizer() {
     }
   }
 
+  // Misplaced files come from the backend with their own ids, so files in the tree are matched by path
+  const misplacedPaths = new Set(misplacedFiles.map((file) => normalizePath(file.source_path)))
+
   // Function to render the file tree
   const renderFileTree = (items: EnhancedFileSystemItem[], level = 0) => {
     return items.map((item) => (
@@ -493,7 +580,7 @@ export default function FileOrganizer() {
             <div
               className="flex items-center py-1 px-2 hover:bg-gray-100 dark:hover:bg-gray-700 rounded cursor-pointer"
               style={{ paddingLeft: `${level * 16 + 8}px` }}
-              onClick={() => toggleFolderExpand(item.id)}
+              onClick={() => toggleFolderExpand(item)}
             >
               {expandedFolders.includes(item.id) ? (
                 <ChevronDown className="h-4 w-4 text-gray-500 dark:text-gray-400 mr-1" />
@@ -503,7 +590,7 @@ export default function FileOrganizer() {
               <FolderOpen className="h-5 w-5 text-amber-500 mr-2" />
               <span className="text-sm font-medium dark:text-white">{item.name}</span>
               <span className="ml-auto text-xs text-gray-500 dark:text-gray-400">
-                {item.children && item.children.length ? `${item.children.length} ${item.children.length === 1 ? "item" : "items"}` : "0 items"}
+                {item.loaded === false ? "" : item.children && item.children.length ? `${item.children.length} ${item.children.length === 1 ? "item" : "items"}` : "0 items"}
               </span>
             </div>
             {expandedFolders.includes(item.id) && item.children && item.children.length > 0 && (
@@ -513,7 +600,7 @@ export default function FileOrganizer() {
         ) : (
           <div
             className={`flex items-center py-1 px-2 hover:bg-gray-100 dark:hover:bg-gray-700 rounded cursor-pointer ${
-              misplacedFiles.some((f) => f.id === item.id) ? "bg-red-50 dark:bg-red-900/20" : ""
+              item.path && misplacedPaths.has(normalizePath(item.path)) ? "bg-red-50 dark:bg-red-900/20" : ""
             }`}
             style={{ paddingLeft: `${level * 16 + 28}px` }}
           >
@@ -526,13 +613,6 @@ export default function FileOrganizer() {
     ))
   }
 
-  // Effect to expand all folders initially when folder contents change
-  useEffect(() => {
-    if (folderContents.length > 0) {
-      setExpandedFolders(folderContents.map((folder) => folder.id))
-    }
-  }, [folderContents])
-
   return (
     <div className="space-y-6">
       <div className="flex flex-col space-y-4 sm:flex-row sm:items-center sm:justify-between sm:space-y-0">
@@ -610,9 +690,9 @@ export default function FileOrganizer() {
               </div>
                 <CardDescription className="dark:text-gray-400">
                   {selectedFolder ? normalizePath(selectedFolder) : ""}
-                  {misplacedFiles.length > 0 && (
+                  {misplacedTotal > 0 && (
                     <Badge variant="outline" className="ml-2 bg-red-50 text-red-600 border border-gray-200/50 dark:bg-red-900/20 dark:text-red-400">
-                      {misplacedFiles.length} misplaced files
+                      {misplacedTotal} misplaced files
                     </Badge>
                   )}
                 </CardDescription>
@@ -625,6 +705,11 @@ export default function FileOrganizer() {
                 {misplacedFiles.length > 0 && (
                   <div className="mt-6">
                     <h3 className="text-lg font-medium mb-3 dark:text-white">Misplaced Files</h3>
+                    {misplacedTotal > misplacedFiles.length && (
+                      <p className="mb-3 text-sm text-gray-500 dark:text-gray-400">
+                        Showing the first {misplacedFiles.length} of {misplacedTotal}; organizing them brings up the rest
+                      </p>
+                    )}
                     <div className="rounded-lg border border-gray-300 dark:border-gray-700">
                       <div className="flex items-center justify-between border-b border-gray-300 p-3 bg-gray-50 dark:bg-gray-800 dark:border-gray-700">
                         <span className="font-medium dark:text-white">File Name</span>
@@ -11,7 +11,7 @@ import { Checkbox } from "./ui/checkbox"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "./ui/select"
 import { PlusCircle, Search, Filter, CheckCircle2, Clock, AlertCircle } from "lucide-react"
 import { Textarea } from "./ui/textarea"
-import { api, statusToCode, Task } from "../lib/api"
+import { api, Change, statusToCode, subscribeChanges, Task } from "../lib/api"
 import { Dialog, DialogContent, DialogDescription, DialogFooter, DialogHeader, DialogTitle, DialogTrigger } from "./ui/dialog"
 
 export default function TaskManager() {
@@ -46,6 +46,29 @@ export default function TaskManager() {
   useEffect(() => {
     fetchTasks()
   }, [])
+
+  // After that, apply the task changes the backend pushes instead of reloading the whole list
+  useEffect(() => {
+    return subscribeChanges((changes: Change[]) => {
+      const taskChanges = changes.filter(change => change.kind === "task")
+      if (taskChanges.length === 0) return
+      if (taskChanges.some(change => change.op === "reset")) {
+        fetchTasks()
+        return
+      }
+      setTasks(prev => {
+        const byId = new Map(prev.map(task => [task.id, task]))
+        for (const change of taskChanges) {
+          if (change.op === "delete") {
+            byId.delete(change.key as string)
+          } else {
+            byId.set(change.key as string, change.data as Task)
+          }
+        }
+        return Array.from(byId.values())
+      })
+    })
+  }, [])
   
   // Function to fetch tasks from the Python backend
   const fetchTasks = async () => {
@@ -94,7 +117,7 @@ export default function TaskManager() {
       
       console.log("Task creation response:", newTask) // Debug log
       
-      // Reset form and refresh tasks
+      // Reset form; the new task arrives through the change feed
       setFormData({
         title: "",
         description: "",
@@ -106,7 +129,6 @@ export default function TaskManager() {
       // Close dialog if open
       setNewTaskDialogOpen(false)
       
-      fetchTasks()
     } catch (err) {
       console.error("Error creating task:", err)
       setError("Failed to create task")
@@ -128,7 +150,7 @@ export default function TaskManager() {
         editFormData.status
       )
       
-      // Reset form and refresh tasks
+      // Reset form; the updated task arrives through the change feed
       setEditFormData({
         id: "",
         title: "",
@@ -140,7 +162,6 @@ export default function TaskManager() {
       
       setEditingTask(null)
       setEditTaskDialogOpen(false)
-      fetchTasks()
     } catch (err) {
       console.error("Error updating task:", err)
       setError("Failed to update task")
@@ -165,7 +186,6 @@ export default function TaskManager() {
   const handleStatusChange = async (taskId: string, newStatus: number) => {
     try {
       await api.setTaskStatus(taskId, newStatus)
-      fetchTasks()
     } catch (err) {
       console.error("Error updating task status:", err)
       setError("Failed to update task status")
@@ -176,7 +196,6 @@ export default function TaskManager() {
   const handleDeleteTask = async (taskId: string) => {
     try {
       await api.deleteTask(taskId)
-      fetchTasks()
     } catch (err) {
       console.error("Error deleting task:", err)
       setError("Failed to delete task")
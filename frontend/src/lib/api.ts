@@ -8,6 +8,47 @@ export type Task = {
   status_code: 0 | 1 | 2;
 };
 
+export type TaskQueryFilters = {
+  status?: number | number[];
+  priority?: number | number[];
+  due_from?: string;
+  due_to?: string;
+  search?: string;
+};
+
+export type TaskQueryResult = {
+  tasks: Task[];
+  total: number;
+  offset: number;
+  limit: number;
+  next_cursor: string | null;
+};
+
+export type NewTask = {
+  title: string;
+  description?: string;
+  due_date?: string;
+  priority?: number;
+  status?: number;
+};
+
+// Only the fields given are changed
+export type TaskUpdate = Partial<NewTask> & { id: string };
+
+export type BulkItemResult = {
+  id?: string;
+  index?: number; // position in the request, for add_tasks
+  ok: boolean;
+  task?: Task;
+  error?: string;
+};
+
+export type BulkResult = {
+  results: BulkItemResult[];
+  succeeded: number;
+  failed: number;
+};
+
 export type Activity = {
   id: string;
   type: string;
@@ -30,6 +71,7 @@ export interface FileSystemItem {
   size?: string ;
   extension: string;
   children?: FileSystemItem[];
+  loaded?: boolean; // false for folders whose children have not been listed yet
 }
 
 export interface MisplacedFile extends FileSystemItem {
@@ -39,6 +81,43 @@ export interface MisplacedFile extends FileSystemItem {
   destination_path: string;
 }
 
+export interface OrganizeResult {
+  run_id: string;
+  success: boolean;
+  cancelled: boolean;
+  moved: number;
+  failed: number;
+  remaining: number;
+  errors: { source_path: string; error: string }[];
+  bytes_moved: number;
+  elapsed: number;
+  files_per_second: number;
+  bytes_per_second: number;
+}
+
+export interface OrganizeJobStatus {
+  job_id: string;
+  status: "queued" | "running" | "completed" | "cancelled" | "failed";
+  total: number;
+  moved: number;
+  failed: number;
+  remaining: number;
+  bytes_moved: number;
+  elapsed: number;
+  bytes_per_second: number;
+  errors: { source_path: string; error: string }[];
+  error: string | null;
+  done: boolean;
+}
+
+export interface InterruptedOrganizeRun {
+  run_id: string;
+  started_at: string;
+  total: number;
+  done: number;
+  pending: number;
+}
+
 export interface OrganizationRule {
   id: string;
   base_folder_directory: string;
@@ -54,6 +133,30 @@ export interface DashboardStats {
   files_organized: number,
   pending_tasks: number,
 }
+
+// Everything the dashboard shows; when nothing changed since `since_version` only version and modified are set
+export interface DashboardSnapshot {
+  version: number;
+  modified: boolean;
+  stats?: DashboardStats;
+  recent_activities?: Activity[];
+  latest_tasks?: Activity[];
+}
+
+// One entry in the backend change feed; "reset" means reload everything of that kind
+export interface Change {
+  seq: number;
+  kind: "task" | "rule" | "activity" | "folder";
+  op: "upsert" | "delete" | "changed" | "reset";
+  key: string | null;
+  data: unknown;
+}
+
+export interface ChangesSince {
+  seq: number;
+  reset: boolean; // the feed no longer goes back that far: reload everything and continue from seq
+  changes: Change[];
+}
  
 const isPyWebViewAvailable = (): boolean => {
   return typeof window !== 'undefined' && 
@@ -61,7 +164,7 @@ const isPyWebViewAvailable = (): boolean => {
           window.pywebview.api !== undefined;
 }
   
-type PyWebViewApiArgs = string | number | boolean | null | undefined | Record<string, unknown> | string[] | MisplacedFile[];
+type PyWebViewApiArgs = string | number | boolean | null | undefined | Record<string, unknown> | string[] | MisplacedFile[] | NewTask[] | TaskUpdate[];
 
 const callPythonApi = async (method: string, ...args: PyWebViewApiArgs[]) => {
   if (!isPyWebViewAvailable()) {
@@ -77,12 +180,34 @@ const callPythonApi = async (method: string, ...args: PyWebViewApiArgs[]) => {
   }
 };
 
+const changeListeners = new Set<(changes: Change[]) => void>();
+
+// Listen for batches of changes pushed by the backend; returns a function that stops listening
+export const subscribeChanges = (listener: (changes: Change[]) => void) => {
+  changeListeners.add(listener);
+  window.__chronosChanges = (changes: Change[]) => changeListeners.forEach(notify => notify(changes));
+  return () => {
+    changeListeners.delete(listener);
+  };
+};
+
 // API wrapper functions
 export const api = {
   getAllTasks: async(): Promise<Task[]> => {
     return await callPythonApi('get_all_tasks') || [];
   },
 
+  // Sort by "due_date", "priority" or "title"; prefix with "-" for descending
+  queryTasks: async(
+    filters: TaskQueryFilters = {},
+    sort: string = "due_date",
+    offset: number = 0,
+    limit: number = 50,
+    cursor: string | null = null,
+  ): Promise<TaskQueryResult | null> => {
+    return await callPythonApi('query_tasks', filters, sort, offset, limit, cursor);
+  },
+
   getDashboardStats: async(): Promise<DashboardStats> => {
     const result = await callPythonApi('get_dashboard_stats');
     // If result is an array, take the first item, otherwise use the result directly
@@ -127,12 +252,35 @@ export const api = {
     return await callPythonApi('complete_task', taskId) || false;
   },
 
+  // Bulk versions: one call and one database transaction for many tasks, with a result per item
+  addTasks: async (tasks: NewTask[]): Promise<BulkResult | null> => {
+    return await callPythonApi('add_tasks', tasks);
+  },
+
+  updateTasks: async (updates: TaskUpdate[]): Promise<BulkResult | null> => {
+    return await callPythonApi('update_tasks', updates);
+  },
+
+  setTasksStatus: async (taskIds: string[], status: number): Promise<BulkResult | null> => {
+    return await callPythonApi('set_tasks_status', taskIds, status);
+  },
+
+  deleteTasks: async (taskIds: string[]): Promise<BulkResult | null> => {
+    return await callPythonApi('delete_tasks', taskIds);
+  },
+
   select_folder: async(): Promise<string | null> => {
     return await callPythonApi('select_folder') || false;
   },
 
-  scan_folder: async(folderPath: string): Promise<FileSystemItem[]> => {
-    return await callPythonApi('scan_folder', folderPath) || false;
+  // depth = null scans the whole tree; depth = 1 returns just the top level for lazy expansion
+  scan_folder: async(folderPath: string, depth: number | null = null, prefetch: boolean = false): Promise<FileSystemItem[]> => {
+    return await callPythonApi('scan_folder', folderPath, depth, prefetch) || false;
+  },
+
+  // depth null lists the whole subtree
+  expand_folder: async(nodePath: string, depth: number | null = 1): Promise<FileSystemItem[]> => {
+    return await callPythonApi('expand_folder', nodePath, depth) || [];
   },
 
   add_organization_rule: async(
@@ -144,10 +292,67 @@ export const api = {
     return await callPythonApi('add_organization_rule', base_folder_directory, folder_name, desired_folder_directory, extensions);
   },
   
+  delete_organization_rules: async(ruleId: string, baseFolder: string | null = null): Promise<boolean> => {
+    return await callPythonApi('delete_organization_rules', ruleId, baseFolder) || false;
+  },
+
+  set_organization_rule_enabled: async(
+    ruleId: string,
+    enabled: boolean,
+    baseFolder: string | null = null,
+  ): Promise<OrganizationRule | null> => {
+    return await callPythonApi('set_organization_rule_enabled', ruleId, enabled, baseFolder);
+  },
+
+  find_misplaced: async(
+    base_folder: string,
+    offset: number = 0,
+    limit: number = 500,
+  ): Promise<{ files: MisplacedFile[]; total: number; offset: number; limit: number } | null> => {
+    return await callPythonApi('find_misplaced', base_folder, offset, limit);
+  },
+
   organize_files: async(
     misplaced_files: MisplacedFile[],
-  ): Promise<boolean> => {
-    return await callPythonApi('organize_files', misplaced_files) || false;
+  ): Promise<OrganizeResult | null> => {
+    return await callPythonApi('organize_files', misplaced_files);
+  },
+
+  start_organize: async(misplaced_files: MisplacedFile[]): Promise<string | null> => {
+    return await callPythonApi('start_organize', misplaced_files);
+  },
+
+  job_status: async(jobId: string): Promise<OrganizeJobStatus | null> => {
+    return await callPythonApi('job_status', jobId);
+  },
+
+  cancel_job: async(jobId: string): Promise<boolean> => {
+    return await callPythonApi('cancel_job', jobId) || false;
+  },
+
+  // folder = null starts / stops every folder that has organization rules
+  start_auto_organize: async(baseFolder: string | null = null): Promise<string[]> => {
+    return await callPythonApi('start_auto_organize', baseFolder) || [];
+  },
+
+  stop_auto_organize: async(baseFolder: string | null = null): Promise<string[]> => {
+    return await callPythonApi('stop_auto_organize', baseFolder) || [];
+  },
+
+  get_auto_organize_folders: async(): Promise<string[]> => {
+    return await callPythonApi('get_auto_organize_folders') || [];
+  },
+
+  get_interrupted_organize_runs: async(): Promise<InterruptedOrganizeRun[]> => {
+    return await callPythonApi('get_interrupted_organize_runs') || [];
+  },
+
+  resume_organize_run: async(runId: string): Promise<OrganizeResult | null> => {
+    return await callPythonApi('resume_organize_run', runId);
+  },
+
+  rollback_organize_run: async(runId: string): Promise<OrganizeResult | null> => {
+    return await callPythonApi('rollback_organize_run', runId);
   },
 
   update_organization_rule: async(
@@ -167,12 +372,24 @@ export const api = {
     );
   },
 
+  getDashboardSnapshot: async(sinceVersion: number | null = null): Promise<DashboardSnapshot | null> => {
+    return await callPythonApi('get_dashboard_snapshot', sinceVersion);
+  },
+
   get_recent_activities: async(): Promise<Activity[]> => {
     return await callPythonApi('get_recent_activities') || [];
   },
 
   get_latest_tasks: async(): Promise<Activity[]> => {
     return await callPythonApi('get_latest_tasks') || [];
+  },
+
+  get_reminders: async(): Promise<Activity[]> => {
+    return await callPythonApi('get_reminders') || [];
+  },
+
+  changesSince: async(seq: number): Promise<ChangesSince | null> => {
+    return await callPythonApi('changes_since', seq);
   }
   
 };
@@ -1,4 +1,5 @@
 interface Window {
+    __chronosChanges?: (changes: import('./lib/api').Change[]) => void;
     pywebview: {
       api: {
         [key: string]: (...args: any[]) => Promise<any>;